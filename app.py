@@ -2,14 +2,12 @@ import streamlit as st
 import pandas as pd
 import base64
 import os
-from logic.core import load_data, create_pdf_report, get_comprehensive_report_assets, get_k_color
-from sections.snapshot import render_snapshot
-from sections.structural_gaps import render_structural_gaps
-from sections.resource_distribution import render_resource_distribution
-from sections.surge_intelligence import render_surge_intelligence
-from sections.hospital_finder import render_hospital_finder
+from logic.core import load_data, load_duplicate_report, apply_filters, create_pdf_report, get_comprehensive_report_assets, get_k_color
+from logic.backend import get_backend
+from logic.profiling import begin_rerun, span, render_performance_panel
 
 st.set_page_config(page_title="Executive Healthcare Dashboard", layout="wide", initial_sidebar_state="expanded")
+begin_rerun()
 
 
 @st.dialog("Methodology & Indicator Framework", width="large")
@@ -118,7 +116,9 @@ with st.sidebar:
                       "Structural Gap Diagnosis", 
                       "Resource Distribution", 
                       "Surge Risk Intelligence",
-                      "Nearest Hospital Finder"], 
+                      "Nearest Hospital Finder",
+                      "Registry History",
+                      "Registry Diff"], 
                     label_visibility="collapsed")
     
     st.markdown('<div style="margin: 20px 0;"></div>', unsafe_allow_html=True)
@@ -134,18 +134,26 @@ with st.sidebar:
     st.markdown('<div style="margin: 15px 0;"></div>', unsafe_allow_html=True)
     context_sidebar = st.container()
 
-df_raw, state_stats_raw = load_data(uploaded_file)
+with span("load_data"):
+    try:
+        df_raw, state_stats_raw = load_data(uploaded_file)
+    except ValueError as e:
+        st.error(f"The uploaded file could not be loaded. {e}")
+        st.stop()
+    backend = get_backend(df_raw, state_stats_raw, uploaded_file)
+    aggregates = backend.materialized
 
 with st.sidebar:
     st.markdown('<div style="font-size:18px; font-weight:850; color:rgba(255,255,255,0.6); margin-bottom:12px; text-transform:uppercase; letter-spacing:1.5px;">Analysis Filters</div>', unsafe_allow_html=True)
     with st.expander("Intelligence Filters", expanded=False):
-        selected_states = st.multiselect("State", sorted(df_raw[df_raw['Admin_Type']=='State']['State'].unique()))
-        selected_uts = st.multiselect("Union Territory", sorted(df_raw[df_raw['Admin_Type']=='Union Territory']['State'].unique()))
+        # Options come from the materialized aggregates, not the row-level registry
+        selected_states = st.multiselect("State", aggregates.unique("State", Admin_Type=["State"]))
+        selected_uts = st.multiselect("Union Territory", aggregates.unique("State", Admin_Type=["Union Territory"]))
         filter_set = selected_states + selected_uts
-        relevant_districts = sorted(df_raw[df_raw['State'].isin(filter_set)]['District'].unique()) if filter_set else sorted(df_raw['District'].unique())
+        relevant_districts = aggregates.unique("District", State=filter_set) if filter_set else aggregates.unique("District")
         selected_districts = st.multiselect("District", relevant_districts)
-        selected_hosp_cat = st.multiselect("Hospital Category", sorted(df_raw['Hospital_Category'].unique()))
-        selected_care_type = st.multiselect("Care Type", sorted(df_raw['Hospital_Care_Type'].unique()))
+        selected_hosp_cat = st.multiselect("Hospital Category", aggregates.unique("Hospital_Category"))
+        selected_care_type = st.multiselect("Care Type", aggregates.unique("Hospital_Care_Type"))
         
         st.markdown('<div style="font-size:14px; font-weight:700; color:#94a3b8; margin-top:10px;">FACILITY CAPABILITY</div>', unsafe_allow_html=True)
         icu_filter = st.radio("ICU Available", ["All", "Yes", "No"], horizontal=True)
@@ -155,6 +163,23 @@ with st.sidebar:
         if st.button("View Methodology and Framework", use_container_width=True, type="secondary"):
             show_methodology_dialog()
 
+    with st.expander("Data Quality", expanded=False):
+        n_outliers = int(df_raw["is_outlier"].sum())
+        exclude_outliers = st.toggle("Exclude Capacity Outliers", value=False, help="Hide facilities whose beds, doctors or doctor/bed ratio deviate strongly from district and care-level peers (robust z-score > 3.5).")
+        st.caption(f"{n_outliers:,} facilities flagged as capacity outliers.")
+        if n_outliers:
+            from logic.outliers import outlier_report
+            st.download_button("Download Outlier Report", lambda: outlier_report(df_raw).to_csv(index=False).encode("utf-8"), "capacity_outliers.csv", "text/csv", use_container_width=True)
+
+        duplicates = load_duplicate_report(uploaded_file)
+        if duplicates.empty:
+            st.caption("No duplicate facilities found on load.")
+        else:
+            from logic.dedup import summarize_duplicates
+            dup_summary = summarize_duplicates(duplicates)
+            st.caption(f"{dup_summary['merged_records']:,} duplicate records merged into {dup_summary['clusters']:,} facilities ({dup_summary['beds_removed']:,} double-counted beds removed).")
+            st.download_button("Download Merge Report", duplicates.to_csv(index=False).encode("utf-8"), "duplicate_facilities.csv", "text/csv", use_container_width=True)
+
     st.markdown('<div style="margin: 20px 0;"></div>', unsafe_allow_html=True)
     st.markdown('<div style="font-size:18px; font-weight:850; color:rgba(255,255,255,0.6); margin-bottom:12px; text-transform:uppercase; letter-spacing:1.5px;">System Settings</div>', unsafe_allow_html=True)
     dark_mode = st.toggle("Dark Mode", value=True)
@@ -226,35 +251,47 @@ def get_base64_image(image_path):
 st.session_state.avatar_b64 = get_base64_image(avatar_path)
 
 
-filtered_df = df_raw.copy()
-if selected_states: filtered_df = filtered_df[filtered_df['State'].isin(selected_states)]
-if selected_uts: filtered_df = filtered_df[filtered_df['State'].isin(selected_uts)]
-if selected_districts: filtered_df = filtered_df[filtered_df['District'].isin(selected_districts)]
-if selected_hosp_cat: filtered_df = filtered_df[filtered_df['Hospital_Category'].isin(selected_hosp_cat)]
-if selected_care_type: filtered_df = filtered_df[filtered_df['Hospital_Care_Type'].isin(selected_care_type)]
-if icu_filter != "All": filtered_df = filtered_df[filtered_df['has_icu'] == (icu_filter == "Yes")]
-if emergency_filter != "All": filtered_df = filtered_df[filtered_df['is_emergency'] == (emergency_filter == "Yes")]
-
-
-total_hospitals = len(filtered_df)
-total_beds = filtered_df['Total_Num_Beds'].sum()
-total_doctors = filtered_df['Number_Doctor'].sum()
-distinct_states = filtered_df[filtered_df['Admin_Type'] == 'State']['State'].nunique()
-distinct_uts = filtered_df[filtered_df['Admin_Type'] == 'Union Territory']['State'].nunique()
-total_population = state_stats_raw[state_stats_raw['State'].isin(filtered_df['State'].unique())]['State_Population'].sum()
-icu_percent = (filtered_df['has_icu'].sum() / total_hospitals * 100) if total_hospitals > 0 else 0
-emergency_percent = (filtered_df['is_emergency'].sum() / total_hospitals * 100) if total_hospitals > 0 else 0
-
-if page == "National Snapshot":
-    render_snapshot(filtered_df, state_stats_raw, total_population, total_beds, total_doctors, distinct_states, distinct_uts, icu_percent, emergency_percent, sub_text, get_k_color)
-elif page == "Structural Gap Diagnosis":
-    render_structural_gaps(filtered_df, state_stats_raw, sub_text, get_k_color)
-elif page == "Resource Distribution":
-    render_resource_distribution(filtered_df, sub_text, get_k_color)
-elif page == "Surge Risk Intelligence":
-    render_surge_intelligence(filtered_df, state_stats_raw, context_sidebar, sub_text, get_k_color)
-elif page == "Nearest Hospital Finder":
-    render_hospital_finder(df_raw, sub_text)
+with span("filter_chain"):
+    filters = dict(states=selected_states, uts=selected_uts, districts=selected_districts, categories=selected_hosp_cat,
+                   care_types=selected_care_type, icu=icu_filter, emergency=emergency_filter,
+                   outliers="Exclude" if exclude_outliers else "All")
+    filtered_df = apply_filters(df_raw, **filters)
+    scope = backend.scope(filters, frame=filtered_df)
+
+with span("kpi_summary"):
+    kpi_summary = scope.kpis()
+total_hospitals = kpi_summary["total_hospitals"]
+total_beds = kpi_summary["total_beds"]
+total_doctors = kpi_summary["total_doctors"]
+distinct_states = kpi_summary["distinct_states"]
+distinct_uts = kpi_summary["distinct_uts"]
+total_population = kpi_summary["total_population"]
+icu_percent = kpi_summary["icu_percent"]
+emergency_percent = kpi_summary["emergency_percent"]
+
+with span(f"page: {page}"):
+    # Page modules (and their plotly dependencies) are imported on first visit
+    if page == "National Snapshot":
+        from sections.snapshot import render_snapshot
+        render_snapshot(filtered_df, scope, state_stats_raw, total_population, total_beds, total_doctors, distinct_states, distinct_uts, icu_percent, emergency_percent, sub_text, get_k_color)
+    elif page == "Structural Gap Diagnosis":
+        from sections.structural_gaps import render_structural_gaps
+        render_structural_gaps(filtered_df, scope, state_stats_raw, sub_text, get_k_color)
+    elif page == "Resource Distribution":
+        from sections.resource_distribution import render_resource_distribution
+        render_resource_distribution(filtered_df, scope, sub_text, get_k_color)
+    elif page == "Surge Risk Intelligence":
+        from sections.surge_intelligence import render_surge_intelligence
+        render_surge_intelligence(filtered_df, scope, state_stats_raw, context_sidebar, sub_text, get_k_color)
+    elif page == "Nearest Hospital Finder":
+        from sections.hospital_finder import render_hospital_finder
+        render_hospital_finder(df_raw, backend.fingerprint, sub_text)
+    elif page == "Registry History":
+        from sections.registry_history import render_registry_history
+        render_registry_history(df_raw, sub_text)
+    elif page == "Registry Diff":
+        from sections.registry_diff import render_registry_diff
+        render_registry_diff(df_raw, uploaded_file, sub_text)
 
 
 with st.sidebar:
@@ -262,6 +299,8 @@ with st.sidebar:
     if st.checkbox("Generate Master Report (All Pages)"):
         with st.spinner("Compiling comprehensive visual assets..."):
             kpis = {"Total Admin Reach": f"{distinct_states} States", "Infrastructure": f"{total_beds:,} Beds", "Personnel": f"{total_doctors:,} Doctors"}
-            report_assets = get_comprehensive_report_assets(filtered_df, state_stats_raw, sub_text)
-            pdf_data = create_pdf_report("PulseScore Intelligence Report", kpis, [f for s in report_assets.values() for f in s])
+            with span("pdf_report"):
+                report_assets = get_comprehensive_report_assets(filtered_df, state_stats_raw, sub_text)
+                pdf_data = create_pdf_report("PulseScore Intelligence Report", kpis, [f for s in report_assets.values() for f in s])
             st.download_button("Download Master PDF", pdf_data, "PulseScore_Report.pdf", "application/pdf", use_container_width=True)
+    render_performance_panel()
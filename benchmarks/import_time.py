@@ -0,0 +1,65 @@
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BUDGET_MS = 1000
+
+
+def entry_imports(script):
+    # Top-level import statements of a script, i.e. what every cold start pays for
+    with open(script) as f:
+        tree = ast.parse(f.read())
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def measure(statements):
+    # Fresh interpreter per measurement so nothing is already in sys.modules
+    code = "\n".join(statements)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    modules = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # "import time:  self_us |  cumulative_us |   <indent>package"
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append({"module": name.strip(), "self_ms": int(self_us) / 1000,
+                        "cumulative_ms": int(cumulative_us) / 1000, "depth": depth})
+    total = sum(m["cumulative_ms"] for m in modules if m["depth"] == 0)
+    return total, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start import time")
+    parser.add_argument("--script", default=os.path.join(ROOT, "app.py"), help="Entry script whose top-level imports are measured")
+    parser.add_argument("--module", action="append", default=[], help="Measure these modules instead (repeatable)")
+    parser.add_argument("--top", type=int, default=15, help="Heaviest top-level packages to list")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Fail when the total exceeds this")
+    args = parser.parse_args()
+
+    statements = [f"import {m}" for m in args.module] or entry_imports(args.script)
+    total, modules = measure(statements)
+
+    print("Measured:")
+    for stmt in statements:
+        print(f"  {stmt}")
+    print("\nHeaviest imports (cumulative):")
+    top_level = sorted((m for m in modules if m["depth"] == 0), key=lambda m: m["cumulative_ms"], reverse=True)
+    for m in top_level[:args.top]:
+        print(f"  {m['module']:<40} {m['cumulative_ms']:>9.1f} ms")
+    print(f"\nTotal import time: {total:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    if total > args.budget_ms:
+        print("Cold-start import budget exceeded")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
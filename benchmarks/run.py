@@ -0,0 +1,244 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BENCH_DIR, ".data")
+# Benchmark registries get their own cache: every run clears it, and the dashboard's
+# dataset/.cache (memory-mapped by running sessions) must not be touched. Set before any logic import.
+os.environ["PULSESCORE_CACHE_DIR"] = os.path.join(DATA_DIR, "cache")
+
+from logic.backend import get_backend
+from logic.core import load_data, clear_data_cache, apply_filters, create_pdf_report, get_comprehensive_report_assets
+from logic.metrics import (aggregate_states, aggregate_districts, compute_state_capacity, compute_structural_deficits,
+                           national_deficits, compute_state_sri, compute_district_sri, compute_resource_rankings,
+                           compute_equity, compute_district_deficits)
+from logic.access import compute_district_access, compute_accessibility
+from logic.allocation import allocate_capacity
+from logic.contingency import apply_outage, largest_facility_losses
+from logic.dedup import find_duplicates
+from logic.norms import NORM_PROFILES, evaluate_profiles
+from logic.stability import bootstrap_ranks
+from logic.outliers import score_outliers
+from logic.registry_diff import diff_registries
+from logic.siting import plan_sites
+from logic.spillover import district_centroids, simulate_spillover
+from logic.shared_data import cache_path, source_fingerprint
+from logic.synthetic import write_registry
+from logic.workforce import redeploy_doctors
+from sections.hospital_finder import search_by_gps, search_by_district, search_by_pincode
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+
+def registry_path(size, seed):
+    path = os.path.join(DATA_DIR, f"registry_{size}_{seed}.csv")
+    if not os.path.exists(path):
+        write_registry(path, size, seed=seed)
+    return path
+
+
+def timed(fn, repeat, warmup=1):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {"median_s": statistics.median(samples), "min_s": min(samples), "max_s": max(samples), "repeat": repeat}
+
+
+# ============================================================
+# BENCHMARK CASES
+# ============================================================
+def build_cases(path, df, state_stats):
+    top_states = df["State"].value_counts().index[:3].tolist()
+    filters = dict(states=top_states, categories=sorted(df["Hospital_Category"].unique())[:2], icu="Yes")
+    filtered = apply_filters(df, **filters)
+    state_agg = aggregate_states(df)
+    dist_agg = aggregate_districts(df)
+    state_sri = compute_state_sri(state_agg, 1.5, 1.15)
+    sample = df.dropna(subset=["lat", "lon"]).iloc[len(df) // 2]
+    district_kw = str(df["District"].iloc[0]).split()[0]
+    pincode = str(df["Pincode"].iloc[0])[:4]
+
+    def load_cold():
+        # Only the enriched registry copy is rebuilt; the Parquet export and aggregates other
+        # cases hold open stay on disk
+        clear_data_cache()
+        fingerprint = source_fingerprint(path)
+        for name in ("registry", "state_stats"):
+            if os.path.exists(cache_path(fingerprint, name)):
+                os.remove(cache_path(fingerprint, name))
+        load_data(path)
+
+    def load_mapped():
+        # Another process (or a restart) mapping the already-built Arrow cache
+        clear_data_cache()
+        load_data(path)
+
+    pandas_scope = get_backend(df, state_stats, path, kind="pandas", materialized=False).scope(filters)
+    duckdb_scope = get_backend(df, state_stats, path, kind="duckdb", materialized=False).scope(filters)
+    unfiltered = get_backend(df, state_stats, path, kind="pandas", materialized=False).scope()
+    materialized = get_backend(df, state_stats, path, kind="pandas").scope()
+    # Next month's extract: 1% of facilities closed and 2% with revised bed counts
+    updated = df.iloc[len(df) // 100:].copy()
+    updated.loc[updated.index[::50], "Total_Num_Beds"] += 5
+
+    def rollups(scope):
+        scope.aggregate_states()
+        scope.aggregate_districts()
+        scope.equity(by=("State", "District"))
+
+    def snapshot():
+        compute_state_capacity(filtered, state_stats)
+
+    def structural_gaps():
+        national_deficits(compute_structural_deficits(aggregate_states(filtered)))
+
+    def resource_distribution():
+        compute_resource_rankings(aggregate_districts(filtered))
+        filtered.groupby(["State", "Care_Level_Clean"]).size()
+
+    def surge_intelligence():
+        sri = compute_state_sri(aggregate_states(filtered), 1.5, 1.15)
+        compute_district_sri(aggregate_districts(filtered), sri, 1.5, 1.15)
+
+    def spillover():
+        dist_sri = compute_district_sri(dist_agg, state_sri, 1.5, 1.15)
+        simulate_spillover(dist_sri, district_centroids(df), compute_district_deficits(state_agg, dist_agg), 1.5, 1.15)
+
+    def equity():
+        compute_equity(filtered, by=("State",))
+        compute_equity(filtered, by=("State", "District"))
+
+    def pdf_report():
+        assets = get_comprehensive_report_assets(filtered, state_stats, "#94a3b8")
+        create_pdf_report("PulseScore Intelligence Report", {"Infrastructure": "n/a"}, [f for s in assets.values() for f in s])
+
+    return {
+        "load_data": load_cold,
+        "load_data_mapped": load_mapped,
+        "load_data_session": lambda: load_data(path),
+        "filter_chain": lambda: apply_filters(df, **filters),
+        "agg_snapshot": snapshot,
+        "agg_structural_gaps": structural_gaps,
+        "agg_resource_distribution": resource_distribution,
+        "agg_surge_intelligence": surge_intelligence,
+        "agg_surge_district_only": lambda: compute_district_sri(dist_agg, state_sri, 1.5, 1.15),
+        "agg_equity": equity,
+        "district_sds": lambda: compute_district_deficits(state_agg, aggregate_districts(filtered), dist_agg),
+        "rank_bootstrap": lambda: bootstrap_ranks(df, "District", 500, dist_agg),
+        "norm_profiles": lambda: evaluate_profiles(state_agg, list(NORM_PROFILES), 1.5, 1.15),
+        "backend_pandas_rollups": lambda: rollups(pandas_scope),
+        "backend_duckdb_rollups": lambda: rollups(duckdb_scope),
+        "unfiltered_rollups_rowlevel": lambda: (unfiltered.kpis(), unfiltered.aggregate_states(), unfiltered.aggregate_districts(), unfiltered.count_by(["State", "Care_Level_Clean"])),
+        "unfiltered_rollups_materialized": lambda: (materialized.kpis(), materialized.aggregate_states(), materialized.aggregate_districts(), materialized.count_by(["State", "Care_Level_Clean"])),
+        "registry_diff": lambda: diff_registries(df, updated),
+        "dedup_blocking": lambda: find_duplicates(df),
+        "outlier_scoring": lambda: score_outliers(df),
+        "district_access": lambda: compute_district_access(df),
+        "accessibility_2sfca": lambda: compute_accessibility(df),
+        "surge_spillover": spillover,
+        "surge_allocation": lambda: allocate_capacity(compute_district_sri(dist_agg, state_sri, 1.5, 1.15), "Beds", 100_000, 1.15),
+        "doctor_redeployment": lambda: redeploy_doctors(state_agg, dist_agg, "Within distance", centroids=district_centroids(df)),
+        "outage_contingency": lambda: apply_outage(compute_district_sri(dist_agg, state_sri, 1.5, 1.15), largest_facility_losses(df, 3), 1.15),
+        "icu_siting": lambda: plan_sites(df, "ICU", "Existing facilities", n=25, radius_km=15.0),
+        "finder_gps": lambda: search_by_gps(df, sample["lat"], sample["lon"], 50),
+        "finder_district": lambda: search_by_district(df, district_kw),
+        "finder_pincode": lambda: search_by_pincode(df, pincode),
+        "pdf_report": pdf_report,
+    }
+
+
+def run(sizes, repeat, seed, only=None, skip=()):
+    results = {}
+    for size in sizes:
+        path = registry_path(size, seed)
+        clear_data_cache(disk=True)
+        df, state_stats = load_data(path)
+        for name, fn in build_cases(path, df, state_stats).items():
+            if (only and name not in only) or name in skip:
+                continue
+            stats = timed(fn, repeat)
+            results.setdefault(name, {})[str(size)] = stats
+            print(f"  {name:<28} {size:>10,} rows  {stats['median_s'] * 1000:>10.1f} ms")
+    return results
+
+
+# ============================================================
+# BASELINE COMPARISON
+# ============================================================
+def compare(results, baseline, threshold, overrides):
+    regressions = []
+    for name, by_size in results.items():
+        for size, stats in by_size.items():
+            base = baseline.get("results", {}).get(name, {}).get(size)
+            if not base:
+                continue
+            limit = overrides.get(name, threshold)
+            ratio = stats["median_s"] / max(base["median_s"], 1e-9)
+            flag = "REGRESSION" if ratio > limit else "ok"
+            print(f"  {name:<28} {int(size):>10,} rows  x{ratio:>6.2f}  (limit x{limit:.2f})  {flag}")
+            if ratio > limit:
+                regressions.append({"case": name, "size": int(size), "ratio": round(ratio, 3), "limit": limit})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PulseScore hot-path benchmarks")
+    parser.add_argument("--sizes", default="10000,100000", help="Comma-separated registry sizes")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", default="", help="Comma-separated case names to run")
+    parser.add_argument("--skip", default="", help="Comma-separated case names to skip")
+    parser.add_argument("--out", default=os.path.join(BENCH_DIR, "results.json"))
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Write these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Allowed slowdown ratio vs baseline")
+    parser.add_argument("--case-threshold", action="append", default=[], metavar="CASE=RATIO",
+                        help="Per-case slowdown ratio, e.g. finder_gps=1.5")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    only = {s for s in args.only.split(",") if s}
+    skip = {s for s in args.skip.split(",") if s}
+    overrides = {k: float(v) for k, v in (item.split("=", 1) for item in args.case_threshold)}
+
+    results = run(sizes, args.repeat, args.seed, only, skip)
+    report = {
+        "timestamp": pd.Timestamp.now().isoformat(timespec="seconds"),
+        "machine": {"platform": platform.platform(), "python": platform.python_version(), "pandas": pd.__version__},
+        "sizes": sizes,
+        "seed": args.seed,
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.out}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"Comparing against baseline from {baseline.get('timestamp', 'unknown')}")
+        regressions = compare(results, baseline, args.threshold, overrides)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over threshold")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
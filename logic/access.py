@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+import streamlit as st
+from scipy.spatial import cKDTree
+
+from logic.geo import EARTH_RADIUS_KM
+
+# ============================================================
+# ACCESS DISTANCE PRECOMPUTATION
+# ============================================================
+# Occupied grid cells of each district stand in for population points, weighted by the
+# number of facilities in the cell (the registry carries no settlement data)
+GRID_DEG = 0.1             # ~11 km cells
+ACCESS_TARGETS = {
+    "ICU": lambda df: df["has_icu"].to_numpy(dtype=bool),
+    "ER": lambda df: df["is_emergency"].to_numpy(dtype=bool),
+    "Tertiary": lambda df: (df["Care_Level_Clean"] == "Tertiary").to_numpy(),
+}
+ACCESS_QUANTILES = {"Median": 0.5, "P90": 0.9}
+
+# 2SFCA supply columns and the population unit each score is reported per
+CATCHMENT_KM = 30.0
+SUPPLY_COLUMNS = {"Beds": "Total_Num_Beds", "Doctors": "Number_Doctor", "ICU": "has_icu"}
+SUPPLY_PER = {"Beds": 1_000, "Doctors": 1_000, "ICU": 100_000}
+
+
+def unit_xyz(lat, lon):
+    # Points on the unit sphere, so Euclidean KD-tree neighbours are great-circle neighbours
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2, 0, 1))
+
+
+def km_to_chord(km):
+    return 2 * np.sin(np.asarray(km) / (2 * EARTH_RADIUS_KM))
+
+
+class FacilityIndex:
+    # KD-tree over facility coordinates; rows without coordinates are left out
+    def __init__(self, lat, lon):
+        lat, lon = np.asarray(lat, dtype=float), np.asarray(lon, dtype=float)
+        self.rows = np.flatnonzero(~(np.isnan(lat) | np.isnan(lon)))
+        self.tree = cKDTree(unit_xyz(lat[self.rows], lon[self.rows])) if len(self.rows) else None
+
+    def nearest_km(self, lat, lon):
+        if self.tree is None:
+            return np.full(len(lat), np.inf)
+        chord, _ = self.tree.query(unit_xyz(lat, lon), k=1, workers=-1)
+        return chord_to_km(chord)
+
+
+def population_points(df, sums=None):
+    # sums maps output names to columns totalled per cell (e.g. the supply at each point)
+    sums = sums or {}
+    valid = df["lat"].notna() & df["lon"].notna()
+    cells = df.loc[valid, ["State", "District", *sums.values()]].assign(
+        cell_lat=np.floor(df.loc[valid, "lat"].to_numpy() / GRID_DEG).astype(np.int64),
+        cell_lon=np.floor(df.loc[valid, "lon"].to_numpy() / GRID_DEG).astype(np.int64),
+    )
+    agg = {"Weight": ("State", "size"), **{name: (col, "sum") for name, col in sums.items()}}
+    points = cells.groupby(["State", "District", "cell_lat", "cell_lon"]).agg(**agg).reset_index()
+    points["lat"] = (points["cell_lat"] + 0.5) * GRID_DEG
+    points["lon"] = (points["cell_lon"] + 0.5) * GRID_DEG
+    return points.drop(columns=["cell_lat", "cell_lon"])
+
+
+def spread_population(points, df):
+    # Each state's population shared over its points in proportion to their weight
+    pop = df.groupby("State")["State_Population"].max()
+    state_weight = points.groupby("State")["Weight"].transform("sum")
+    return (points["State"].map(pop).fillna(0) * points["Weight"] / state_weight).to_numpy(dtype=float)
+
+
+def weighted_quantiles(values, weights, groups, q):
+    # Weighted q-quantile of values within each group (groups are integer codes)
+    order = np.lexsort((values, groups))
+    v, w, g = values[order], weights[order], groups[order]
+    cum = np.cumsum(w)
+    start = np.r_[0, np.flatnonzero(g[1:] != g[:-1]) + 1]
+    before = np.repeat(np.r_[0, cum[start[1:] - 1]], np.diff(np.r_[start, len(g)]))
+    total = np.repeat(np.add.reduceat(w, start), np.diff(np.r_[start, len(g)]))
+    reached = (cum - before) >= q * total
+    # First value in each group whose cumulative weight reaches the quantile
+    first = pd.Series(reached).groupby(g).idxmax().to_numpy()
+    return v[first]
+
+
+def compute_district_access(df):
+    # Median and P90 distance (km) from each district's population points to the nearest ICU,
+    # emergency and tertiary facility anywhere in the country
+    points = population_points(df)
+    out = points[["State", "District"]].drop_duplicates().sort_values(["State", "District"]).reset_index(drop=True)
+    if points.empty:
+        return out
+    groups = points.groupby(["State", "District"], sort=True).ngroup().to_numpy()
+    lat, lon, weight = points["lat"].to_numpy(), points["lon"].to_numpy(), points["Weight"].to_numpy(dtype=float)
+    for target, select in ACCESS_TARGETS.items():
+        mask = select(df)
+        index = FacilityIndex(df["lat"].to_numpy()[mask], df["lon"].to_numpy()[mask])
+        dist = index.nearest_km(lat, lon)
+        for label, q in ACCESS_QUANTILES.items():
+            out[f"{target}_Access_{label}_km"] = np.round(weighted_quantiles(dist, weight, groups, q), 1)
+    return out
+
+
+# ============================================================
+# TWO-STEP FLOATING CATCHMENT AREA (2SFCA)
+# ============================================================
+def gaussian_decay(dist, radius_km):
+    # 1 at the point itself, falling to 0 at the catchment edge
+    edge = np.exp(-0.5)
+    return np.where(dist <= radius_km, (np.exp(-0.5 * (dist / radius_km) ** 2) - edge) / (1 - edge), 0.0)
+
+
+def catchment_weights(lat, lon, radius_km):
+    # Symmetric sparse decay matrix between grid points within the catchment radius
+    tree = cKDTree(unit_xyz(lat, lon))
+    pairs = tree.query_pairs(km_to_chord(radius_km), output_type="ndarray")
+    i, j = pairs[:, 0], pairs[:, 1]
+    w = gaussian_decay(chord_to_km(np.linalg.norm(tree.data[i] - tree.data[j], axis=1)), radius_km)
+    n = len(lat)
+    rows = np.concatenate([i, j, np.arange(n)])
+    cols = np.concatenate([j, i, np.arange(n)])
+    return sp.csr_matrix((np.concatenate([w, w, np.ones(n)]), (rows, cols)), shape=(n, n))
+
+
+def compute_accessibility(df, radius_km=CATCHMENT_KM):
+    # Grid cells act as both supply sites (the facilities inside them) and demand points. Each
+    # state's population is spread over its cells by facility count, as for the access distances.
+    frame = df.assign(**{c: pd.to_numeric(df[c], errors="coerce").fillna(0).clip(lower=0) for c in SUPPLY_COLUMNS.values()})
+    points = population_points(frame, SUPPLY_COLUMNS)
+    keys = ["State", "District"]
+    if points.empty:
+        return pd.DataFrame(columns=keys)
+    demand = spread_population(points, df)
+
+    w = catchment_weights(points["lat"].to_numpy(), points["lon"].to_numpy(), radius_km)
+    supply = points[list(SUPPLY_COLUMNS)].to_numpy(dtype=float)
+    # Step 1: supply-to-demand ratio of each site's catchment; step 2: sum of reachable ratios
+    near_demand = w @ demand
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(near_demand[:, None] > 0, supply / near_demand[:, None], 0.0)
+    score = w @ ratio
+
+    # District score is the population-weighted mean of its points
+    cols = [f"{name}_per_{SUPPLY_PER[name] // 1000}k_2SFCA" for name in SUPPLY_COLUMNS]
+    weighted = pd.DataFrame(score * demand[:, None], columns=cols).assign(Pop=demand, State=points["State"], District=points["District"])
+    out = weighted.groupby(keys, sort=True).sum().reset_index()
+    for name, col in zip(SUPPLY_COLUMNS, cols):
+        out[col] = (out[col] / out["Pop"].where(out["Pop"] > 0) * SUPPLY_PER[name]).round(3)
+    return out.drop(columns="Pop")
+
+
+@st.cache_data(show_spinner="Computing catchment accessibility...", max_entries=8)
+def get_accessibility(fingerprint, radius_km, _df):
+    # One entry per dataset and catchment radius; the registry itself is not hashed
+    return compute_accessibility(_df, radius_km)
@@ -0,0 +1,139 @@
+import hashlib
+import os
+import shutil
+
+import pandas as pd
+import streamlit as st
+
+from logic import metrics
+from logic.population import population_key
+from logic.metrics import (aggregate_states, aggregate_districts, compute_state_capacity, summarize_kpis,
+                           compute_structural_deficits, compute_district_deficits)
+from logic.shared_data import CACHE_DIR, cache_path, write_arrow, read_arrow, arrow_to_frame
+
+# Bump when a table's definition changes so persisted copies are rebuilt
+AGGREGATE_FORMAT = 4
+AGGREGATES_DIR = os.path.join(CACHE_DIR, "aggregates")
+TABLES = ("state", "district", "state_category", "district_care", "state_capacity", "state_sds", "district_sds", "district_access", "district_centroids", "kpis")
+SUMMARY_COLUMNS = {"Hospitals": ("Total_Num_Beds", "size"), "Total_Beds": ("Total_Num_Beds", "sum"),
+                   "Total_Doctors": ("Number_Doctor", "sum"), "ICU_Count": ("has_icu", "sum"),
+                   "Emergency_Count": ("is_emergency", "sum")}
+
+
+def norms_key():
+    # The SDS tables depend on the benchmark norms and weights, so they are part of the key
+    # (as values, so editing a profile also invalidates the tables built under it), as does
+    # the district population table behind district_sds
+    norms = (metrics.BED_NORM, metrics.DOC_NORM, metrics.ICU_NORM, metrics.ER_NORM, tuple(metrics.COMPONENT_WEIGHTS), population_key(), AGGREGATE_FORMAT)
+    return hashlib.sha1(repr(norms).encode()).hexdigest()[:12]
+
+
+def build_aggregates(df, state_stats):
+    # Only needed when the tables are (re)built, so scipy stays off the cold-start path
+    from logic.access import compute_district_access
+    from logic.spillover import district_centroids
+    state_agg = aggregate_states(df)
+    dist_agg = aggregate_districts(df)
+    kpis = summarize_kpis(df, state_stats)
+    return {
+        "state": state_agg,
+        "district": dist_agg,
+        # NaN keys are kept so the tables can be re-rolled to any coarser grouping
+        "state_category": df.groupby(["State", "Admin_Type", "Hospital_Category"], dropna=False).agg(**SUMMARY_COLUMNS).reset_index(),
+        "district_care": df.groupby(["State", "District", "Hospital_Care_Type", "Care_Level_Clean"], dropna=False).agg(**SUMMARY_COLUMNS).reset_index(),
+        "state_capacity": compute_state_capacity(df, state_stats),
+        "state_sds": compute_structural_deficits(state_agg),
+        "district_sds": compute_district_deficits(state_agg, dist_agg),
+        "district_access": compute_district_access(df),
+        "district_centroids": district_centroids(df),
+        "kpis": pd.DataFrame([kpis]),
+    }
+
+
+class MaterializedAggregates:
+    # Unfiltered rollups of one dataset, answered without touching row-level data
+    def __init__(self, tables, key):
+        self.tables = tables
+        self.key = key
+
+    def table(self, name):
+        return self.tables[name].copy()
+
+    def kpis(self):
+        row = self.tables["kpis"].iloc[0]
+        return {k: (float(v) if k.endswith("_percent") or k == "total_population" else int(v)) for k, v in row.items()}
+
+    def count_by(self, keys):
+        keys = list(keys)
+        for name in ("state_category", "district_care"):
+            table = self.tables[name]
+            if set(keys) <= set(table.columns):
+                return table.groupby(keys)["Hospitals"].sum().reset_index(name="Count")
+        return None
+
+    def unique(self, column, **where):
+        # Sorted distinct values of a column, optionally restricted with column=[values]
+        for name in ("state_category", "district_care"):
+            table = self.tables[name]
+            if column in table.columns and set(where) <= set(table.columns):
+                for key, values in where.items():
+                    table = table[table[key].isin(values)]
+                return sorted(table[column].dropna().unique())
+        return []
+
+
+def aggregates_path(fingerprint, key=None):
+    return os.path.join(AGGREGATES_DIR, f"{fingerprint}_{key or norms_key()}")
+
+
+def _read_tables(path):
+    return {n: arrow_to_frame(read_arrow(os.path.join(path, f"{n}.arrow"))) for n in TABLES}
+
+
+def _complete(path):
+    return all(os.path.exists(os.path.join(path, f"{n}.arrow")) for n in TABLES)
+
+
+def prune_aggregates(fingerprint, path):
+    # Tables built under other norms for this dataset are stale, and so are those of datasets
+    # whose registry copy has left the disk cache (an edited CSV or an evicted upload)
+    for other in os.listdir(AGGREGATES_DIR):
+        if other == os.path.basename(path) or other.endswith(".tmp"):
+            continue
+        other_fp = other.split("_", 1)[0]
+        if other_fp == fingerprint or not os.path.exists(cache_path(other_fp, "registry")):
+            shutil.rmtree(os.path.join(AGGREGATES_DIR, other), ignore_errors=True)
+
+
+def load_aggregates(fingerprint, df, state_stats):
+    key = norms_key()
+    path = aggregates_path(fingerprint, key)
+    if _complete(path):
+        return MaterializedAggregates(_read_tables(path), key)
+
+    tables = build_aggregates(df, state_stats)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    for name, table in tables.items():
+        write_arrow(table, os.path.join(tmp, f"{name}.arrow"))
+    shutil.rmtree(path, ignore_errors=True)
+    try:
+        os.replace(tmp, path)
+    except OSError:
+        # Another worker published the same tables between the rmtree and the rename; use its copy
+        shutil.rmtree(tmp, ignore_errors=True)
+        if _complete(path):
+            return MaterializedAggregates(_read_tables(path), key)
+        return MaterializedAggregates(tables, key)
+    prune_aggregates(fingerprint, path)
+    return MaterializedAggregates(tables, key)
+
+
+@st.cache_resource(show_spinner="Preparing aggregates...")
+def get_aggregates(fingerprint, norms, _df, _state_stats):
+    return load_aggregates(fingerprint, _df, _state_stats)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def get_district_deficits(fingerprint, norms, filters, _scope):
+    # One entry per dataset, norms and filter combination; the scope itself is not hashed
+    return _scope.build_district_deficits()
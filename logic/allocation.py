@@ -0,0 +1,63 @@
+import heapq
+
+import numpy as np
+
+from logic.metrics import COMPONENT_WEIGHTS
+
+# ============================================================
+# ALLOCATION PARAMETERS
+# ============================================================
+# Resource -> (SRI stress column, available column, index into COMPONENT_WEIGHTS)
+ALLOCATABLE = {"Beds": ("Stress_B", "Avail_Beds", 0), "Doctors": ("Stress_D", "Avail_Docs", 1), "ICU": ("Stress_I", "Avail_ICU", 2)}
+# Only SRI above this level counts as risk; capacity added to a stable district buys nothing
+RISK_FLOOR = 1.0
+# Large budgets are handed out in blocks so the heap loop stays around this many steps
+MAX_STEPS = 10_000
+
+
+def district_risk(sri):
+    return np.clip(sri - RISK_FLOOR, 0, None)
+
+
+def allocate_capacity(dist_sri, resource, budget, E, step=None):
+    # Greedy marginal-gain allocation of `budget` extra units of one resource, `step` units at a time.
+    # A district's surge requirement is fixed, so each unit only lowers that district's stress, with
+    # diminishing returns: the heap holds each district's next-step gain and only the district that
+    # received units is re-scored.
+    step = step or max(1, -(-int(budget) // MAX_STEPS))
+    stress_col, avail_col, w_idx = ALLOCATABLE[resource]
+    weight = COMPONENT_WEIGHTS[w_idx]
+    avail = dist_sri[avail_col].to_numpy(dtype=float)
+    stress = dist_sri[stress_col].to_numpy(dtype=float)
+    # Surge requirement behind the stress, and the SRI contributed by the other components
+    load = stress * np.clip(avail, 1, None) * E
+    other = sum(w * dist_sri[c].to_numpy(dtype=float) for c, w in zip(("Stress_B", "Stress_D", "Stress_I", "Stress_E"), COMPONENT_WEIGHTS) if c != stress_col)
+
+    def sri_at(i, added):
+        return other[i] + weight * load[i] / (max(avail[i] + added, 1) * E)
+
+    def gain(i, added):
+        return district_risk(sri_at(i, added)) - district_risk(sri_at(i, added + step))
+
+    added = np.zeros(len(dist_sri))
+    heap = [(-g, i) for i in range(len(dist_sri)) if (g := gain(i, 0)) > 0]
+    heapq.heapify(heap)
+    remaining = int(budget)
+    while heap and remaining >= step:
+        _, i = heapq.heappop(heap)
+        added[i] += step
+        remaining -= step
+        g = gain(i, added[i])
+        if g > 0:
+            heapq.heappush(heap, (-g, i))
+
+    new_stress = load / (np.clip(avail + added, 1, None) * E)
+    out = dist_sri[["State", "District", avail_col, "SRI"]].rename(columns={avail_col: "Available", "SRI": "SRI_Before"})
+    out["Units_Added"] = added.astype(np.int64)
+    out["SRI_After"] = (other + weight * new_stress).round(3)
+    out["Risk_Reduction"] = (district_risk(out["SRI_Before"]) - district_risk(out["SRI_After"])).round(3)
+    plan = out[out["Units_Added"] > 0].sort_values("Units_Added", ascending=False, ignore_index=True)
+    summary = {"allocated": int(added.sum()), "unused": remaining,
+               "risk_before": float(district_risk(out["SRI_Before"]).sum()), "risk_after": float(district_risk(out["SRI_After"]).sum()),
+               "high_risk_before": int((out["SRI_Before"] > 1.2).sum()), "high_risk_after": int((out["SRI_After"] > 1.2).sum())}
+    return {"plan": plan, "districts": out, "summary": summary}
@@ -0,0 +1,341 @@
+import copy
+import os
+import threading
+
+import streamlit as st
+
+from logic.aggregates import get_aggregates, get_district_deficits, norms_key
+from logic.core import DEFAULT_DATASET_PATH, UTS_LIST, apply_filters
+from logic.metrics import (aggregate_states, aggregate_districts, compute_state_capacity, summarize_kpis,
+                           compute_district_deficits, compute_equity, equity_shares, count_by)
+from logic.shared_data import CACHE_DIR, source_fingerprint
+from logic.stability import bootstrap_ranks, get_rank_stability
+
+# Select with PULSESCORE_BACKEND=pandas|duckdb. Only the row-level rollups run on the
+# backend; deficits, SRI and rankings are derived from the (small) rollup tables.
+BACKEND = os.environ.get("PULSESCORE_BACKEND", "pandas").lower()
+DUCKDB_THREADS = os.environ.get("PULSESCORE_DUCKDB_THREADS")
+DUCKDB_MEMORY = os.environ.get("PULSESCORE_DUCKDB_MEMORY")
+
+
+def has_filters(filters):
+    return any((v != "All") if isinstance(v, str) else bool(v) for v in filters.values())
+
+
+class Scope:
+    # A filtered view of the registry as seen by the pages; every rollup goes through here.
+    # The unfiltered view is answered from the materialized aggregates when available.
+    def __init__(self, backend, filters, selection, materialized=None):
+        self.backend = backend
+        self.filters = filters
+        self.selection = selection
+        self.materialized = None if has_filters(filters) else materialized
+
+    def aggregate_states(self):
+        if self.materialized:
+            return self.materialized.table("state")
+        return self.backend.aggregate_states(self.selection)
+
+    def aggregate_districts(self):
+        if self.materialized:
+            return self.materialized.table("district")
+        return self.backend.aggregate_districts(self.selection)
+
+    def state_capacity(self):
+        if self.materialized:
+            return self.materialized.table("state_capacity")
+        return self.backend.state_capacity(self.selection)
+
+    def kpis(self):
+        if self.materialized:
+            return self.materialized.kpis()
+        return self.backend.kpis(self.selection)
+
+    def district_deficits(self):
+        # District SDS on district populations split from the unfiltered registry, so a
+        # filter changes the capacity counted but not the population it has to serve
+        if self.materialized:
+            return self.materialized.table("district_sds")
+        if self.backend.fingerprint is None:
+            return self.build_district_deficits()
+        return get_district_deficits(self.backend.fingerprint, norms_key(), repr(sorted(self.filters.items())), self)
+
+    def build_district_deficits(self):
+        tables = self.backend.materialized
+        weights = tables.table("district") if tables else None
+        return compute_district_deficits(self.aggregate_states(), self.aggregate_districts(), weights)
+
+    def rank_stability(self, level, reps):
+        # Bootstrap resamples facilities, so it needs the row-level registry
+        if self.backend.registry is None:
+            return None
+        return get_rank_stability(self.backend.fingerprint, norms_key(), repr(sorted(self.filters.items())), level, reps, self)
+
+    def build_rank_stability(self, level, reps):
+        tables = self.backend.materialized
+        frame = apply_filters(self.backend.registry, **self.filters)
+        return bootstrap_ranks(frame, level, reps, tables.table("district") if tables else None)
+
+    def district_access(self):
+        # Distances are to the nearest facility in the whole registry, so the unfiltered table
+        # serves filtered views too; pages merge it onto their own district rollup
+        tables = self.backend.materialized
+        return tables.table("district_access") if tables else None
+
+    def district_centroids(self):
+        tables = self.backend.materialized
+        return tables.table("district_centroids") if tables else None
+
+    def accessibility(self, radius_km):
+        # 2SFCA catchments cross every filter, so scores come from the whole registry
+        if self.backend.registry is None:
+            return None
+        # scipy-backed modules load on first use, off the cold-start path
+        from logic.access import get_accessibility
+        return get_accessibility(self.backend.fingerprint, radius_km, self.backend.registry)
+
+    def site_plan(self, service, source, n, radius_km):
+        # Sites are chosen within the states in view; existing coverage counts the whole registry
+        if self.backend.registry is None:
+            return None
+        states = tuple(sorted(self.aggregate_states()["State"])) if has_filters(self.filters) else None
+        from logic.siting import get_site_plan
+        return get_site_plan(self.backend.fingerprint, service, source, n, radius_km, states, self.backend.registry)
+
+    def equity(self, by=("State",)):
+        return self.backend.equity(self.selection, by)
+
+    def count_by(self, keys):
+        counts = self.materialized.count_by(keys) if self.materialized else None
+        return counts if counts is not None else self.backend.count_by(self.selection, keys)
+
+    def value_counts(self, column):
+        return self.count_by([column]).set_index(column)["Count"].sort_values(ascending=False, kind="stable")
+
+
+# ============================================================
+# PANDAS (IN-MEMORY)
+# ============================================================
+class PandasBackend:
+    name = "pandas"
+
+    def __init__(self, df, state_stats):
+        self.df = df
+        self.state_stats = state_stats
+        self.materialized = None
+        self.fingerprint = self.registry = None
+
+    def scope(self, filters=None, frame=None):
+        filters = dict(filters or {})
+        return Scope(self, filters, frame if frame is not None else apply_filters(self.df, **filters), self.materialized)
+
+    def aggregate_states(self, frame):
+        return aggregate_states(frame)
+
+    def aggregate_districts(self, frame):
+        return aggregate_districts(frame)
+
+    def state_capacity(self, frame):
+        return compute_state_capacity(frame, self.state_stats)
+
+    def kpis(self, frame):
+        return summarize_kpis(frame, self.state_stats)
+
+    def equity(self, frame, by):
+        return compute_equity(frame, by)
+
+    def count_by(self, frame, keys):
+        return count_by(frame, keys)
+
+
+# ============================================================
+# DUCKDB (OUT-OF-CORE OVER PARQUET)
+# ============================================================
+def _in_list(column, values, params):
+    params.extend(values)
+    return f'"{column}" IN ({", ".join("?" for _ in values)})'
+
+
+def where_clause(filters):
+    # Same semantics as core.apply_filters, as a parameterised predicate
+    clauses, params = [], []
+    for key, column in [("states", "State"), ("uts", "State"), ("districts", "District"),
+                        ("categories", "Hospital_Category"), ("care_types", "Hospital_Care_Type")]:
+        if filters.get(key):
+            clauses.append(_in_list(column, list(filters[key]), params))
+    for key, column in [("icu", "has_icu"), ("emergency", "is_emergency")]:
+        if filters.get(key, "All") != "All":
+            clauses.append(f'"{column}" = ?')
+            params.append(filters[key] == "Yes")
+    if filters.get("outliers", "All") == "Exclude":
+        clauses.append('NOT "is_outlier"')
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+class DuckDBBackend:
+    name = "duckdb"
+
+    def __init__(self, source, threads=DUCKDB_THREADS, memory_limit=DUCKDB_MEMORY):
+        import duckdb
+        self.source = source
+        self.con = duckdb.connect()
+        if threads:
+            self.con.execute(f"SET threads = {int(threads)}")
+        if memory_limit:
+            self.con.execute(f"SET memory_limit = '{memory_limit}'")
+        self.con.execute(f"SET temp_directory = '{os.path.join(CACHE_DIR, 'duckdb_tmp')}'")
+        self._local = threading.local()
+        self.materialized = None
+        self.fingerprint = self.registry = None
+        self._create_view()
+
+    def _create_view(self):
+        # Works on the enriched cache export as well as a raw registry Parquet file;
+        # derived columns missing from the file are computed the way load_data does
+        scan = f"read_parquet('{self.source}')"
+        columns = {row[0]: row[1] for row in self.con.execute(f"DESCRIBE SELECT * FROM {scan}").fetchall()}
+        derived = []
+        if "has_icu" not in columns:
+            derived.append("coalesce(contains(lower(\"Facilities\"), 'icu'), false) AS has_icu" if "Facilities" in columns else "false AS has_icu")
+        if "is_emergency" not in columns:
+            derived.append("coalesce(lower(\"Emergency_Services\") = 'yes', false) AS is_emergency" if "Emergency_Services" in columns else "false AS is_emergency")
+        if "Admin_Type" not in columns:
+            uts = ", ".join("'" + s.replace("'", "''") + "'" for s in UTS_LIST)
+            derived.append(f"CASE WHEN trim(\"State\") IN ({uts}) THEN 'Union Territory' ELSE 'State' END AS Admin_Type")
+        if "Care_Level_Clean" not in columns:
+            derived.append("""CASE WHEN lower("Hospital_Care_Type") LIKE '%primary%' THEN 'Primary'
+                                   WHEN lower("Hospital_Care_Type") LIKE '%secondary%' THEN 'Secondary'
+                                   WHEN lower("Hospital_Care_Type") LIKE '%tertiary%' OR lower("Hospital_Care_Type") LIKE '%super%' THEN 'Tertiary'
+                                   ELSE 'Unclassified' END AS Care_Level_Clean""" if "Hospital_Care_Type" in columns else "'Unclassified' AS Care_Level_Clean")
+        if "is_outlier" not in columns:
+            # Outlier flags need peer-group statistics and are only present in the enriched export
+            derived.append("false AS is_outlier")
+        select = "* REPLACE (trim(\"State\") AS \"State\")" + "".join(", " + d for d in derived)
+        self.con.execute(f"CREATE OR REPLACE VIEW registry AS SELECT {select} FROM {scan}")
+        self.int_columns = {c for c, t in columns.items() if t in ("TINYINT", "SMALLINT", "INTEGER", "BIGINT")}
+
+    def _cursor(self):
+        # DuckDB connections are not shared across threads; each Streamlit thread gets its own cursor
+        if getattr(self._local, "cursor", None) is None:
+            self._local.cursor = self.con.cursor()
+        return self._local.cursor
+
+    def query(self, sql, params=()):
+        return self._cursor().execute(sql, list(params)).fetch_arrow_table().to_pandas()
+
+    def _sum(self, column, alias):
+        cast = "::BIGINT" if column in self.int_columns else ""
+        return f'SUM("{column}"){cast} AS "{alias}"'
+
+    def scope(self, filters=None, frame=None):
+        filters = dict(filters or {})
+        return Scope(self, filters, where_clause(filters), self.materialized)
+
+    def aggregate_states(self, selection):
+        where, params = selection
+        return self.query(f"""
+            SELECT "State", {self._sum("Total_Num_Beds", "Total_Beds")}, {self._sum("Number_Doctor", "Total_Doctors")},
+                   SUM(has_icu::BIGINT)::BIGINT AS Total_ICU, SUM(is_emergency::BIGINT)::BIGINT AS Total_Emergency,
+                   MAX("State_Population") AS State_Pop
+            FROM (SELECT * FROM registry{where}) WHERE "State" IS NOT NULL
+            GROUP BY "State" ORDER BY "State"
+            """, params)
+
+    def aggregate_districts(self, selection):
+        where, params = selection
+        return self.query(f"""
+            SELECT "State", "District", {self._sum("Total_Num_Beds", "Total_Beds")}, {self._sum("Number_Doctor", "Total_Doctors")},
+                   SUM(has_icu::BIGINT)::BIGINT AS ICU_Count, SUM(is_emergency::BIGINT)::BIGINT AS Emergency_Count, COUNT(*) AS Hospitals
+            FROM (SELECT * FROM registry{where}) WHERE "State" IS NOT NULL AND "District" IS NOT NULL
+            GROUP BY "State", "District" ORDER BY "State", "District"
+            """, params)
+
+    def state_capacity(self, selection):
+        where, params = selection
+        return self.query(f"""
+            WITH pop AS (SELECT "State", FIRST("State_Population") AS "State_Population" FROM registry GROUP BY "State")
+            SELECT f."State", f."Total_Num_Beds", f."Number_Doctor", pop."State_Population"
+            FROM (SELECT "State", {self._sum("Total_Num_Beds", "Total_Num_Beds")}, {self._sum("Number_Doctor", "Number_Doctor")}
+                  FROM (SELECT * FROM registry{where}) WHERE "State" IS NOT NULL GROUP BY "State") f
+            JOIN pop USING ("State") ORDER BY f."State"
+            """, params)
+
+    def kpis(self, selection):
+        where, params = selection
+        row = self.query(f"""
+            WITH f AS (SELECT * FROM registry{where}),
+                 pop AS (SELECT "State", FIRST("State_Population") AS p FROM registry GROUP BY "State")
+            SELECT COUNT(*) AS total_hospitals,
+                   COALESCE(SUM("Total_Num_Beds"), 0)::BIGINT AS total_beds,
+                   COALESCE(SUM("Number_Doctor"), 0)::BIGINT AS total_doctors,
+                   COUNT(DISTINCT CASE WHEN "Admin_Type" = 'State' THEN "State" END) AS distinct_states,
+                   COUNT(DISTINCT CASE WHEN "Admin_Type" = 'Union Territory' THEN "State" END) AS distinct_uts,
+                   (SELECT COALESCE(SUM(p), 0) FROM pop WHERE "State" IN (SELECT "State" FROM f)) AS total_population,
+                   COALESCE(SUM(has_icu::BIGINT)::BIGINT, 0) AS icu_facilities,
+                   COALESCE(SUM(is_emergency::BIGINT)::BIGINT, 0) AS emergency_facilities
+            FROM f""", params).iloc[0]
+        total = int(row["total_hospitals"])
+        return {
+            "total_hospitals": total,
+            "total_beds": int(row["total_beds"]),
+            "total_doctors": int(row["total_doctors"]),
+            "distinct_states": int(row["distinct_states"]),
+            "distinct_uts": int(row["distinct_uts"]),
+            "total_population": float(row["total_population"]),
+            "icu_percent": (row["icu_facilities"] / total * 100) if total > 0 else 0,
+            "emergency_percent": (row["emergency_facilities"] / total * 100) if total > 0 else 0,
+            "icu_facilities": int(row["icu_facilities"]),
+            "emergency_facilities": int(row["emergency_facilities"]),
+        }
+
+    def equity(self, selection, by):
+        where, params = selection
+        keys = ", ".join(f'"{k}"' for k in by)
+        out = self.query(f"""
+            SELECT {keys}, {self._sum("Total_Num_Beds", "Total_Num_Beds")},
+                   {self._sum("Num_Bed_For_Eco_Weaker_Sec", "Num_Bed_For_Eco_Weaker_Sec")},
+                   COUNT(*) AS Hospitals,
+                   SUM(COALESCE(regexp_matches("Hospital_Category", 'Govt|Public', 'i'), false)::BIGINT)::BIGINT AS Public_Hospitals
+            FROM (SELECT * FROM registry{where}) WHERE {" AND ".join(f'"{k}" IS NOT NULL' for k in by)}
+            GROUP BY {keys} ORDER BY {keys}""", params)
+        return equity_shares(out)
+
+    def count_by(self, selection, keys):
+        where, params = selection
+        cols = ", ".join(f'"{k}"' for k in keys)
+        return self.query(f"""
+            SELECT {cols}, COUNT(*) AS "Count" FROM (SELECT * FROM registry{where})
+            WHERE {" AND ".join(f'"{k}" IS NOT NULL' for k in keys)}
+            GROUP BY {cols} ORDER BY {cols}""", params)
+
+
+# ============================================================
+# SELECTION
+# ============================================================
+@st.cache_resource(show_spinner=False)
+def _duckdb_backend(fingerprint, _df):
+    # The app's DuckDB source is a Parquet export of the shared enriched registry
+    path = os.path.join(CACHE_DIR, f"registry_{fingerprint}.parquet")
+    if not os.path.exists(path):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        _df.to_parquet(tmp, engine="pyarrow", index=False)
+        os.replace(tmp, path)
+    return DuckDBBackend(path)
+
+
+def get_backend(df, state_stats, source=None, kind=None, materialized=True):
+    # source is what load_data was called with (upload, path or None for the bundled dataset)
+    kind = (kind or BACKEND).lower()
+    fingerprint = source_fingerprint(source if source is not None else DEFAULT_DATASET_PATH)
+    if kind == "duckdb":
+        # The connection and view are cached and shared by every session; each call gets its own
+        # shallow copy, so the fields set below never leak into other sessions
+        backend = copy.copy(_duckdb_backend(fingerprint, df))
+    elif kind == "pandas":
+        backend = PandasBackend(df, state_stats)
+    else:
+        raise ValueError(f"Unknown backend '{kind}' (expected pandas or duckdb)")
+    backend.fingerprint, backend.registry = fingerprint, df
+    backend.materialized = get_aggregates(fingerprint, norms_key(), df, state_stats) if materialized else None
+    return backend
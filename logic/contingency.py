@@ -0,0 +1,54 @@
+import numpy as np
+
+from logic.geo import nearest_facilities
+from logic.metrics import COMPONENT_WEIGHTS
+
+# ============================================================
+# CONTINGENCY PARAMETERS
+# ============================================================
+CONTINGENCY_MODES = ("Largest hospitals", "Disaster radius")
+# SRI component -> (district available column, facility column)
+LOSS_COLUMNS = {"B": ("Avail_Beds", "Total_Num_Beds"), "D": ("Avail_Docs", "Number_Doctor"),
+                "I": ("Avail_ICU", "has_icu"), "E": ("Avail_ER", "is_emergency")}
+KEYS = ["State", "District"]
+
+
+def _district_losses(offline):
+    # Capacity taken offline per district
+    agg = {f"Lost_{code}": (col, "sum") for code, (_, col) in LOSS_COLUMNS.items()}
+    return offline.groupby(KEYS).agg(Offline_Facilities=("Total_Num_Beds", "size"), **agg).reset_index()
+
+
+def largest_facility_losses(df, k=1):
+    # The k largest hospitals (by beds) of every district go offline at once
+    top = df.sort_values("Total_Num_Beds", ascending=False, kind="stable").groupby(KEYS, sort=False).head(k)
+    losses = _district_losses(top)
+    largest = top.groupby(KEYS, sort=False)["Hospital_Name"].first().rename("Largest_Facility").reset_index()
+    return losses.merge(largest, on=KEYS, how="left")
+
+
+def radius_losses(df, lat, lon, radius_km):
+    # Every facility within radius_km of a disaster point goes offline
+    idx, _ = nearest_facilities(df, lat, lon, radius_km)
+    return _district_losses(df.iloc[idx])
+
+
+def apply_outage(dist_sri, losses, E):
+    # District surge requirements stay as they are; only the available capacity shrinks.
+    # Each SRI stress is rescaled from the subtracted aggregates, for all districts in one pass.
+    out = dist_sri.merge(losses, on=KEYS, how="left")
+    lost_cols = ["Offline_Facilities"] + [f"Lost_{code}" for code in LOSS_COLUMNS]
+    out[lost_cols] = out[lost_cols].fillna(0)
+    sri = 0.0
+    for weight, (code, (avail, _)) in zip(COMPONENT_WEIGHTS, LOSS_COLUMNS.items()):
+        capacity = out[avail].to_numpy(dtype=float)
+        load = out[f"Stress_{code}"].to_numpy(dtype=float) * np.clip(capacity, 1, None) * E
+        remaining = capacity - out[f"Lost_{code}"].to_numpy(dtype=float)
+        out[f"Stress_{code}_Outage"] = load / (np.clip(remaining, 1, None) * E)
+        sri = sri + weight * out[f"Stress_{code}_Outage"]
+    out["SRI_Outage"] = np.round(sri, 3)
+    out["SRI_Increase"] = (out["SRI_Outage"] - out["SRI"]).round(3)
+    out["Beds_Lost_Percent"] = (out["Lost_B"] / out["Avail_Beds"].clip(lower=1) * 100).round(1)
+    # Rank 1 is the least resilient district: the largest SRI jump when the outage hits
+    out["Resilience_Rank"] = out["SRI_Increase"].rank(ascending=False, method="min").astype(int)
+    return out.sort_values("Resilience_Rank", ignore_index=True)
@@ -1,32 +1,69 @@
 import streamlit as st
 import pandas as pd
-from plotly import graph_objects as go
-from fpdf import FPDF
-import plotly.io as pio
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 import os
 import io
+from logic.outliers import score_outliers
+from logic.shared_data import (source_fingerprint, open_shared, clear_disk_cache, cache_path, write_arrow, read_arrow,
+                               arrow_to_frame, DEDUP_ON_LOAD)
 
-@st.cache_data
-def load_data(uploaded_file=None):
-  
-    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    default_dataset_path = os.path.join(base_path, "dataset", "India_Healthcare_Final_GeoPreserved.csv")
-    
-    if uploaded_file is not None:
-        try: df = pd.read_csv(uploaded_file)
-        except: df = pd.read_csv(default_dataset_path)
-    else:
-        df = pd.read_csv(default_dataset_path)
-    
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DATASET_PATH = os.path.join(BASE_PATH, "dataset", "India_Healthcare_Final_GeoPreserved.csv")
+UTS_LIST = ["Andaman And Nicobar Islands", "Chandigarh", "Dadra And Nagar Haveli", "Daman And Diu", "Delhi", "Jammu And Kashmir", "Lakshadweep", "Puducherry"]
+
+# Columns the ingest pipeline cannot do without; the rest are optional
+REQUIRED_COLUMNS = ["Hospital_Name", "State", "District", "Pincode", "Total_Num_Beds", "Number_Doctor", "State_Population"]
+
+def read_registry(source):
+    # A file that is not a registry is an error for the caller to show; it is never swapped for
+    # the bundled dataset, which would then be cached under the upload's fingerprint
+    try:
+        df = pd.read_csv(source)
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+        raise ValueError(f"Could not read the registry CSV: {e}") from e
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Registry CSV is missing columns: {', '.join(missing)}")
+    return df
+
+# Columns added by enrich_registry on top of the raw extract
+DERIVED_COLUMNS = ["Admin_Type", "lat", "lon", "has_icu", "is_emergency", "Care_Level_Clean", "is_outlier", "Outlier_Reason"]
+
+# Columns that identify one facility across registry extracts
+FACILITY_KEY = ["Hospital_Name", "State", "District", "Pincode"]
+
+def _key_text(col):
+    # 410334, 410334.0 and " 410334" are the same pincode whichever dtype the extract was read with
+    if pd.api.types.is_numeric_dtype(col):
+        # Arrow formats whole floats without the ".0" and is much faster than astype(str)
+        col = pd.Series(pc.cast(pa.array(col.astype("float64")), pa.string()), index=col.index, dtype="str")
+    return col.astype(str).str.strip().str.lower()
+
+def facility_ids(df):
+    # Stable 64-bit id per facility from its normalized key; repeated keys within one
+    # extract are told apart by order of appearance
+    key = pd.DataFrame({c: _key_text(df[c]) for c in FACILITY_KEY if c in df.columns})
+    ids = pd.util.hash_pandas_object(key, index=False, categorize=False).to_numpy()
+    occurrence = pd.Series(ids).groupby(ids).cumcount().to_numpy().astype(np.uint64)
+    return ids ^ (occurrence * np.uint64(0x9E3779B97F4A7C15))
+
+def split_coordinates(col):
+    # "lat, lon" text -> two float columns; anything unparseable becomes NaN
+    col = col.astype(str)
+    col = col.where(col.str.contains(",", regex=False))
+    lat = pd.to_numeric(col.str.replace(r",.*$", "", regex=True), errors="coerce")
+    lon = pd.to_numeric(col.str.replace(r"^[^,]*,", "", regex=True).str.replace(r",.*$", "", regex=True), errors="coerce")
+    return lat, lon
+
+def enrich_registry(df):
     df["State"] = df["State"].str.strip()
     
-    uts_list = ["Andaman And Nicobar Islands", "Chandigarh", "Dadra And Nagar Haveli", "Daman And Diu", "Delhi", "Jammu And Kashmir", "Lakshadweep", "Puducherry"]
-    df["Admin_Type"] = df["State"].apply(lambda x: "Union Territory" if x in uts_list else "State")
+    df["Admin_Type"] = df["State"].apply(lambda x: "Union Territory" if x in UTS_LIST else "State")
     
     if "Location_Coordinates" in df.columns:
-        coords = df["Location_Coordinates"].str.split(",", expand=True)
-        df["lat"] = pd.to_numeric(coords[0], errors="coerce")
-        df["lon"] = pd.to_numeric(coords[1], errors="coerce")
+        df["lat"], df["lon"] = split_coordinates(df["Location_Coordinates"])
     
     if "Facilities" in df.columns:
         df["has_icu"] = df["Facilities"].fillna("").str.contains("ICU", case=False)
@@ -51,6 +88,11 @@ def load_data(uploaded_file=None):
     else:
         df["Care_Level_Clean"] = "Unclassified"
     
+    # Capacity outliers against district/care-level peers; pages can exclude them through apply_filters
+    flags = score_outliers(df)
+    df["is_outlier"] = flags["is_outlier"].to_numpy()
+    df["Outlier_Reason"] = flags["Outlier_Reason"].astype(str).to_numpy()
+
     state_stats = df.groupby("State").agg({"State_Population": "first", "Total_Num_Beds": "sum"}).reset_index()
     
     state_areas = {"Andhra Pradesh": 162970, "Arunachal Pradesh": 83743, "Assam": 78438, "Bihar": 94163, "Chhattisgarh": 135191, "Gujarat": 196024, "Haryana": 44212, "Himachal Pradesh": 55673, "Jharkhand": 79714, "Karnataka": 191791, "Kerala": 38863, "Madhya Pradesh": 308245, "Maharashtra": 307713, "Manipur": 22327, "Meghalaya": 22429, "Mizoram": 21081, "Nagaland": 16579, "Odisha": 155707, "Punjab": 50362, "Rajasthan": 342239, "Sikkim": 7096, "Tamil Nadu": 130058, "Telangana": 112077, "Tripura": 10486, "Uttar Pradesh": 240928, "Uttarakhand": 53483, "West Bengal": 88752, "Andaman And Nicobar Islands": 8249, "Chandigarh": 114, "Dadra And Nagar Haveli": 491, "Daman And Diu": 112, "Delhi": 1484, "Jammu And Kashmir": 42241}
@@ -59,7 +101,70 @@ def load_data(uploaded_file=None):
     
     return df, state_stats
 
+# ============================================================
+# SHARED DATASET
+# ============================================================
+def build_registry(source, report_path=None):
+    # Ingest pipeline: read, merge duplicate facilities, enrich
+    df = read_registry(source)
+    if DEDUP_ON_LOAD:
+        from logic.dedup import deduplicate_registry
+        df, report = deduplicate_registry(df)
+        if report_path:
+            write_arrow(report, report_path)
+    return enrich_registry(df)
+
+@st.cache_resource(show_spinner="Loading registry...")
+def _shared_registry(fingerprint, _source):
+    # One memory-mapped Arrow copy per source for the whole process; other worker
+    # processes map the same file from the on-disk cache instead of re-parsing the CSV
+    return open_shared(fingerprint, lambda: build_registry(_source, cache_path(fingerprint, "duplicates")))
+
+def load_data(uploaded_file=None):
+    source = uploaded_file if uploaded_file is not None else DEFAULT_DATASET_PATH
+    df, state_stats = _shared_registry(source_fingerprint(source), source)
+    # Shallow copies: callers may add columns, the mapped buffers themselves are read-only
+    return df.copy(deep=False), state_stats.copy(deep=False)
+
+def load_duplicate_report(uploaded_file=None):
+    # Records merged by the de-duplication stage of the last load_data for this source
+    source = uploaded_file if uploaded_file is not None else DEFAULT_DATASET_PATH
+    path = cache_path(source_fingerprint(source), "duplicates")
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=["Cluster", "Action", "Row"])
+    return arrow_to_frame(read_arrow(path))
+
+def clear_data_cache(disk=False):
+    _shared_registry.clear()
+    if disk:
+        # The DuckDB backend and the materialized aggregates read files under the disk cache,
+        # so their resource caches go with it (imported here: both modules import this one)
+        from logic.aggregates import get_aggregates
+        from logic.backend import _duckdb_backend
+        _duckdb_backend.clear()
+        get_aggregates.clear()
+        clear_disk_cache()
+
+def apply_filters(df, states=(), uts=(), districts=(), categories=(), care_types=(), icu="All", emergency="All", outliers="All"):
+    # Build one mask and take a single row subset; with no filters the shared frame is passed through as a view
+    mask = None
+    def narrow(cond):
+        nonlocal mask
+        mask = cond if mask is None else mask & cond
+    if states: narrow(df['State'].isin(states))
+    if uts: narrow(df['State'].isin(uts))
+    if districts: narrow(df['District'].isin(districts))
+    if categories: narrow(df['Hospital_Category'].isin(categories))
+    if care_types: narrow(df['Hospital_Care_Type'].isin(care_types))
+    if icu != "All": narrow(df['has_icu'] == (icu == "Yes"))
+    if emergency != "All": narrow(df['is_emergency'] == (emergency == "Yes"))
+    if outliers == "Exclude": narrow(~df['is_outlier'])
+    return df.copy(deep=False) if mask is None else df[mask]
+
 def create_pdf_report(title, kpi_data, charts=None):
+    # fpdf and plotly.io/kaleido are only needed once a report is requested
+    from fpdf import FPDF
+    import plotly.io as pio
     pdf = FPDF()
     pdf.add_page()
     pdf.set_font("Helvetica", "B", 20)
@@ -89,6 +194,7 @@ def create_pdf_report(title, kpi_data, charts=None):
     return bytes(pdf.output())
 
 def get_comprehensive_report_assets(df, global_stats, sub_text_color):
+    from plotly import graph_objects as go
     assets = {}
     try:
         pb_df = df.groupby("State").agg({"Total_Num_Beds": "sum"}).reset_index().merge(global_stats[["State", "State_Population"]], on="State")
@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+from logic.core import _key_text, split_coordinates
+
+# ============================================================
+# MATCHING PARAMETERS
+# ============================================================
+GEOHASH_PRECISION = 6      # ~1.2 km x 0.6 km cells
+WINDOW = 8                 # neighbours compared after sorting each block by name
+NAME_WEIGHT, GEO_WEIGHT = 0.6, 0.4
+GEO_SCALE_KM = 0.5         # coordinate similarity falls to 0 at this distance
+MATCH_THRESHOLD = 0.8
+NAME_WIDTH = 48            # names are compared on their first NAME_WIDTH characters
+TRIGRAM_BUCKETS = 1 << 20
+
+ABBREVIATIONS = {r"\bhosp\b": "hospital", r"\bcenter\b": "centre", r"\bctr\b": "centre", r"\bmed\b": "medical",
+                 r"\bst\b": "saint", r"\bgovt\b": "government", r"\bmulti speciality\b": "multispeciality"}
+REPORT_COLUMNS = ["Hospital_Name", "State", "District", "Pincode", "Location_Coordinates", "Total_Num_Beds", "Number_Doctor"]
+
+
+def normalize_names(names):
+    out = names.fillna("").astype(str).str.lower().str.replace(r"[^a-z0-9]+", " ", regex=True).str.strip()
+    # Few names carry an abbreviation, so only those rows go through the replacements
+    abbreviated = out.str.contains("|".join(ABBREVIATIONS), regex=True)
+    if abbreviated.any():
+        fixed = out[abbreviated]
+        for pattern, repl in ABBREVIATIONS.items():
+            fixed = fixed.str.replace(pattern, repl, regex=True)
+        out = out.mask(abbreviated, fixed)
+    return out
+
+
+def geohash_cells(lat, lon, precision=GEOHASH_PRECISION):
+    # Geohash cell of each point as its integer code (the base32 text is not needed for blocking); -1 without coordinates
+    bits = precision * 5
+    lon_bits, lat_bits = (bits + 1) // 2, bits // 2
+    valid = ~(np.isnan(lat) | np.isnan(lon))
+    la = np.clip(((np.nan_to_num(lat) + 90) / 180 * (1 << lat_bits)).astype(np.int64), 0, (1 << lat_bits) - 1)
+    lo = np.clip(((np.nan_to_num(lon) + 180) / 360 * (1 << lon_bits)).astype(np.int64), 0, (1 << lon_bits) - 1)
+    code = np.zeros(len(la), dtype=np.int64)
+    for i in range(bits):
+        # Geohash interleaves longitude on even bits and latitude on odd bits, most significant first
+        bit = (lo >> (lon_bits - 1 - i // 2)) & 1 if i % 2 == 0 else (la >> (lat_bits - 1 - i // 2)) & 1
+        code = (code << 1) | bit
+    return np.where(valid, code, -1)
+
+
+def trigram_matrix(names):
+    # Binary rows x hashed-trigram sparse matrix; pair similarity is then a sparse row product
+    padded = (" " + names + " ").to_numpy(dtype=f"S{NAME_WIDTH}")
+    codes = padded.view(np.uint8).reshape(len(padded), NAME_WIDTH).astype(np.int64)
+    tri = (codes[:, :-2] << 16) | (codes[:, 1:-1] << 8) | codes[:, 2:]
+    present = (codes[:, 2:] != 0).ravel()
+    rows = np.repeat(np.arange(len(padded)), NAME_WIDTH - 2)[present]
+    cols = (tri.ravel()[present] * 2654435761) % TRIGRAM_BUCKETS
+    m = sp.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=(len(padded), TRIGRAM_BUCKETS))
+    m.sum_duplicates()
+    m.data[:] = 1
+    return m
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 6371.0 * 2 * np.arcsin(np.sqrt(a))
+
+
+# ============================================================
+# BLOCKING & SCORING
+# ============================================================
+def block_pairs(block, by_name, window=WINDOW):
+    # Sorted neighbourhood within each block: rows are ordered by (block, name) and each row is
+    # compared with the next `window` rows of the same block, so pairs grow linearly with rows.
+    # by_name is the name sort order, shared by every blocking pass
+    order = by_name[np.argsort(block[by_name], kind="stable")]
+    order = order[block[order] >= 0]
+    b = block[order]
+    left, right = [], []
+    for k in range(1, window + 1):
+        same = b[k:] == b[:-k]
+        left.append(order[:-k][same])
+        right.append(order[k:][same])
+    return np.concatenate(left), np.concatenate(right)
+
+
+def candidate_pairs(pincode, names, lat, lon):
+    # Union of two blocking passes: same pincode, and same geohash cell (catches mistyped pincodes)
+    by_name = np.argsort(names.to_numpy(dtype=f"S{NAME_WIDTH}"), kind="stable")
+    passes = [block_pairs(pincode, by_name), block_pairs(geohash_cells(lat, lon), by_name)]
+    i = np.concatenate([p[0] for p in passes])
+    j = np.concatenate([p[1] for p in passes])
+    # A pair found by both passes is simply scored twice, which is cheaper than de-duplicating pairs
+    return np.minimum(i, j), np.maximum(i, j)
+
+
+def score_pairs(i, j, names, lat, lon, same_pincode):
+    dist = haversine_km(lat[i], lon[i], lat[j], lon[j])
+    geo_sim = np.clip(1 - dist / GEO_SCALE_KM, 0, 1)
+    # Without coordinates on both sides a shared pincode counts as half agreement
+    geo_sim = np.where(np.isnan(dist), np.where(same_pincode, 0.5, 0.0), geo_sim)
+
+    # Names are only compared for pairs that could still reach the threshold with identical names
+    possible = np.flatnonzero(NAME_WEIGHT + GEO_WEIGHT * geo_sim >= MATCH_THRESHOLD)
+    rows, local = np.unique(np.concatenate([i[possible], j[possible]]), return_inverse=True)
+    li, lj = local[:len(possible)], local[len(possible):]
+    sub = names.iloc[rows].reset_index(drop=True)
+    tri = trigram_matrix(sub)
+    inter = np.asarray(tri[li].multiply(tri[lj]).sum(axis=1)).ravel()
+    sizes = np.diff(tri.indptr)
+    sim = inter / np.maximum(sizes[li] + sizes[lj] - inter, 1)
+
+    # Differing numbers ("PHC 2" vs "PHC 3") mark different facilities however similar the rest is
+    numbers = sub.str.replace(r"[^0-9]+", " ", regex=True).str.strip().to_numpy()
+    sim = np.where((numbers[li] != "") & (numbers[lj] != "") & (numbers[li] != numbers[lj]), 0.0, sim)
+
+    name_sim = np.zeros(len(i))
+    name_sim[possible] = sim
+    return NAME_WEIGHT * name_sim + GEO_WEIGHT * geo_sim, name_sim, dist
+
+
+# ============================================================
+# ENTITY RESOLUTION
+# ============================================================
+def find_duplicates(df):
+    # Cluster label per row (-1 when the row has no duplicate) plus the matched pairs
+    names = normalize_names(df["Hospital_Name"]).reset_index(drop=True)
+    if "lat" in df.columns and "lon" in df.columns:
+        lat, lon = df["lat"].to_numpy(dtype="float64"), df["lon"].to_numpy(dtype="float64")
+    elif "Location_Coordinates" in df.columns:
+        lat, lon = (c.to_numpy(dtype="float64") for c in split_coordinates(df["Location_Coordinates"]))
+    else:
+        lat = lon = np.full(len(df), np.nan)
+
+    if "Pincode" in df.columns:
+        pincode = pd.factorize(_key_text(df["Pincode"]).where(df["Pincode"].notna().to_numpy()))[0]
+    else:
+        pincode = np.full(len(df), -1)
+
+    i, j = candidate_pairs(pincode, names, lat, lon)
+    score, name_sim, dist = score_pairs(i, j, names, lat, lon, (pincode[i] == pincode[j]) & (pincode[i] >= 0))
+    match = score >= MATCH_THRESHOLD
+    pairs = pd.DataFrame({"left": i[match], "right": j[match], "score": score[match].round(3),
+                          "name_similarity": name_sim[match].round(3), "distance_km": dist[match].round(3)}).drop_duplicates(["left", "right"])
+
+    graph = sp.coo_matrix((np.ones(match.sum()), (i[match], j[match])), shape=(len(df), len(df)))
+    _, labels = connected_components(graph, directed=False)
+    sizes = np.bincount(labels)
+    return np.where(sizes[labels] > 1, labels, -1), pairs
+
+
+def deduplicate_registry(df):
+    # Keep the most complete record of each duplicate cluster; the report lists every clustered record
+    df = df.reset_index(drop=True)
+    if df.empty or "Hospital_Name" not in df.columns:
+        return df, pd.DataFrame(columns=["Cluster", "Action", "Row"] + REPORT_COLUMNS)
+    labels, pairs = find_duplicates(df)
+    clustered = np.flatnonzero(labels >= 0)
+
+    completeness = df.iloc[clustered].notna().sum(axis=1).to_numpy()
+    order = np.lexsort((clustered, -completeness, labels[clustered]))
+    ranked = clustered[order]
+    first = np.ones(len(ranked), dtype=bool)
+    first[1:] = labels[ranked][1:] != labels[ranked][:-1]
+    keep = np.ones(len(df), dtype=bool)
+    keep[ranked[~first]] = False
+
+    cluster_ids = pd.factorize(labels[ranked])[0] + 1
+    report = df.iloc[ranked][[c for c in REPORT_COLUMNS if c in df.columns]].reset_index(drop=True)
+    report.insert(0, "Row", ranked)
+    report.insert(0, "Action", np.where(first, "kept", "merged"))
+    report.insert(0, "Cluster", cluster_ids)
+    return df[keep].reset_index(drop=True), report
+
+
+def summarize_duplicates(report):
+    merged = report[report["Action"] == "merged"]
+    return {"clusters": int(report["Cluster"].nunique()), "merged_records": len(merged),
+            "beds_removed": int(merged["Total_Num_Beds"].sum()) if "Total_Num_Beds" in merged else 0}
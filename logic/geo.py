@@ -0,0 +1,24 @@
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat, lon, lats, lons):
+    # Great-circle distance from one point to many (vectorized, NaN-safe)
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(np.asarray(lats, dtype=float)), np.radians(np.asarray(lons, dtype=float))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    dist = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+    return np.where(np.isnan(dist), np.inf, dist)
+
+
+def nearest_facilities(df, lat, lon, radius_km, limit=None, mask=None):
+    # Returns positional row ids within radius, sorted by distance, plus distances
+    dist = haversine_km(lat, lon, df["lat"].to_numpy(), df["lon"].to_numpy())
+    if mask is not None:
+        dist = np.where(mask, dist, np.inf)
+    idx = np.flatnonzero(dist <= radius_km)
+    idx = idx[np.argsort(dist[idx], kind="stable")]
+    if limit is not None:
+        idx = idx[:limit]
+    return idx, dist[idx]
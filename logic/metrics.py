@@ -0,0 +1,204 @@
+from logic.norms import ACTIVE_PROFILE, NORM_PROFILES
+from logic.population import disaggregate_population
+
+# ============================================================
+# WHO-STYLE CAPACITY NORMS & COMPOSITE WEIGHTS
+# ============================================================
+# Taken from the active norm profile (WHO unless PULSESCORE_NORM_PROFILE says otherwise)
+_profile = NORM_PROFILES[ACTIVE_PROFILE]
+BED_NORM = _profile["beds"]        # beds per capita
+DOC_NORM = _profile["doctors"]     # doctors per capita
+ICU_NORM = _profile["icu"]         # ICU facilities per capita
+ER_NORM = _profile["er"]           # emergency facilities per capita
+
+# Bed, Doctor, ICU, Emergency
+COMPONENT_WEIGHTS = _profile["weights"]
+
+
+# ============================================================
+# ROW-LEVEL -> AGGREGATE TABLES
+# ============================================================
+def aggregate_states(df):
+    return df.groupby("State").agg(
+        Total_Beds=("Total_Num_Beds", "sum"),
+        Total_Doctors=("Number_Doctor", "sum"),
+        Total_ICU=("has_icu", "sum"),
+        Total_Emergency=("is_emergency", "sum"),
+        State_Pop=("State_Population", "max")
+    ).reset_index()
+
+
+def aggregate_districts(df):
+    return df.groupby(["State", "District"]).agg(
+        Total_Beds=("Total_Num_Beds", "sum"),
+        Total_Doctors=("Number_Doctor", "sum"),
+        ICU_Count=("has_icu", "sum"),
+        Emergency_Count=("is_emergency", "sum"),
+        Hospitals=("Total_Num_Beds", "size"),
+    ).reset_index()
+
+
+def compute_state_capacity(df, state_stats):
+    return df.groupby("State").agg({"Total_Num_Beds": "sum", "Number_Doctor": "sum"}).reset_index().merge(state_stats[["State", "State_Population"]], on="State")
+
+
+def summarize_kpis(df, state_stats):
+    total_hospitals = len(df)
+    return {
+        "total_hospitals": total_hospitals,
+        "total_beds": int(df["Total_Num_Beds"].sum()),
+        "total_doctors": int(df["Number_Doctor"].sum()),
+        "distinct_states": int(df.loc[df["Admin_Type"] == "State", "State"].nunique()),
+        "distinct_uts": int(df.loc[df["Admin_Type"] == "Union Territory", "State"].nunique()),
+        "total_population": float(state_stats.loc[state_stats["State"].isin(df["State"].unique()), "State_Population"].sum()),
+        "icu_percent": (df["has_icu"].sum() / total_hospitals * 100) if total_hospitals > 0 else 0,
+        "emergency_percent": (df["is_emergency"].sum() / total_hospitals * 100) if total_hospitals > 0 else 0,
+        "icu_facilities": int(df["has_icu"].sum()),
+        "emergency_facilities": int(df["is_emergency"].sum()),
+    }
+
+
+# ============================================================
+# STRUCTURAL DEFICIT SCORE (SDS)
+# ============================================================
+def _deficit_pct(required, available):
+    # No requirement (zero population) means no deficit, as in norms.evaluate_profiles
+    return (((required - available) / required) * 100).clip(0, 100).fillna(0)
+
+
+def compute_structural_deficits(state_agg):
+    out = state_agg.copy()
+    pop = out["State_Pop"]
+    out["Req_Beds"] = pop * BED_NORM
+    out["Req_Docs"] = pop * DOC_NORM
+    out["Req_ICU"] = pop * ICU_NORM
+    out["Req_ER"] = pop * ER_NORM
+
+    out["Bed_Deficit"] = _deficit_pct(out["Req_Beds"], out["Total_Beds"])
+    out["Doc_Deficit"] = _deficit_pct(out["Req_Docs"], out["Total_Doctors"])
+    out["ICU_Deficit"] = _deficit_pct(out["Req_ICU"], out["Total_ICU"])
+    out["ER_Deficit"] = _deficit_pct(out["Req_ER"], out["Total_Emergency"])
+
+    w_b, w_d, w_i, w_e = COMPONENT_WEIGHTS
+    out["SDS"] = w_b * out["Bed_Deficit"] + w_d * out["Doc_Deficit"] + w_i * out["ICU_Deficit"] + w_e * out["ER_Deficit"]
+    return out
+
+
+def compute_district_deficits(state_agg, dist_agg, weights=None):
+    # State population is split across districts first (see logic.population), then every
+    # district runs through the same requirement/deficit/SDS formulas as a state, in one pass.
+    # `weights` is the unfiltered district rollup so filtered views keep the same populations.
+    out = disaggregate_population(state_agg, dist_agg, weights)
+    sds = compute_structural_deficits(out.rename(columns={"District_Pop": "State_Pop", "ICU_Count": "Total_ICU", "Emergency_Count": "Total_Emergency"}))
+    out = sds.rename(columns={"State_Pop": "District_Pop", "Total_ICU": "ICU_Count", "Total_Emergency": "Emergency_Count"})
+    out["SDS_Rank_In_State"] = out.groupby("State")["SDS"].rank(ascending=False, method="min").astype(int)
+    return out
+
+
+def national_deficits(state_agg):
+    nat_pop = state_agg["State_Pop"].sum()
+    totals = {
+        "Bed": (nat_pop * BED_NORM, state_agg["Total_Beds"].sum()),
+        "Doc": (nat_pop * DOC_NORM, state_agg["Total_Doctors"].sum()),
+        "ICU": (nat_pop * ICU_NORM, state_agg["Total_ICU"].sum()),
+        "ER": (nat_pop * ER_NORM, state_agg["Total_Emergency"].sum()),
+    }
+    res = {}
+    for key, (req, avail) in totals.items():
+        res[key] = float(max(0, min(100, ((req - avail) / req) * 100))) if req > 0 else 0.0
+
+    w_b, w_d, w_i, w_e = COMPONENT_WEIGHTS
+    res["SDS"] = w_b * res["Bed"] + w_d * res["Doc"] + w_i * res["ICU"] + w_e * res["ER"]
+    res["Adequacy"] = 100 - res["SDS"]
+    return res
+
+
+# ============================================================
+# SURGE RISK INDEX (SRI)
+# ============================================================
+def compute_state_sri(state_agg, S, E):
+    out = state_agg.rename(columns={"Total_Beds": "Avail_Beds", "Total_Doctors": "Avail_Docs",
+                                    "Total_ICU": "Avail_ICU", "Total_Emergency": "Avail_ER"})
+    pop = out["State_Pop"]
+    out["Req_B_Base"] = pop * BED_NORM
+    out["Req_D_Base"] = pop * DOC_NORM
+    out["Req_I_Base"] = pop * ICU_NORM
+    out["Req_E_Base"] = pop * ER_NORM
+
+    out["Stress_B"] = (out["Req_B_Base"] * S) / (out["Avail_Beds"].clip(1) * E)
+    out["Stress_D"] = (out["Req_D_Base"] * S) / (out["Avail_Docs"].clip(1) * E)
+    out["Stress_I"] = (out["Req_I_Base"] * S) / (out["Avail_ICU"].clip(1) * E)
+    out["Stress_E"] = (out["Req_E_Base"] * S) / (out["Avail_ER"].clip(1) * E)
+
+    w_b, w_d, w_i, w_e = COMPONENT_WEIGHTS
+    out["SRI"] = (w_b * out["Stress_B"] + w_d * out["Stress_D"] + w_i * out["Stress_I"] + w_e * out["Stress_E"]).round(3)
+    return out
+
+
+def compute_district_sri(dist_agg, state_sri, S, E):
+    out = dist_agg.rename(columns={"Total_Beds": "Avail_Beds", "Total_Doctors": "Avail_Docs",
+                                   "ICU_Count": "Avail_ICU", "Emergency_Count": "Avail_ER"})
+
+    state_totals = out.groupby("State").agg({
+        "Avail_Beds": "sum", "Avail_Docs": "sum", "Avail_ICU": "sum", "Avail_ER": "sum"
+    }).rename(columns=lambda x: "State_" + x).reset_index()
+
+    out = out.merge(state_totals, on="State").merge(state_sri[["State", "Req_B_Base", "Req_D_Base", "Req_I_Base", "Req_E_Base"]], on="State")
+
+    # District Share (District_Beds / State_Total_Beds)
+    out["Bed_Share"] = out["Avail_Beds"] / out["State_Avail_Beds"].clip(1)
+    out["Doc_Share"] = out["Avail_Docs"] / out["State_Avail_Docs"].clip(1)
+    out["ICU_Share"] = out["Avail_ICU"] / out["State_Avail_ICU"].clip(1)
+    out["ER_Share"] = out["Avail_ER"] / out["State_Avail_ER"].clip(1)
+
+    # District Required = (State_Required * District_Share) * S
+    out["Stress_B"] = (out["Req_B_Base"] * out["Bed_Share"] * S) / (out["Avail_Beds"].clip(1) * E)
+    out["Stress_D"] = (out["Req_D_Base"] * out["Doc_Share"] * S) / (out["Avail_Docs"].clip(1) * E)
+    out["Stress_I"] = (out["Req_I_Base"] * out["ICU_Share"] * S) / (out["Avail_ICU"].clip(1) * E)
+    out["Stress_E"] = (out["Req_E_Base"] * out["ER_Share"] * S) / (out["Avail_ER"].clip(1) * E)
+
+    w_b, w_d, w_i, w_e = COMPONENT_WEIGHTS
+    out["SRI"] = (w_b * out["Stress_B"] + w_d * out["Stress_D"] + w_i * out["Stress_I"] + w_e * out["Stress_E"]).round(3)
+
+    # Additional capacity needed to absorb the surge
+    for code, share, avail in [("B", "Bed_Share", "Avail_Beds"), ("I", "ICU_Share", "Avail_ICU"),
+                               ("D", "Doc_Share", "Avail_Docs"), ("E", "ER_Share", "Avail_ER")]:
+        out["Surge_Req_" + code] = (out["Req_" + code + "_Base"] * out[share] * S).round(0)
+        out["Add_" + code + "_Needed"] = (out["Surge_Req_" + code] - (out[avail] * E)).clip(0).round(0)
+    return out
+
+
+# ============================================================
+# RESOURCE DISTRIBUTION & EQUITY
+# ============================================================
+def compute_resource_rankings(dist_agg):
+    out = dist_agg.copy()
+    out["Doc_per_100Beds"] = ((out["Total_Doctors"] / out["Total_Beds"].clip(1)) * 100).round(1)
+    out["Bed_Rank"] = out["Total_Beds"].rank(ascending=False, method="min").astype(int)
+    out["ICU_Rank"] = out["ICU_Count"].rank(ascending=False, method="min").astype(int)
+    out["ER_Rank"] = out["Emergency_Count"].rank(ascending=False, method="min").astype(int)
+    out["Workforce_Rank"] = out["Doc_per_100Beds"].rank(ascending=False, method="min").astype(int)
+    return out
+
+
+def compute_equity(df, by=("State",)):
+    keys = list(by)
+    is_public = df["Hospital_Category"].str.contains("Govt|Public", case=False, na=False)
+    out = df.assign(_public=is_public).groupby(keys).agg(
+        Total_Num_Beds=("Total_Num_Beds", "sum"),
+        Num_Bed_For_Eco_Weaker_Sec=("Num_Bed_For_Eco_Weaker_Sec", "sum"),
+        Hospitals=("Total_Num_Beds", "size"),
+        Public_Hospitals=("_public", "sum"),
+    ).reset_index()
+    return equity_shares(out)
+
+
+def equity_shares(equity_agg):
+    out = equity_agg.copy()
+    out["EWS_Share"] = (out["Num_Bed_For_Eco_Weaker_Sec"] / out["Total_Num_Beds"] * 100).round(2)
+    out["Public_Share"] = (out["Public_Hospitals"] / out["Hospitals"].clip(1) * 100).round(2)
+    return out
+
+
+def count_by(df, keys):
+    return df.groupby(list(keys)).size().reset_index(name="Count")
@@ -0,0 +1,83 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# ============================================================
+# NORM & WEIGHT PROFILES
+# ============================================================
+# Requirement per capita for beds, doctors, ICU and emergency facilities, and the SDS/SRI
+# component weights in the same order. Extra profiles can be loaded from a JSON file
+# ({"Name": {"beds": 0.002, ..., "weights": [0.4, 0.3, 0.2, 0.1]}}) named by PULSESCORE_NORM_PROFILES;
+# PULSESCORE_NORM_PROFILE picks the one the dashboard runs on.
+COMPONENTS = ("beds", "doctors", "icu", "er")
+PROFILES = {
+    "WHO": {"beds": 3 / 1000, "doctors": 1 / 1000, "icu": 10 / 100000, "er": 1 / 100000, "weights": (0.4, 0.3, 0.2, 0.1)},
+    "National Target": {"beds": 2 / 1000, "doctors": 1 / 1000, "icu": 10 / 100000, "er": 1 / 100000, "weights": (0.4, 0.3, 0.2, 0.1)},
+    "Equal Weights": {"beds": 3 / 1000, "doctors": 1 / 1000, "icu": 10 / 100000, "er": 1 / 100000, "weights": (0.25, 0.25, 0.25, 0.25)},
+    "Critical Care Focus": {"beds": 3 / 1000, "doctors": 1 / 1000, "icu": 10 / 100000, "er": 1 / 100000, "weights": (0.2, 0.2, 0.4, 0.2)},
+}
+DEFAULT_PROFILE = "WHO"
+
+
+def load_profiles(path=None):
+    profiles = dict(PROFILES)
+    path = path or os.environ.get("PULSESCORE_NORM_PROFILES")
+    if path:
+        with open(path) as f:
+            for name, spec in json.load(f).items():
+                missing = [k for k in COMPONENTS + ("weights",) if k not in spec]
+                if missing or len(spec["weights"]) != len(COMPONENTS):
+                    raise ValueError(f"Norm profile '{name}' needs {', '.join(COMPONENTS)} and {len(COMPONENTS)} weights")
+                profiles[name] = {**{k: float(spec[k]) for k in COMPONENTS}, "weights": tuple(float(w) for w in spec["weights"])}
+    return profiles
+
+
+NORM_PROFILES = load_profiles()
+ACTIVE_PROFILE = os.environ.get("PULSESCORE_NORM_PROFILE", DEFAULT_PROFILE)
+if ACTIVE_PROFILE not in NORM_PROFILES:
+    raise ValueError(f"Unknown norm profile '{ACTIVE_PROFILE}' (expected one of {', '.join(NORM_PROFILES)})")
+
+
+def profile_matrices(names):
+    # (profiles x components) norm and weight matrices
+    norms = np.array([[NORM_PROFILES[n][c] for c in COMPONENTS] for n in names], dtype=float)
+    weights = np.array([NORM_PROFILES[n]["weights"] for n in names], dtype=float)
+    return norms, weights
+
+
+def describe_profile(name):
+    p = NORM_PROFILES[name]
+    return {"Beds per 1,000": p["beds"] * 1000, "Doctors per 1,000": p["doctors"] * 1000,
+            "ICU per 100,000": p["icu"] * 100000, "ER per 100,000": p["er"] * 100000,
+            "Weights (B/D/I/E)": " / ".join(f"{w:g}" for w in p["weights"])}
+
+
+# ============================================================
+# BATCH EVALUATION
+# ============================================================
+def _available(state_agg):
+    return state_agg[["Total_Beds", "Total_Doctors", "Total_ICU", "Total_Emergency"]].to_numpy(dtype=float)
+
+
+def evaluate_profiles(state_agg, names, S=1.0, E=1.15):
+    # SDS and SRI of every state under every profile as one broadcast over
+    # (states x profiles x components), from the state rollup alone
+    norms, weights = profile_matrices(names)
+    pop = state_agg["State_Pop"].to_numpy(dtype=float)[:, None, None]
+    avail = _available(state_agg)[:, None, :]
+    required = pop * norms[None, :, :]
+    # No requirement (zero population) means no deficit, as in metrics._deficit_pct
+    with np.errstate(divide="ignore", invalid="ignore"):
+        deficit = np.nan_to_num(np.clip((required - avail) / required * 100, 0, 100))
+    stress = required * S / (np.clip(avail, 1, None) * E)
+    sds = np.einsum("spc,pc->sp", deficit, weights)
+    sri = np.einsum("spc,pc->sp", stress, weights)
+
+    out = state_agg[["State"]].reset_index(drop=True)
+    for k, name in enumerate(names):
+        out[f"SDS [{name}]"] = sds[:, k].round(2)
+        out[f"SDS Rank [{name}]"] = pd.Series(sds[:, k]).rank(ascending=False, method="min").astype(int).to_numpy()
+        out[f"SRI [{name}]"] = sri[:, k].round(3)
+    return out
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+# ============================================================
+# ROBUST OUTLIER DETECTION (MODIFIED Z-SCORE)
+# ============================================================
+# Peers are facilities of the same care level in the same district; groups smaller than
+# MIN_PEERS fall back to the state, then to the care level nationally
+PEER_LEVELS = (["State", "District", "Care_Level_Clean"], ["State", "Care_Level_Clean"], ["Care_Level_Clean"])
+MIN_PEERS = 8
+Z_THRESHOLD = 3.5          # Iglewicz & Hoaglin cut-off for the modified z-score
+MAD_SCALE = 0.6745         # makes the MAD consistent with the standard deviation
+MEAN_AD_SCALE = 1.253314   # same for the mean absolute deviation, used when MAD is 0
+BEDDED_LEVELS = ("Secondary", "Tertiary")
+
+
+def peer_groups(df):
+    # One integer group per row: the narrowest peer level that has at least MIN_PEERS members
+    groups = np.full(len(df), -1, dtype=np.int64)
+    offset = 0
+    for level, keys in enumerate(PEER_LEVELS):
+        codes = df.groupby(keys, dropna=False, sort=False).ngroup().to_numpy()
+        size = np.bincount(codes)[codes]
+        take = (groups < 0) & ((size >= MIN_PEERS) | (level == len(PEER_LEVELS) - 1))
+        groups[take] = codes[take] + offset
+        offset += codes.max() + 1 if len(codes) else 0
+    return groups
+
+
+def robust_z(values, groups):
+    # Modified z-score of each value against its peer group's median and MAD
+    values = pd.Series(values)
+    by = values.groupby(groups)
+    med = by.transform("median").to_numpy()
+    dev = np.abs(values.to_numpy() - med)
+    dev_by = pd.Series(dev).groupby(groups)
+    mad = dev_by.transform("median").to_numpy()
+    mean_ad = dev_by.transform("mean").to_numpy()
+    # Over half of a group sharing one value leaves MAD at 0; the mean absolute deviation stands in
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where(mad > 0, MAD_SCALE * (values.to_numpy() - med) / mad,
+                     np.where(mean_ad > 0, (values.to_numpy() - med) / (MEAN_AD_SCALE * mean_ad), 0.0))
+    return np.nan_to_num(z)
+
+
+def score_outliers(df):
+    # Beds and doctors are log-scaled (capacity is heavily right-skewed), so a z-score measures a ratio to the peer median
+    beds = pd.to_numeric(df["Total_Num_Beds"], errors="coerce").to_numpy(dtype="float64")
+    docs = pd.to_numeric(df["Number_Doctor"], errors="coerce").to_numpy(dtype="float64")
+    groups = peer_groups(df)
+    log_beds, log_docs = np.log1p(np.clip(beds, 0, None)), np.log1p(np.clip(docs, 0, None))
+    out = pd.DataFrame({
+        "Beds_Z": robust_z(log_beds, groups),
+        "Doctors_Z": robust_z(log_docs, groups),
+        "Ratio_Z": robust_z(log_docs - log_beds, groups),
+    }, index=df.index).round(2)
+
+    care = df["Care_Level_Clean"].to_numpy() if "Care_Level_Clean" in df.columns else np.full(len(df), "")
+    rules = {
+        "Negative count": (beds < 0) | (docs < 0),
+        "No beds at secondary/tertiary level": (beds == 0) & np.isin(care, BEDDED_LEVELS),
+        "Beds vs peers": np.abs(out["Beds_Z"].to_numpy()) > Z_THRESHOLD,
+        "Doctors vs peers": np.abs(out["Doctors_Z"].to_numpy()) > Z_THRESHOLD,
+        "Doctor/bed ratio vs peers": np.abs(out["Ratio_Z"].to_numpy()) > Z_THRESHOLD,
+    }
+    reason = pd.Series("", index=df.index, dtype=object)
+    for label, hit in rules.items():
+        reason = reason.mask(hit, reason + np.where(reason == "", "", "; ") + label)
+    out["is_outlier"] = (reason != "").to_numpy()
+    out["Outlier_Reason"] = reason
+    return out
+
+
+def outlier_report(df):
+    # Flagged facilities with their peer z-scores, for review and download
+    flagged = df[df["is_outlier"]]
+    cols = [c for c in ["Hospital_Name", "State", "District", "Care_Level_Clean", "Total_Num_Beds", "Number_Doctor", "Outlier_Reason"] if c in df.columns]
+    return flagged[cols].join(score_outliers(df).loc[flagged.index, ["Beds_Z", "Doctors_Z", "Ratio_Z"]])
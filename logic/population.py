@@ -0,0 +1,66 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from logic.shared_data import source_fingerprint
+
+# ============================================================
+# DISTRICT POPULATION
+# ============================================================
+# The registry only carries State_Population. A district table (CSV with State, District,
+# Population columns) named by PULSESCORE_DISTRICT_POPULATION splits it proportionally;
+# without one, or for states the table does not fully cover, the split is modelled from
+# facility density (each district's share of the state's facilities).
+DISTRICT_POPULATION_PATH = os.environ.get("PULSESCORE_DISTRICT_POPULATION")
+KEYS = ["State", "District"]
+POPULATION_SOURCES = ("District table", "Facility density")
+
+
+def load_district_population(path=None):
+    path = path or DISTRICT_POPULATION_PATH
+    if not path:
+        return None
+    table = pd.read_csv(path)
+    missing = [c for c in KEYS + ["Population"] if c not in table.columns]
+    if missing:
+        raise ValueError(f"District population table needs columns: {', '.join(missing)}")
+    table["State"] = table["State"].astype(str).str.strip()
+    table["District"] = table["District"].astype(str).str.strip()
+    table["Population"] = pd.to_numeric(table["Population"], errors="coerce")
+    return table.dropna(subset=["Population"]).groupby(KEYS, as_index=False)["Population"].sum()
+
+
+DISTRICT_POPULATION = load_district_population()
+
+
+def population_key(path=None):
+    # Part of the aggregate cache key: a new or edited table invalidates the district tables
+    path = path or DISTRICT_POPULATION_PATH
+    return source_fingerprint(path) if path else "modelled"
+
+
+def disaggregate_population(state_agg, dist_agg, weights=None, table=DISTRICT_POPULATION):
+    # District_Pop = State_Pop * district share. `weights` is a district rollup with a Hospitals
+    # column (the unfiltered one, so the split does not move with the filters); it defaults to dist_agg.
+    weights = dist_agg if weights is None else weights
+    out = dist_agg.merge(weights[KEYS + ["Hospitals"]].rename(columns={"Hospitals": "_w"}), on=KEYS, how="left")
+    out["Pop_Source"] = POPULATION_SOURCES[1]
+    out["_w"] = out["_w"].fillna(0).astype(float)
+    if table is not None and len(table):
+        out = out.merge(table.rename(columns={"Population": "_pop"}), on=KEYS, how="left")
+        # A state uses the table only when every one of its districts is listed
+        covered = out["_pop"].notna().groupby(out["State"]).transform("all")
+        out.loc[covered, "_w"] = out.loc[covered, "_pop"]
+        out.loc[covered, "Pop_Source"] = POPULATION_SOURCES[0]
+        out = out.drop(columns="_pop")
+
+    state_pop = out["State"].map(state_agg.set_index("State")["State_Pop"]).fillna(0).to_numpy(dtype=float)
+    w = out["_w"].to_numpy(dtype=float)
+    total = out.groupby("State")["_w"].transform("sum").to_numpy(dtype=float)
+    # States with no weight at all are split evenly
+    even = 1 / out.groupby("State")["_w"].transform("size").to_numpy(dtype=float)
+    share = np.where(total > 0, w / np.where(total > 0, total, 1), even)
+    out["District_Pop"] = np.round(state_pop * share).astype(np.int64)
+    out["Pop_Share"] = (share * 100).round(2)
+    return out.drop(columns="_w")
@@ -0,0 +1,121 @@
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+
+import streamlit as st
+
+# Enable with PULSESCORE_PROFILE=1. With PULSESCORE_TRACE_DIR set, every session also
+# writes its Chrome trace (chrome://tracing / Perfetto) to <dir>/pulsescore_<session>.json.
+ENABLED = os.environ.get("PULSESCORE_PROFILE", "").lower() in ("1", "true", "yes")
+TRACE_DIR = os.environ.get("PULSESCORE_TRACE_DIR")
+MAX_RERUNS = 50
+
+
+class SessionProfiler:
+    def __init__(self):
+        self.session_id = uuid.uuid4().hex[:8]
+        self.origin = time.perf_counter()
+        self.reruns = []
+        self.current = None
+        self.depth = 0
+
+    def begin_rerun(self):
+        self.current = []
+        self.depth = 0
+        self.rerun_start = time.perf_counter()
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        depth = self.depth
+        self.depth += 1
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            if self.current is not None:
+                self.current.append({"name": name, "start": start - self.origin, "dur": time.perf_counter() - start, "depth": depth})
+
+    def end_rerun(self):
+        if self.current is None:
+            return
+        spans = sorted(self.current, key=lambda s: (s["start"], s["depth"]))
+        total = time.perf_counter() - self.rerun_start
+        self.reruns.append({"start": self.rerun_start - self.origin, "total": total, "spans": spans})
+        self.reruns = self.reruns[-MAX_RERUNS:]
+        self.current = None
+
+    def chrome_trace(self):
+        events = []
+        for i, rerun in enumerate(self.reruns):
+            events.append({"name": f"rerun {i + 1}", "ph": "X", "pid": 1, "tid": self.session_id,
+                           "ts": rerun["start"] * 1e6, "dur": rerun["total"] * 1e6})
+            for s in rerun["spans"]:
+                events.append({"name": s["name"], "ph": "X", "pid": 1, "tid": self.session_id,
+                               "ts": s["start"] * 1e6, "dur": s["dur"] * 1e6})
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"session": self.session_id}}
+
+
+def _profiler():
+    return st.session_state.get("_profiler")
+
+
+def begin_rerun():
+    if not ENABLED:
+        return
+    if "_profiler" not in st.session_state:
+        st.session_state["_profiler"] = SessionProfiler()
+    st.session_state["_profiler"].begin_rerun()
+
+
+def span(name):
+    if not ENABLED:
+        return nullcontext()
+    prof = _profiler()
+    if prof is None or prof.current is None:
+        return nullcontext()
+    return prof.span(name)
+
+
+def end_rerun():
+    prof = _profiler() if ENABLED else None
+    if prof is None:
+        return None
+    prof.end_rerun()
+    if TRACE_DIR:
+        os.makedirs(TRACE_DIR, exist_ok=True)
+        with open(os.path.join(TRACE_DIR, f"pulsescore_{prof.session_id}.json"), "w") as f:
+            json.dump(prof.chrome_trace(), f)
+    return prof
+
+
+def breakdown(rerun):
+    # One row per span, plus a "(self)" row wherever a parent has untracked time
+    # (e.g. a page's figure building around its instrumented aggregation spans).
+    rows = []
+    spans = rerun["spans"]
+    for i, s in enumerate(spans):
+        rows.append({"Stage": " " * s["depth"] + s["name"], "ms": s["dur"] * 1000, "%": s["dur"] / rerun["total"] * 100})
+        children = [c for c in spans[i + 1:] if c["depth"] == s["depth"] + 1 and c["start"] < s["start"] + s["dur"]]
+        if children:
+            own = s["dur"] - sum(c["dur"] for c in children)
+            rows.append({"Stage": " " * (s["depth"] + 1) + "(render & figures)", "ms": own * 1000, "%": own / rerun["total"] * 100})
+    tracked = sum(s["dur"] for s in spans if s["depth"] == 0)
+    rows.append({"Stage": "(untracked)", "ms": (rerun["total"] - tracked) * 1000, "%": (rerun["total"] - tracked) / rerun["total"] * 100})
+    rows.append({"Stage": "Total rerun", "ms": rerun["total"] * 1000, "%": 100.0})
+    return rows
+
+
+def render_performance_panel():
+    prof = end_rerun()
+    if prof is None or not prof.reruns:
+        return
+    st.markdown('<div style="margin: 20px 0;"></div><div style="font-size:18px; font-weight:850; color:rgba(255,255,255,0.6); margin-bottom:12px; text-transform:uppercase; letter-spacing:1.5px;">Performance</div>', unsafe_allow_html=True)
+    with st.expander("Last Rerun Breakdown", expanded=False):
+        last = prof.reruns[-1]
+        st.dataframe(breakdown(last), use_container_width=True, hide_index=True,
+                     column_config={"ms": st.column_config.NumberColumn(format="%.1f"), "%": st.column_config.NumberColumn(format="%.0f%%")})
+        st.caption(f"Session {prof.session_id} · {len(prof.reruns)} reruns recorded")
+        st.download_button("Download Chrome Trace (JSON)", json.dumps(prof.chrome_trace()), f"pulsescore_trace_{prof.session_id}.json", "application/json", use_container_width=True)
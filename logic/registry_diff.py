@@ -0,0 +1,154 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from logic.core import DERIVED_COLUMNS, FACILITY_KEY, enrich_registry, facility_ids
+from logic.metrics import aggregate_states, compute_structural_deficits, compute_state_sri, national_deficits
+
+# Capacity columns reported as before/after/delta for changed facilities
+TRACKED_COLUMNS = ["Total_Num_Beds", "Number_Doctor", "Num_Bed_For_Eco_Weaker_Sec"]
+
+
+def _is_number(col):
+    return pd.api.types.is_numeric_dtype(col) and not pd.api.types.is_bool_dtype(col)
+
+
+def column_differs(before, after):
+    # Numbers compare as float and everything else as text, so a column that changes dtype
+    # between extracts (e.g. an int column gaining a blank) does not mark every row changed
+    if _is_number(before) and _is_number(after):
+        a, b = before.to_numpy(dtype="float64", na_value=np.nan), after.to_numpy(dtype="float64", na_value=np.nan)
+        return (a != b) & ~(np.isnan(a) & np.isnan(b))
+    # Compared as Arrow-backed string arrays; missing values only match each other
+    same = pd.Series(before.astype(str).array == after.astype(str).array).fillna(False).to_numpy(dtype=bool)
+    a_na, b_na = before.isna().to_numpy(), after.isna().to_numpy()
+    return np.where(a_na | b_na, a_na != b_na, ~same)
+
+
+def match_facilities(old_ids, old, new_ids, new, columns):
+    # Hash join on facility id: every new row is looked up in the old extract once and the
+    # matched pairs are compared column by column on aligned arrays
+    pos = pd.Index(old_ids).get_indexer(new_ids)
+    known = pos >= 0
+    before, after = old.iloc[pos[known]], new.iloc[np.flatnonzero(known)]
+    flags = pd.DataFrame({c: column_differs(before[c], after[c]) for c in columns})
+    changed = np.zeros(len(new), dtype=bool)
+    changed[known] = flags.to_numpy().any(axis=1)
+    removed = np.ones(len(old), dtype=bool)
+    removed[pos[known]] = False
+    # flags is restricted to the changed rows, in new-extract order
+    return {"old_pos": pos, "added": ~known, "changed": changed, "removed": removed,
+            "flags": flags[changed[known]].reset_index(drop=True)}
+
+
+def comparable_columns(old, new):
+    return [c for c in old.columns if c in new.columns and c not in DERIVED_COLUMNS]
+
+
+def _enriched(df):
+    # Both sides go through the same enrichment so cleaned fields (e.g. stripped State) compare equal
+    if all(c in df.columns for c in DERIVED_COLUMNS):
+        return df
+    return enrich_registry(df.copy())[0]
+
+
+# ============================================================
+# STATE IMPACT
+# ============================================================
+def state_impact(old, new, added, removed, changed, S=1.0, E=1.0):
+    before, after = aggregate_states(old), aggregate_states(new)
+    out = before[["State"]].merge(after[["State"]], on="State", how="outer")
+    for label, agg in (("Old", before), ("New", after)):
+        sds = compute_structural_deficits(agg)
+        sri = compute_state_sri(agg, S, E)
+        side = agg.rename(columns={"Total_Beds": "Beds", "Total_Doctors": "Doctors", "Total_ICU": "ICU"})[["State", "Beds", "Doctors", "ICU"]]
+        side = side.assign(SDS=sds["SDS"].round(2), SRI=sri["SRI"])
+        out = out.merge(side.rename(columns=lambda c: c if c == "State" else f"{c}_{label}"), on="State", how="left")
+
+    for name in ("Beds", "Doctors", "ICU", "SDS", "SRI"):
+        out[f"{name}_Old"] = out[f"{name}_Old"].fillna(0)
+        out[f"{name}_New"] = out[f"{name}_New"].fillna(0)
+        out[f"{name}_Delta"] = (out[f"{name}_New"] - out[f"{name}_Old"]).round(3)
+
+    counts = pd.DataFrame({
+        "Added": added["State"].value_counts(),
+        "Removed": removed["State"].value_counts(),
+        "Changed": changed["State"].value_counts(),
+    })
+    out = out.merge(counts.rename_axis("State").reset_index(), on="State", how="left")
+    out[["Added", "Removed", "Changed"]] = out[["Added", "Removed", "Changed"]].fillna(0).astype(int)
+    return out.sort_values("SDS_Delta", key=abs, ascending=False, ignore_index=True)
+
+
+# ============================================================
+# DIFF
+# ============================================================
+def diff_registries(old, new, S=1.0, E=1.0):
+    # Added, removed and changed facilities between two extracts plus the state SDS/SRI shift
+    old, new = _enriched(old), _enriched(new)
+    columns = comparable_columns(old, new)
+    match = match_facilities(facility_ids(old), old, facility_ids(new), new, columns)
+
+    added = new[match["added"]]
+    removed = old[match["removed"]]
+    changed_new = new[match["changed"]]
+    changed_old = old.iloc[match["old_pos"][match["changed"]]]
+
+    changed = changed_new[FACILITY_KEY].reset_index(drop=True)
+    # Names of the columns that differ on each changed row, joined as one string
+    flags = match["flags"]
+    changed["Changed_Columns"] = flags.dot(flags.columns + ", ").str.removesuffix(", ").to_numpy()
+    for col in TRACKED_COLUMNS:
+        if col in columns:
+            before = changed_old[col].to_numpy()
+            after = changed_new[col].to_numpy()
+            changed[f"{col}_Old"], changed[f"{col}_New"], changed[f"{col}_Delta"] = before, after, after - before
+
+    nat_old = national_deficits(aggregate_states(old))
+    nat_new = national_deficits(aggregate_states(new))
+    summary = {
+        "old_rows": len(old), "new_rows": len(new),
+        "added": len(added), "removed": len(removed), "changed": len(changed),
+        "unchanged": int(len(new) - len(added) - len(changed)),
+        "beds_delta": int(new["Total_Num_Beds"].sum() - old["Total_Num_Beds"].sum()),
+        "doctors_delta": int(new["Number_Doctor"].sum() - old["Number_Doctor"].sum()),
+        "icu_delta": int(new["has_icu"].sum() - old["has_icu"].sum()),
+        "sds_old": nat_old["SDS"], "sds_new": nat_new["SDS"],
+    }
+    return {
+        "summary": summary,
+        "added": added[columns].reset_index(drop=True),
+        "removed": removed[columns].reset_index(drop=True),
+        "changed": changed,
+        "states": state_impact(old, new, added, removed, changed_new, S, E),
+    }
+
+
+def _read(path):
+    return pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff two PulseScore registry extracts")
+    parser.add_argument("old", help="Baseline registry CSV or Parquet")
+    parser.add_argument("new", help="Updated registry CSV or Parquet")
+    parser.add_argument("--out", default=None, help="Directory for added/removed/changed/states CSVs")
+    args = parser.parse_args()
+
+    diff = diff_registries(_read(args.old), _read(args.new))
+    s = diff["summary"]
+    print(f"{s['old_rows']:,} -> {s['new_rows']:,} facilities: +{s['added']:,} added, -{s['removed']:,} removed, "
+          f"~{s['changed']:,} changed ({s['beds_delta']:+,} beds, {s['doctors_delta']:+,} doctors)")
+    print(f"National SDS {s['sds_old']:.2f} -> {s['sds_new']:.2f}")
+    print(diff["states"].head(10)[["State", "Added", "Removed", "Changed", "Beds_Delta", "SDS_Delta", "SRI_Delta"]].to_string(index=False))
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+        for name in ("added", "removed", "changed", "states"):
+            diff[name].to_csv(os.path.join(args.out, f"{name}.csv"), index=False)
+        print(f"Wrote diff tables to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
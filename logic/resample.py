@@ -0,0 +1,81 @@
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+# ============================================================
+# BOOTSTRAP KERNELS
+# ============================================================
+# numpy only: bootstrap pool workers import this module alone, without pandas, scipy or streamlit.
+# Replicates are drawn in blocks of about this many facility draws to bound memory
+BLOCK_DRAWS = 4_000_000
+
+
+def resample_totals(values, group, starts, sizes, reps, rng):
+    # Facilities are sorted by group; each replicate redraws every group's facilities with
+    # replacement from that group, and the per-group sums come out of one reduceat per column
+    u = rng.random((reps, len(group)))
+    idx = starts[group] + (u * sizes[group]).astype(np.int64)
+    return np.stack([np.add.reduceat(values[idx, c], starts, axis=1) for c in range(values.shape[1])], axis=-1)
+
+
+def sds_kernel(totals, required, weights):
+    # totals (reps x groups x 4), required (groups x 4) -> SDS (reps x groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        deficit = np.nan_to_num(np.clip((required - totals) / required * 100, 0, 100))
+    return deficit @ weights
+
+
+def sri_kernel(totals, required, weights):
+    # State SRI at S = E = 1 (it scales by S / E, so the ranking does not depend on either)
+    return (required / np.clip(totals, 1, None)) @ weights
+
+
+def rank_desc(scores):
+    # Rank along the last axis, 1 = highest, ties share the lowest rank ("min" method)
+    order = np.argsort(-scores, axis=-1, kind="stable")
+    ranked = np.take_along_axis(scores, order, axis=-1)
+    new = np.ones(ranked.shape, dtype=bool)
+    new[..., 1:] = ranked[..., 1:] != ranked[..., :-1]
+    first = np.maximum.accumulate(np.where(new, np.arange(ranked.shape[-1]), 0), axis=-1)
+    ranks = np.empty(order.shape, dtype=np.int32)
+    np.put_along_axis(ranks, order, (first + 1).astype(np.int32), axis=-1)
+    return ranks
+
+
+def bootstrap_job(values, group, starts, sizes, sds_required, sri_required, weights, reps, seed):
+    # One job's replicates, in memory-bounded blocks; sri_required is None when SRI is not ranked
+    rng = np.random.default_rng(seed)
+    block = max(1, BLOCK_DRAWS // max(len(group), 1))
+    sds_ranks, sri_ranks = [], []
+    for start in range(0, reps, block):
+        totals = resample_totals(values, group, starts, sizes, min(block, reps - start), rng)
+        sds_ranks.append(rank_desc(sds_kernel(totals, sds_required, weights)))
+        if sri_required is not None:
+            sri_ranks.append(rank_desc(sri_kernel(totals, sri_required, weights)))
+    return np.concatenate(sds_ranks), np.concatenate(sri_ranks) if sri_ranks else None
+
+
+# ============================================================
+# SHARED FACILITY ARRAYS
+# ============================================================
+def share_arrays(values, group):
+    # Copy the facility values and group codes into one shared-memory block; jobs then carry only its name
+    shm = SharedMemory(create=True, size=max(values.nbytes + group.nbytes, 1))
+    np.ndarray(values.shape, dtype=np.float64, buffer=shm.buf)[:] = values
+    np.ndarray(group.shape, dtype=np.int64, buffer=shm.buf, offset=values.nbytes)[:] = group
+    return shm, (shm.name, values.shape)
+
+
+def shared_job(spec, *args):
+    # Pool entry point: attach to the parent's block and run the job. Spawned workers share the
+    # parent's resource tracker, and the parent unlinks the block once every job is back.
+    name, shape = spec
+    shm = SharedMemory(name=name)
+    try:
+        values = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        group = np.ndarray((shape[0],), dtype=np.int64, buffer=shm.buf, offset=values.nbytes)
+        result = bootstrap_job(values, group, *args)
+        del values, group
+        return result
+    finally:
+        shm.close()
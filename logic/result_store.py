@@ -0,0 +1,118 @@
+import os
+import threading
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+import streamlit as st
+
+SESSION_BUDGET_BYTES = int(os.environ.get("PULSESCORE_SESSION_RESULT_BYTES", 4 * 1024 ** 2))
+GLOBAL_BUDGET_BYTES = int(os.environ.get("PULSESCORE_RESULT_STORE_BYTES", 256 * 1024 ** 2))
+ENTRY_OVERHEAD = 256  # bookkeeping per entry (dict, key, metadata)
+
+
+class ResultStore:
+    # Query results held as positional row ids into the shared dataset (plus small
+    # per-row arrays such as distances), bounded per session and globally, LRU-evicted.
+    # Each entry carries the dataset's source fingerprint; a lookup under another one misses.
+    def __init__(self, session_budget=SESSION_BUDGET_BYTES, global_budget=GLOBAL_BUDGET_BYTES):
+        self.session_budget = session_budget
+        self.global_budget = global_budget
+        self._entries = OrderedDict()
+        self._session_bytes = {}
+        self._lock = threading.Lock()
+        self.global_bytes = 0
+        self.evictions = 0
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.global_bytes -= entry["nbytes"]
+        self._session_bytes[key[0]] -= entry["nbytes"]
+        if self._session_bytes[key[0]] <= 0:
+            del self._session_bytes[key[0]]
+
+    def put(self, session, slot, rows, token, extra=None, meta=None):
+        rows = np.asarray(rows)
+        rows = rows.astype(np.int32 if rows.size == 0 or rows.max() < 2 ** 31 else np.int64, copy=False)
+        extra = {k: np.asarray(v) for k, v in (extra or {}).items()}
+        total = len(rows)
+
+        # Results arrive ranked, so an oversized result keeps its leading rows
+        per_row = rows.itemsize + sum(a.itemsize for a in extra.values())
+        max_rows = max(0, (self.session_budget - ENTRY_OVERHEAD) // max(per_row, 1))
+        if total > max_rows:
+            rows = rows[:max_rows]
+            extra = {k: v[:max_rows] for k, v in extra.items()}
+        nbytes = ENTRY_OVERHEAD + rows.nbytes + sum(a.nbytes for a in extra.values())
+
+        key = (session, slot)
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = {"rows": rows, "extra": extra, "token": token, "nbytes": nbytes,
+                                  "total": total, "meta": dict(meta or {})}
+            self._session_bytes[session] = self._session_bytes.get(session, 0) + nbytes
+            self.global_bytes += nbytes
+
+            for other in [k for k in self._entries if k[0] == session and k != key]:
+                if self._session_bytes[session] <= self.session_budget:
+                    break
+                self._drop(other)
+                self.evictions += 1
+            while self.global_bytes > self.global_budget and len(self._entries) > 1:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+        return self._entries.get(key)
+
+    def get(self, session, slot, token):
+        key = (session, slot)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry["token"] != token:
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def usage(self, session=None):
+        with self._lock:
+            return {
+                "session_bytes": self._session_bytes.get(session, 0),
+                "session_entries": sum(1 for k in self._entries if k[0] == session),
+                "global_bytes": self.global_bytes,
+                "global_entries": len(self._entries),
+                "sessions": len(self._session_bytes),
+                "evictions": self.evictions,
+                "session_budget": self.session_budget,
+                "global_budget": self.global_budget,
+            }
+
+
+@st.cache_resource
+def get_result_store():
+    return ResultStore()
+
+
+def session_key():
+    if "_result_session" not in st.session_state:
+        st.session_state["_result_session"] = uuid.uuid4().hex
+    return st.session_state["_result_session"]
+
+
+def materialize(df, entry):
+    # Read-time view of a stored result; only the requested rows are copied
+    results = df.iloc[entry["rows"]]
+    if entry["extra"]:
+        results = results.assign(**entry["extra"])
+    return results
+
+
+def format_bytes(n):
+    for unit in ["B", "KB", "MB", "GB"]:
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
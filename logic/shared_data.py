@@ -0,0 +1,137 @@
+import hashlib
+import os
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.environ.get("PULSESCORE_CACHE_DIR", os.path.join(BASE_PATH, "dataset", ".cache"))
+
+# Bump when load_data's enrichment changes so stale caches are rebuilt
+CACHE_FORMAT = 3
+# Registry copies kept on disk. Each edit of a CSV and each upload gets a new fingerprint; beyond
+# this many, the least recently opened ones are evicted with everything cached under them.
+CACHE_KEEP = int(os.environ.get("PULSESCORE_CACHE_KEEP", 4))
+# Duplicate facilities are merged on load unless PULSESCORE_DEDUP=0; it changes the rows, so it is part of the key
+DEDUP_ON_LOAD = os.environ.get("PULSESCORE_DEDUP", "1") != "0"
+
+
+def source_fingerprint(source):
+    # Paths are identified by location, size and mtime; uploads by content
+    h = hashlib.sha1(f"v{CACHE_FORMAT}|dedup={int(DEDUP_ON_LOAD)}".encode())
+    if isinstance(source, (str, os.PathLike)):
+        stat = os.stat(source)
+        h.update(f"{os.path.abspath(source)}|{stat.st_size}|{stat.st_mtime_ns}".encode())
+    else:
+        h.update(source.getvalue() if hasattr(source, "getvalue") else source.read())
+        if hasattr(source, "seek"):
+            source.seek(0)
+    return h.hexdigest()[:16]
+
+
+def cache_path(fingerprint, name):
+    return os.path.join(CACHE_DIR, f"{name}_{fingerprint}.arrow")
+
+
+def write_arrow(df, path):
+    # Uncompressed Arrow IPC so the file can be memory-mapped and read in place
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def read_arrow(path):
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+def _string_mapper(dtype):
+    # pandas >= 3 already maps Arrow strings to its pyarrow-backed "str" dtype
+    if pa.types.is_string(dtype) or pa.types.is_large_string(dtype):
+        return pd.StringDtype("pyarrow")
+    return None
+
+
+def arrow_to_frame(table):
+    # split_blocks keeps null-free numeric columns as read-only views of the mapped
+    # buffers and string columns stay Arrow-backed, so only bool/nullable columns copy
+    mapper = None if int(pd.__version__.split(".")[0]) >= 3 else _string_mapper
+    return table.to_pandas(split_blocks=True, types_mapper=mapper)
+
+
+def open_shared(fingerprint, build):
+    # Build the enriched tables once per source (any process), then memory-map them
+    paths = {name: cache_path(fingerprint, name) for name in ("registry", "state_stats")}
+    if not all(os.path.exists(p) for p in paths.values()):
+        df, state_stats = build()
+        write_arrow(state_stats, paths["state_stats"])
+        write_arrow(df, paths["registry"])
+        evict_stale(fingerprint)
+    else:
+        _touch(paths["registry"])
+    return arrow_to_frame(read_arrow(paths["registry"])), arrow_to_frame(read_arrow(paths["state_stats"]))
+
+
+def _touch(path):
+    # A registry copy's mtime records its last use for evict_stale
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        pass
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except FileNotFoundError:
+        return 0
+
+
+def _fingerprint_of(name):
+    # "<table>_<fingerprint>.<ext>" -> fingerprint
+    return os.path.splitext(name)[0].rsplit("_", 1)[-1]
+
+
+def evict_stale(keep):
+    # Registry copies beyond the CACHE_KEEP most recently opened go, along with every file and
+    # aggregates directory cached under their fingerprint. Mapped copies stay readable to the
+    # processes that still hold them; the files are only unlinked.
+    registries = sorted((n for n in os.listdir(CACHE_DIR) if n.startswith("registry_") and n.endswith(".arrow")),
+                        key=lambda n: _mtime(os.path.join(CACHE_DIR, n)), reverse=True)
+    stale = {_fingerprint_of(n) for n in registries[CACHE_KEEP:]} - {keep}
+    if not stale:
+        return 0
+    removed = 0
+    for name in os.listdir(CACHE_DIR):
+        if name.endswith((".arrow", ".parquet")) and _fingerprint_of(name) in stale:
+            try:
+                os.remove(os.path.join(CACHE_DIR, name))
+                removed += 1
+            except FileNotFoundError:
+                pass
+    aggregates = os.path.join(CACHE_DIR, "aggregates")
+    for name in (os.listdir(aggregates) if os.path.isdir(aggregates) else []):
+        if name.split("_", 1)[0] in stale:
+            shutil.rmtree(os.path.join(aggregates, name), ignore_errors=True)
+            removed += 1
+    return removed
+
+
+def clear_disk_cache():
+    # Registry copies, Parquet exports and materialized aggregates
+    if not os.path.isdir(CACHE_DIR):
+        return 0
+    removed = 0
+    for name in os.listdir(CACHE_DIR):
+        path = os.path.join(CACHE_DIR, name)
+        if name.endswith((".arrow", ".parquet")):
+            os.remove(path)
+            removed += 1
+        elif name == "aggregates":
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+    return removed
@@ -0,0 +1,96 @@
+import heapq
+import itertools
+
+import numpy as np
+import streamlit as st
+from scipy.spatial import cKDTree
+
+from logic.access import ACCESS_TARGETS, FacilityIndex, km_to_chord, population_points, spread_population, unit_xyz
+
+# ============================================================
+# SITING PARAMETERS
+# ============================================================
+SITING_SERVICES = {"ICU": "ICU", "Emergency": "ER"}    # page label -> ACCESS_TARGETS key
+CANDIDATE_SOURCES = ("Existing facilities", "Grid cells")
+COORD_DECIMALS = 3         # facilities within ~100 m of each other are one candidate site
+
+
+def candidate_sites(df, service, source):
+    # Existing facilities that lack the service (upgrade candidates), or the centre of every occupied grid cell
+    if source == "Grid cells":
+        cells = population_points(df)
+        return cells[["State", "District", "lat", "lon"]].assign(Site="Grid cell")
+    lacking = df[~ACCESS_TARGETS[service](df) & df["lat"].notna().to_numpy() & df["lon"].notna().to_numpy()]
+    sites = lacking[["State", "District", "Hospital_Name", "lat", "lon"]].rename(columns={"Hospital_Name": "Site"})
+    rounded = sites[["lat", "lon"]].round(COORD_DECIMALS)
+    return sites[~rounded.duplicated()].reset_index(drop=True)
+
+
+def coverage_sets(site_lat, site_lon, point_lat, point_lon, radius_km):
+    # CSR-style coverage: the demand points within radius_km of site c are indices[indptr[c]:indptr[c + 1]]
+    tree = cKDTree(unit_xyz(point_lat, point_lon))
+    lists = tree.query_ball_point(unit_xyz(site_lat, site_lon), km_to_chord(radius_km), workers=-1)
+    sizes = np.fromiter(map(len, lists), dtype=np.int64, count=len(lists))
+    indptr = np.r_[0, np.cumsum(sizes)]
+    indices = np.fromiter(itertools.chain.from_iterable(lists), dtype=np.int64, count=indptr[-1])
+    return indptr, indices
+
+
+def lazy_greedy(indptr, indices, demand, covered, n):
+    # Coverage is submodular, so a site's gain only shrinks as others are chosen: a popped site whose
+    # recomputed gain still beats the next heap entry is the true best, and most sites are never re-scored
+    covered = covered.copy()
+    open_demand = np.where(covered, 0.0, demand)
+    sizes = np.diff(indptr)
+    gains = np.bincount(np.repeat(np.arange(len(sizes)), sizes), weights=open_demand[indices], minlength=len(sizes))
+    heap = [(-g, c) for c, g in enumerate(gains) if g > 0]
+    heapq.heapify(heap)
+    chosen = []
+    while heap and len(chosen) < n:
+        _, c = heapq.heappop(heap)
+        members = indices[indptr[c]:indptr[c + 1]]
+        gain = demand[members][~covered[members]].sum()
+        if heap and gain < -heap[0][0]:
+            if gain > 0:
+                heapq.heappush(heap, (-gain, c))
+            continue
+        if gain <= 0:
+            break
+        covered[members] = True
+        chosen.append((c, gain))
+    return chosen, covered
+
+
+def plan_sites(df, service="ICU", source="Existing facilities", n=10, radius_km=30.0, states=None):
+    # Choose n new sites for a service to cover the most population not already within radius_km of it
+    target = SITING_SERVICES[service]
+    points = population_points(df)
+    demand = spread_population(points, df)
+    if states is not None:
+        demand = np.where(points["State"].isin(states).to_numpy(), demand, 0.0)
+
+    mask = ACCESS_TARGETS[target](df)
+    existing = FacilityIndex(df["lat"].to_numpy()[mask], df["lon"].to_numpy()[mask])
+    covered = existing.nearest_km(points["lat"].to_numpy(), points["lon"].to_numpy()) <= radius_km
+
+    sites = candidate_sites(df, target, source)
+    if states is not None:
+        sites = sites[sites["State"].isin(states)].reset_index(drop=True)
+    indptr, indices = coverage_sets(sites["lat"].to_numpy(), sites["lon"].to_numpy(), points["lat"].to_numpy(), points["lon"].to_numpy(), radius_km)
+    chosen, covered_after = lazy_greedy(indptr, indices, demand, covered, n)
+
+    plan = sites.iloc[[c for c, _ in chosen]].reset_index(drop=True)
+    plan.insert(0, "Rank", np.arange(1, len(plan) + 1))
+    plan["Population_Gain"] = np.round([g for _, g in chosen]).astype(np.int64)
+    total = demand.sum()
+    before = demand[covered].sum()
+    plan["Covered_Percent"] = ((before + plan["Population_Gain"].cumsum()) / max(total, 1) * 100).round(2)
+    summary = {"population": float(total), "covered_before": float(before), "covered_after": float(demand[covered_after].sum()),
+               "candidates": len(sites)}
+    return {"sites": plan, "summary": summary}
+
+
+@st.cache_data(show_spinner="Optimizing sites...", max_entries=16)
+def get_site_plan(fingerprint, service, source, n, radius_km, states, _df):
+    # Keyed on the dataset fingerprint and siting inputs; states is a tuple (or None for the whole country)
+    return plan_sites(_df, service, source, n, radius_km, None if states is None else list(states))
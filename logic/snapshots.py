@@ -0,0 +1,186 @@
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from logic.core import BASE_PATH, facility_ids, enrich_registry
+from logic.registry_diff import match_facilities
+from logic.metrics import aggregate_states, compute_structural_deficits, national_deficits
+
+SNAPSHOT_DIR = os.environ.get("PULSESCORE_SNAPSHOT_DIR", os.path.join(BASE_PATH, "dataset", "snapshots"))
+# A full copy is written every CHECKPOINT_EVERY versions so reconstruction replays a bounded number of deltas
+CHECKPOINT_EVERY = 12
+
+OP_ADDED, OP_CHANGED = 0, 1
+
+
+def state_series_rows(df, version):
+    # Per-version state rollup kept alongside the deltas, so history views never replay rows
+    enriched, _ = enrich_registry(df.copy())
+    agg = aggregate_states(enriched)
+    agg.insert(0, "Version", version)
+    agg["Hospitals"] = enriched.groupby("State").size().reindex(agg["State"]).to_numpy()
+    return agg
+
+
+class SnapshotStore:
+    # Successive registry extracts as one base plus row-level deltas keyed by facility id:
+    #   v0001.full.parquet            full copy (every CHECKPOINT_EVERY versions)
+    #   v0002.upserts.parquet         added and changed rows (with _op)
+    #   v0002.removed.parquet         ids of closed facilities
+    #   state_series.parquet          state rollup of every version
+    #   manifest.json                 version list and change counts
+    def __init__(self, root=SNAPSHOT_DIR):
+        self.root = root
+        self.manifest_path = os.path.join(root, "manifest.json")
+
+    def manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {"columns": None, "versions": []}
+        with open(self.manifest_path) as f:
+            return json.load(f)
+
+    def _save_manifest(self, manifest):
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, self.manifest_path)
+
+    def _path(self, version, part):
+        return os.path.join(self.root, f"v{version:04d}.{part}.parquet")
+
+    def versions(self):
+        return pd.DataFrame(self.manifest()["versions"])
+
+    # ============================================================
+    # INGEST
+    # ============================================================
+    def ingest(self, df, label=None):
+        os.makedirs(self.root, exist_ok=True)
+        manifest = self.manifest()
+        versions = manifest["versions"]
+        version = len(versions) + 1
+        columns = manifest["columns"] or list(df.columns)
+        df = df.reindex(columns=columns).reset_index(drop=True)
+        df.insert(0, "_fid", facility_ids(df))
+
+        entry = {"version": version, "label": label or f"v{version}", "rows": len(df),
+                 "ingested": pd.Timestamp.now().isoformat(timespec="seconds")}
+        if version == 1 or (version - 1) % CHECKPOINT_EVERY == 0:
+            df.to_parquet(self._path(version, "full"), index=False)
+            entry["kind"] = "full"
+        else:
+            entry["kind"] = "delta"
+        if version > 1:
+            entry.update(self._write_delta(version, self.reconstruct(version - 1, with_ids=True), df, columns,
+                                           write=entry["kind"] == "delta"))
+        else:
+            entry.update({"added": len(df), "removed": 0, "changed": 0})
+
+        series_path = os.path.join(self.root, "state_series.parquet")
+        series = state_series_rows(df[columns], version)
+        if os.path.exists(series_path):
+            series = pd.concat([pd.read_parquet(series_path), series], ignore_index=True)
+        series.to_parquet(series_path, index=False)
+
+        versions.append(entry)
+        manifest.update({"columns": columns, "versions": versions})
+        self._save_manifest(manifest)
+        return entry
+
+    def _write_delta(self, version, prev, cur, columns, write=True):
+        match = match_facilities(prev["_fid"].to_numpy(), prev, cur["_fid"].to_numpy(), cur, columns)
+        added, changed = match["added"], match["changed"]
+        removed = prev["_fid"][match["removed"]]
+
+        if write:
+            upserts = cur[added | changed].copy()
+            upserts.insert(1, "_op", np.where(added[added | changed], OP_ADDED, OP_CHANGED).astype(np.int8))
+            upserts.to_parquet(self._path(version, "upserts"), index=False)
+            removed.to_frame().to_parquet(self._path(version, "removed"), index=False)
+        return {"added": int(added.sum()), "removed": int(len(removed)), "changed": int(changed.sum())}
+
+    # ============================================================
+    # RECONSTRUCT & AGGREGATE
+    # ============================================================
+    def reconstruct(self, version=None, with_ids=False):
+        # Latest full copy at or before the version, then its deltas in order (row order is not preserved)
+        versions = self.manifest()["versions"]
+        if not versions:
+            raise ValueError("Snapshot store is empty")
+        version = version or len(versions)
+        if not 1 <= version <= len(versions):
+            raise ValueError(f"Unknown version {version} (store has 1-{len(versions)})")
+        base = max(v["version"] for v in versions[:version] if v["kind"] == "full")
+        df = pd.read_parquet(self._path(base, "full"))
+        for v in range(base + 1, version + 1):
+            upserts = pd.read_parquet(self._path(v, "upserts")).drop(columns="_op")
+            removed = pd.read_parquet(self._path(v, "removed"))["_fid"]
+            keep = ~df["_fid"].isin(removed) & ~df["_fid"].isin(upserts["_fid"])
+            df = pd.concat([df[keep], upserts], ignore_index=True)
+        return df if with_ids else df.drop(columns="_fid")
+
+    def load_version(self, version=None):
+        return enrich_registry(self.reconstruct(version))
+
+    def state_series(self):
+        path = os.path.join(self.root, "state_series.parquet")
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        return pd.read_parquet(path).merge(self.versions()[["version", "label"]].rename(columns={"version": "Version", "label": "Label"}), on="Version")
+
+    def national_series(self):
+        # Beds, doctors, ICU coverage and SDS per version, from the stored state rollups
+        if not self.manifest()["versions"]:
+            return pd.DataFrame()
+        rows = []
+        for (version, label), states in self.state_series().groupby(["Version", "Label"], sort=True):
+            deficits = national_deficits(states)
+            hospitals = states["Hospitals"].sum()
+            rows.append({"Version": version, "Label": label, "Hospitals": int(hospitals),
+                         "Total_Beds": int(states["Total_Beds"].sum()), "Total_Doctors": int(states["Total_Doctors"].sum()),
+                         "ICU_Coverage": states["Total_ICU"].sum() / hospitals * 100 if hospitals else 0.0,
+                         "SDS": deficits["SDS"]})
+        return pd.DataFrame(rows)
+
+    def state_sds_series(self):
+        series = self.state_series()
+        if series.empty:
+            return series
+        return compute_structural_deficits(series)[["Version", "Label", "State", "SDS", "Total_Beds", "Total_Doctors", "Total_ICU"]]
+
+    def storage_bytes(self):
+        return sum(os.path.getsize(os.path.join(self.root, f)) for f in os.listdir(self.root)) if os.path.isdir(self.root) else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PulseScore registry snapshot store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_ingest = sub.add_parser("ingest", help="Add a registry extract as the next version")
+    p_ingest.add_argument("path", help="Registry CSV or Parquet")
+    p_ingest.add_argument("--label", default=None, help="Version label, e.g. 2026-09")
+    sub.add_parser("list", help="List stored versions")
+    p_export = sub.add_parser("export", help="Write a reconstructed version to CSV")
+    p_export.add_argument("--version", type=int, default=None)
+    p_export.add_argument("--out", required=True)
+    parser.add_argument("--store", default=SNAPSHOT_DIR)
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.store)
+    if args.command == "ingest":
+        df = pd.read_parquet(args.path) if args.path.endswith(".parquet") else pd.read_csv(args.path)
+        entry = store.ingest(df, args.label)
+        print(f"Stored version {entry['version']} ({entry['label']}, {entry['kind']}): "
+              f"+{entry['added']:,} added, -{entry['removed']:,} removed, ~{entry['changed']:,} changed")
+    elif args.command == "list":
+        print(store.versions().to_string(index=False))
+        print(f"Store size: {store.storage_bytes() / 1024 ** 2:.1f} MB")
+    else:
+        store.reconstruct(args.version).to_csv(args.out, index=False)
+        print(f"Wrote version {args.version or 'latest'} to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
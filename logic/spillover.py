@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.optimize import linprog
+from scipy.spatial import cKDTree
+
+from logic.access import chord_to_km, km_to_chord, unit_xyz
+from logic.metrics import BED_NORM, ICU_NORM, COMPONENT_WEIGHTS
+
+# ============================================================
+# TRANSFER PARAMETERS
+# ============================================================
+# Patients can be moved for beds and ICU; doctors and emergency rooms stay local.
+# SRI component -> (district available column, per-capita norm)
+TRANSFER_RESOURCES = {"B": ("Avail_Beds", BED_NORM), "I": ("Avail_ICU", ICU_NORM)}
+TRANSFER_KM = 100.0
+# Each unit of unmet demand costs more than any transfer, so the solver moves all it can
+UNMET_PENALTY_KM = 1e6
+
+
+def district_centroids(df):
+    # Median facility coordinate of each district
+    located = df.dropna(subset=["lat", "lon"])
+    return located.groupby(["State", "District"])[["lat", "lon"]].median().reset_index()
+
+
+def transfer_edges(lat, lon, max_km):
+    # Directed district pairs within max_km of each other, from a KD-tree pair query
+    valid = np.flatnonzero(~(np.isnan(lat) | np.isnan(lon)))
+    tree = cKDTree(unit_xyz(lat[valid], lon[valid]))
+    pairs = tree.query_pairs(km_to_chord(max_km), output_type="ndarray")
+    i, j = valid[pairs[:, 0]], valid[pairs[:, 1]]
+    dist = chord_to_km(np.linalg.norm(tree.data[pairs[:, 0]] - tree.data[pairs[:, 1]], axis=1))
+    return np.concatenate([i, j]), np.concatenate([j, i]), np.concatenate([dist, dist])
+
+
+def solve_transfers(excess, spare, src, dst, dist):
+    # Min-cost flow as a sparse LP: flows on edges from districts with excess demand to districts
+    # with spare capacity, plus one unmet-demand variable per district. Returns (flows, unmet).
+    n = len(excess)
+    use = (excess[src] > 0) & (spare[dst] > 0)
+    src, dst, dist = src[use], dst[use], dist[use]
+    m = len(src)
+    if m == 0:
+        return np.zeros(0), excess.copy(), (src, dst, dist)
+    cols = np.arange(m)
+    # sum of outflows + unmet = excess (one row per district)
+    a_eq = sp.hstack([sp.csr_matrix((np.ones(m), (src, cols)), shape=(n, m)), sp.identity(n, format="csr")], format="csr")
+    # sum of inflows <= spare
+    a_ub = sp.hstack([sp.csr_matrix((np.ones(m), (dst, cols)), shape=(n, m)), sp.csr_matrix((n, n))], format="csr")
+    cost = np.concatenate([dist, np.full(n, UNMET_PENALTY_KM)])
+    res = linprog(cost, A_ub=a_ub, b_ub=spare, A_eq=a_eq, b_eq=excess, bounds=(0, None), method="highs")
+    if res.status != 0:
+        raise RuntimeError(f"Transfer LP failed: {res.message}")
+    return res.x[:m], res.x[m:], (src, dst, dist)
+
+
+def simulate_spillover(dist_sri, centroids, population, S, E, max_km=TRANSFER_KM):
+    # dist_sri is the compute_district_sri output. Its district requirements are the state's split by
+    # capacity share, which gives every district of a state the same stress, so transfer demand is
+    # taken from each district's own population instead (District_Pop, see logic.population).
+    # Surge demand above a district's elastic capacity moves to neighbours with spare capacity;
+    # the rest stays as residual shortfall.
+    out = dist_sri.merge(centroids, on=["State", "District"], how="left").reset_index(drop=True)
+    pop = out[["State", "District"]].merge(population[["State", "District", "District_Pop"]], on=["State", "District"], how="left")["District_Pop"]
+    out["District_Pop"] = pop.fillna(0).to_numpy(dtype=float)
+    src, dst, dist = transfer_edges(out["lat"].to_numpy(dtype=float), out["lon"].to_numpy(dtype=float), max_km)
+    transfers = []
+    for code, (avail, norm) in TRANSFER_RESOURCES.items():
+        capacity = out[avail].to_numpy(dtype=float) * E
+        demand = out["District_Pop"].to_numpy(dtype=float) * norm * S
+        excess, spare = np.clip(demand - capacity, 0, None), np.clip(capacity - demand, 0, None)
+        flows, unmet, (s, d, km) = solve_transfers(excess, spare, src, dst, dist)
+        inflow = np.bincount(d, weights=flows, minlength=len(out))
+        outflow = np.bincount(s, weights=flows, minlength=len(out))
+        out[f"Transfer_Out_{code}"] = outflow.round(0)
+        out[f"Transfer_In_{code}"] = inflow.round(0)
+        out[f"Demand_{code}"] = demand.round(0)
+        out[f"Shortfall_{code}"] = excess.round(0)
+        out[f"Residual_{code}_Needed"] = unmet.round(0)
+        out[f"Stress_{code}_Before"] = demand / (out[avail].clip(lower=1) * E)
+        out[f"Stress_{code}_After"] = (demand - outflow + inflow) / (out[avail].clip(lower=1) * E)
+        moved = flows > 0.5
+        transfers.append(pd.DataFrame({
+            "Resource": "Beds" if code == "B" else "ICU",
+            "From_State": out["State"].to_numpy()[s[moved]], "From_District": out["District"].to_numpy()[s[moved]],
+            "To_State": out["State"].to_numpy()[d[moved]], "To_District": out["District"].to_numpy()[d[moved]],
+            "Units": flows[moved].round(0), "Distance_km": km[moved].round(1),
+        }))
+
+    w_b, w_d, w_i, w_e = COMPONENT_WEIGHTS
+    out["SRI_Before"] = (w_b * out["Stress_B_Before"] + w_d * out["Stress_D"] + w_i * out["Stress_I_Before"] + w_e * out["Stress_E"]).round(3)
+    out["SRI_After"] = (w_b * out["Stress_B_After"] + w_d * out["Stress_D"] + w_i * out["Stress_I_After"] + w_e * out["Stress_E"]).round(3)
+    transfers = pd.concat(transfers, ignore_index=True).sort_values("Units", ascending=False, ignore_index=True)
+    return out.drop(columns=["lat", "lon"]), transfers
@@ -0,0 +1,138 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from logic.metrics import BED_NORM, DOC_NORM, ICU_NORM, ER_NORM, COMPONENT_WEIGHTS, aggregate_states, aggregate_districts
+from logic.population import disaggregate_population
+from logic.resample import bootstrap_job, rank_desc, sds_kernel, sri_kernel, share_arrays, shared_job
+
+# ============================================================
+# BOOTSTRAP PARAMETERS
+# ============================================================
+BOOTSTRAP_REPS = 1000
+BOOTSTRAP_LEVELS = ("State", "District")
+# Levels each metric is ranked at (see _requirements)
+METRIC_LEVELS = {"SDS": BOOTSTRAP_LEVELS, "SRI": ("State",)}
+CI_LEVEL = 0.95
+TOP_N = 10
+# Facility columns behind beds, doctors, ICU and emergency (SDS/SRI component order)
+FACILITY_COLUMNS = ["Total_Num_Beds", "Number_Doctor", "has_icu", "is_emergency"]
+NORMS = np.array([BED_NORM, DOC_NORM, ICU_NORM, ER_NORM])
+WEIGHTS = np.asarray(COMPONENT_WEIGHTS, dtype=float)
+# Replicates per job; each job has its own seed, so results do not depend on the worker count
+JOB_REPS = 250
+BOOTSTRAP_WORKERS = int(os.environ.get("PULSESCORE_BOOTSTRAP_WORKERS", 0)) or os.cpu_count() or 1
+# Below this many facility draws (facilities x replicates) the pool costs more than it saves
+PARALLEL_DRAWS = 50_000_000
+
+
+# ============================================================
+# BOOTSTRAP POOL
+# ============================================================
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def _pool():
+    # One pool per process, started on first use. The app process runs threads, so workers are
+    # spawned rather than forked; they import only logic.resample.
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ProcessPoolExecutor(max_workers=BOOTSTRAP_WORKERS, mp_context=get_context("spawn"))
+        return _POOL
+
+
+def _reset_pool():
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=False, cancel_futures=True)
+        _POOL = None
+
+
+def _run_jobs(values, group, jobs, workers):
+    # jobs hold everything after (values, group) in bootstrap_job's arguments
+    if min(workers, BOOTSTRAP_WORKERS, len(jobs)) <= 1 or values.shape[0] * sum(j[-2] for j in jobs) < PARALLEL_DRAWS:
+        return [bootstrap_job(values, group, *job) for job in jobs]
+    # The facility arrays go to shared memory once; each job pickles only its name and the group tables
+    shm, spec = share_arrays(values, group)
+    try:
+        return list(_pool().map(shared_job, [spec] * len(jobs), *zip(*jobs)))
+    except BrokenProcessPool:
+        _reset_pool()
+        return [bootstrap_job(values, group, *job) for job in jobs]
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+# ============================================================
+# RANK STABILITY
+# ============================================================
+def _groups(df, level):
+    # Facilities sorted by group, with each group's start offset and size
+    keys = ["State"] if level == "State" else ["State", "District"]
+    facilities = df.dropna(subset=keys).sort_values(keys, kind="stable")
+    group = facilities.groupby(keys, sort=False).ngroup().to_numpy()
+    sizes = np.bincount(group)
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+    values = facilities[FACILITY_COLUMNS].fillna(0).to_numpy(dtype=float)
+    return facilities[keys].iloc[starts].reset_index(drop=True), values, group, starts, sizes
+
+
+def _requirements(df, level, labels, weights):
+    # SDS requirements from the population each group serves; SRI requirements from the state.
+    # District SRI splits the state requirement by capacity share, which gives every district of a
+    # state the state's own stress, so SRI is ranked at state level only (None for districts).
+    state_agg = aggregate_states(df)
+    if level == "State":
+        state_pop = labels["State"].map(state_agg.set_index("State")["State_Pop"]).fillna(0).to_numpy(dtype=float)
+        return state_pop[:, None] * NORMS, state_pop[:, None] * NORMS
+    pop = disaggregate_population(state_agg, aggregate_districts(df), weights)
+    dist_pop = labels.merge(pop[["State", "District", "District_Pop"]], on=["State", "District"], how="left")["District_Pop"]
+    return dist_pop.fillna(0).to_numpy(dtype=float)[:, None] * NORMS, None
+
+
+def _summarize(out, name, point, ranks):
+    tail = (1 - CI_LEVEL) / 2 * 100
+    out[name] = point
+    out[f"{name}_Rank"] = rank_desc(point)
+    out[f"{name}_Rank_Median"] = np.median(ranks, axis=0)
+    out[f"{name}_Rank_Low"] = np.percentile(ranks, tail, axis=0, method="lower").astype(int)
+    out[f"{name}_Rank_High"] = np.percentile(ranks, 100 - tail, axis=0, method="higher").astype(int)
+    out[f"{name}_Top{TOP_N}_Percent"] = ((ranks <= TOP_N).mean(axis=0) * 100).round(1)
+
+
+def bootstrap_ranks(df, level="State", reps=BOOTSTRAP_REPS, weights=None, workers=BOOTSTRAP_WORKERS, seed=0):
+    # Facilities are resampled with replacement within each state (or district) `reps` times;
+    # SDS (and, at state level, SRI) is recomputed for every replicate and group in one array pass per block, and
+    # large runs spread replicate jobs over the shared process pool. Returns the point ranks with their
+    # CI_LEVEL rank intervals. SRI is reported at S = E = 1; multiply by S / E for any other surge.
+    labels, values, group, starts, sizes = _groups(df, level)
+    sds_required, sri_required = _requirements(df, level, labels, weights)
+    totals = np.add.reduceat(values, starts, axis=0)[None] if len(values) else np.zeros((1, 0, len(FACILITY_COLUMNS)))
+
+    out = labels.assign(Facilities=sizes)
+    if out.empty:
+        return out
+    shares = [min(JOB_REPS, reps - start) for start in range(0, reps, JOB_REPS)]
+    jobs = [(starts, sizes, sds_required, sri_required, WEIGHTS, n, s)
+            for n, s in zip(shares, np.random.SeedSequence(seed).spawn(len(shares)))]
+    results = _run_jobs(values, group, jobs, workers)
+    _summarize(out, "SDS", sds_kernel(totals, sds_required, WEIGHTS)[0], np.concatenate([r[0] for r in results]))
+    if sri_required is not None:
+        _summarize(out, "SRI", sri_kernel(totals, sri_required, WEIGHTS)[0], np.concatenate([r[1] for r in results]))
+    return out.sort_values("SDS_Rank", ignore_index=True)
+
+
+@st.cache_data(show_spinner="Bootstrapping rank stability...", max_entries=16)
+def get_rank_stability(fingerprint, norms, filters, level, reps, _scope):
+    # One entry per dataset, norms, filter combination, level and replicate count
+    return _scope.build_rank_stability(level, reps)
@@ -0,0 +1,173 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# State/UT -> (population, centroid lat, centroid lon, area km2); Census-2011 scale
+STATES = {
+    "Uttar Pradesh": (199812341, 26.85, 80.91, 240928), "Maharashtra": (112374333, 19.45, 76.11, 307713),
+    "Bihar": (104099452, 25.60, 85.60, 94163), "West Bengal": (91276115, 23.00, 87.85, 88752),
+    "Madhya Pradesh": (72626809, 23.47, 77.95, 308245), "Tamil Nadu": (72147030, 11.13, 78.66, 130058),
+    "Rajasthan": (68548437, 26.57, 73.84, 342239), "Karnataka": (61095297, 15.32, 75.71, 191791),
+    "Gujarat": (60439692, 22.26, 71.19, 196024), "Andhra Pradesh": (49386799, 15.91, 79.74, 162970),
+    "Odisha": (41974218, 20.51, 84.42, 155707), "Telangana": (35193978, 17.85, 79.01, 112077),
+    "Kerala": (33406061, 10.35, 76.51, 38863), "Jharkhand": (32988134, 23.61, 85.28, 79714),
+    "Assam": (31205576, 26.20, 92.94, 78438), "Punjab": (27743338, 31.15, 75.34, 50362),
+    "Chhattisgarh": (25545198, 21.28, 81.87, 135191), "Haryana": (25351462, 29.06, 76.09, 44212),
+    "Delhi": (16787941, 28.65, 77.23, 1484), "Jammu And Kashmir": (12541302, 33.78, 76.58, 42241),
+    "Uttarakhand": (10086292, 30.07, 79.02, 53483), "Himachal Pradesh": (6864602, 31.90, 77.24, 55673),
+    "Tripura": (3673917, 23.84, 91.28, 10486), "Meghalaya": (2966889, 25.47, 91.37, 22429),
+    "Manipur": (2570390, 24.66, 93.91, 22327), "Nagaland": (1978502, 26.16, 94.56, 16579),
+    "Arunachal Pradesh": (1383727, 28.22, 94.73, 83743), "Puducherry": (1247953, 11.94, 79.81, 479),
+    "Mizoram": (1097206, 23.16, 92.94, 21081), "Chandigarh": (1055450, 30.73, 76.78, 114),
+    "Sikkim": (610577, 27.53, 88.51, 7096), "Andaman And Nicobar Islands": (380581, 11.74, 92.66, 8249),
+    "Dadra And Nagar Haveli": (343709, 20.18, 73.02, 491), "Daman And Diu": (243247, 20.43, 72.84, 112),
+    "Lakshadweep": (64473, 10.57, 72.64, 32),
+}
+
+# Care type label, share of facilities, lognormal bed median, ICU prob, emergency prob, doctors per bed
+CARE_TYPES = [
+    ("Primary", 0.54, 12, 0.02, 0.20, 0.08),
+    ("Secondary", 0.30, 60, 0.25, 0.55, 0.12),
+    ("Tertiary", 0.10, 300, 0.80, 0.90, 0.18),
+    ("Super Speciality", 0.04, 450, 0.95, 0.95, 0.25),
+    ("Clinic", 0.02, 4, 0.00, 0.05, 0.30),
+]
+CATEGORIES = (["Govt", "Private", "Public Sector Undertaking", "Trust/NGO", "Cooperative"],
+              [0.38, 0.45, 0.05, 0.09, 0.03])
+FACILITY_EXTRAS = ["Lab", "Pharmacy", "X-Ray", "Blood Bank", "Ambulance", "OT", "Dialysis", "CT Scan"]
+NAME_STEMS = ["City", "General", "Community", "District", "Sanjeevani", "Lifeline", "Apollo", "Care", "Shanti",
+              "Sri Sai", "Metro", "Civil", "Rural", "Mission", "Seva", "Arogya", "Jeevan", "Sunrise"]
+NAME_KINDS = ["Hospital", "Health Centre", "Medical Centre", "Nursing Home", "Clinic", "Multispeciality Hospital"]
+
+REGISTRY_COLUMNS = ["Hospital_Name", "State", "District", "Pincode", "Location_Coordinates", "Facilities",
+                    "Emergency_Services", "Hospital_Care_Type", "Hospital_Category", "Total_Num_Beds",
+                    "Number_Doctor", "State_Population", "Num_Bed_For_Eco_Weaker_Sec"]
+
+
+def build_geography(seed=0, districts_scale=1.0):
+    # Fixed per seed: districts per state, Zipf-skewed district weights, centroids, pincode bases
+    rng = np.random.default_rng([seed, 0])
+    rows = []
+    for s_idx, (state, (pop, lat, lon, area)) in enumerate(STATES.items()):
+        n_dist = int(np.clip(round(pop / 2.5e6 * districts_scale), 1, 75))
+        spread = np.sqrt(area) / 111 / 2.5
+        weights = 1 / np.arange(1, n_dist + 1) ** 0.8
+        weights = rng.permutation(weights / weights.sum())
+        for d in range(n_dist):
+            rows.append({
+                "State": state,
+                "District": f"{state.split()[0]} District {d + 1:02d}" if n_dist > 1 else state,
+                "State_Population": pop,
+                "Dist_Weight": weights[d] * pop,
+                "Dist_Lat": lat + rng.normal(0, spread),
+                "Dist_Lon": lon + rng.normal(0, spread),
+                "Dist_Spread": spread / np.sqrt(n_dist),
+                "Pin_Base": (11 + s_idx * 2) * 10000 + d * 100,
+            })
+    geo = pd.DataFrame(rows)
+    geo["Dist_Weight"] = geo["Dist_Weight"] / geo["Dist_Weight"].sum()
+    return geo
+
+
+def _facility_strings(rng, n, has_icu):
+    extras = rng.random((n, len(FACILITY_EXTRAS))) < 0.35
+    parts = pd.Series(np.where(has_icu, "ICU, ", ""), dtype=object)
+    for j, name in enumerate(FACILITY_EXTRAS):
+        parts = parts + np.where(extras[:, j], name + ", ", "")
+    parts = parts.str[:-2]
+    return parts.where(parts != "", None).to_numpy()
+
+
+def generate_chunk(geo, n, seed, chunk_id=0):
+    rng = np.random.default_rng([seed, 1, chunk_id])
+    d_idx = rng.choice(len(geo), size=n, p=geo["Dist_Weight"].to_numpy())
+    g = geo.iloc[d_idx].reset_index(drop=True)
+
+    care_labels = [c[0] for c in CARE_TYPES]
+    care_idx = rng.choice(len(CARE_TYPES), size=n, p=[c[1] for c in CARE_TYPES])
+    bed_median = np.array([c[2] for c in CARE_TYPES])[care_idx]
+    icu_prob = np.array([c[3] for c in CARE_TYPES])[care_idx]
+    er_prob = np.array([c[4] for c in CARE_TYPES])[care_idx]
+    doc_ratio = np.array([c[5] for c in CARE_TYPES])[care_idx]
+
+    beds = np.maximum(0, np.round(bed_median * rng.lognormal(0, 0.7, n))).astype(np.int64)
+    doctors = np.round(beds * doc_ratio * rng.lognormal(0, 0.5, n) + rng.poisson(1.5, n)).astype(np.int64)
+    ews = np.round(beds * rng.beta(1.2, 12, n)).astype(np.int64)
+    has_icu = rng.random(n) < icu_prob
+
+    lat = g["Dist_Lat"].to_numpy() + rng.normal(0, 1, n) * g["Dist_Spread"].to_numpy()
+    lon = g["Dist_Lon"].to_numpy() + rng.normal(0, 1, n) * g["Dist_Spread"].to_numpy()
+    coords = pd.Series(lat.round(5)).astype(str) + ", " + pd.Series(lon.round(5)).astype(str)
+    coords = coords.where(rng.random(n) > 0.01, None)  # ~1% missing coordinates
+
+    stems = np.array(NAME_STEMS, dtype=object)[rng.integers(0, len(NAME_STEMS), n)]
+    kinds = np.array(NAME_KINDS, dtype=object)[rng.integers(0, len(NAME_KINDS), n)]
+    names = pd.Series(stems) + " " + pd.Series(kinds) + " " + pd.Series(rng.integers(1, 999, n)).astype(str)
+
+    return pd.DataFrame({
+        "Hospital_Name": names,
+        "State": g["State"],
+        "District": g["District"],
+        "Pincode": g["Pin_Base"].to_numpy() + rng.integers(0, 100, n),
+        "Location_Coordinates": coords,
+        "Facilities": _facility_strings(rng, n, has_icu),
+        "Emergency_Services": np.where(rng.random(n) < er_prob, "Yes", "No"),
+        "Hospital_Care_Type": np.array(care_labels, dtype=object)[care_idx],
+        "Hospital_Category": rng.choice(CATEGORIES[0], size=n, p=CATEGORIES[1]),
+        "Total_Num_Beds": beds,
+        "Number_Doctor": doctors,
+        "State_Population": g["State_Population"],
+        "Num_Bed_For_Eco_Weaker_Sec": ews,
+    }, columns=REGISTRY_COLUMNS)
+
+
+def iter_registry(n_rows, seed=0, chunk_size=1_000_000, districts_scale=1.0):
+    # Output depends only on (n_rows, seed, chunk_size, districts_scale)
+    geo = build_geography(seed, districts_scale)
+    for chunk_id, start in enumerate(range(0, n_rows, chunk_size)):
+        yield generate_chunk(geo, min(chunk_size, n_rows - start), seed, chunk_id)
+
+
+def generate_registry(n_rows, seed=0, chunk_size=1_000_000, districts_scale=1.0):
+    return pd.concat(iter_registry(n_rows, seed, chunk_size, districts_scale), ignore_index=True)
+
+
+def write_registry(path, n_rows, seed=0, chunk_size=1_000_000, districts_scale=1.0):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    writer = None
+    try:
+        for i, chunk in enumerate(iter_registry(n_rows, seed, chunk_size, districts_scale)):
+            if path.endswith(".parquet"):
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                writer = writer or pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+            else:
+                chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    finally:
+        if writer is not None:
+            writer.close()
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a seeded synthetic healthcare registry")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=1_000_000)
+    parser.add_argument("--districts-scale", type=float, default=1.0, help="Multiplier on districts per state")
+    # Required: a default would sit next to (or on) the real registry and overwrite it silently
+    parser.add_argument("--out", required=True, help="Output CSV or .parquet path")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    write_registry(args.out, args.rows, args.seed, args.chunk_size, args.districts_scale)
+    print(f"Wrote {args.rows:,} rows to {args.out} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
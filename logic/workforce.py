@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.optimize import linprog
+
+from logic.metrics import DOC_NORM
+from logic.spillover import transfer_edges
+
+# ============================================================
+# REDEPLOYMENT PARAMETERS
+# ============================================================
+REDEPLOY_MODES = ("Within state", "Within distance")
+REDEPLOY_SHARE = 0.10      # at most this share of a district's doctors can be moved out
+REDEPLOY_KM = 100.0
+
+
+def staffing_requirement(state_agg, dist_agg, S=1.0):
+    # The state doctor requirement follows the beds: each district needs doctors in proportion to its
+    # share of state beds, so equal stress within a state means equal doctors per bed
+    req = (state_agg.set_index("State")["State_Pop"] * DOC_NORM * S)
+    beds = dist_agg["Total_Beds"].to_numpy(dtype=float)
+    state_beds = dist_agg.groupby("State")["Total_Beds"].transform("sum").to_numpy(dtype=float)
+    return dist_agg["State"].map(req).fillna(0).to_numpy(dtype=float) * beds / np.clip(state_beds, 1, None)
+
+
+def state_edges(states):
+    # Every ordered pair of districts in the same state
+    codes = pd.factorize(states)[0]
+    src, dst = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)]
+    for code in np.unique(codes):
+        members = np.flatnonzero(codes == code)
+        i, j = np.repeat(members, len(members)), np.tile(members, len(members))
+        src.append(i[i != j])
+        dst.append(j[i != j])
+    return np.concatenate(src), np.concatenate(dst), None
+
+
+def _staffing_levels(net, outflow, req, docs, needs, groups, share, lower=0.0):
+    # max sum of t_g  s.t.  t_g * req[j] + out_j - in_j <= docs[j]  and  out_i <= share * docs[i]
+    n, m = outflow.shape
+    n_groups = groups.max() + 1
+    levels = sp.csr_matrix((req[needs], (np.arange(len(needs)), groups[needs])), shape=(len(needs), n_groups))
+    a_ub = sp.vstack([sp.hstack([net[needs], levels]), sp.hstack([outflow, sp.csr_matrix((n, n_groups))])], format="csr")
+    b_ub = np.concatenate([docs[needs], share * docs])
+    bounds = [(0, None)] * m + [(lower, None)] * n_groups
+    res = linprog(np.r_[np.zeros(m), -np.ones(n_groups)], A_ub=a_ub, b_ub=b_ub, bounds=bounds, method="highs")
+    if res.status != 0:
+        raise RuntimeError(f"Redeployment LP failed: {res.message}")
+    return levels, res.x[m:] * (1 - 1e-9)
+
+
+def redeploy_doctors(state_agg, dist_agg, mode="Within state", share=REDEPLOY_SHARE, max_km=REDEPLOY_KM, centroids=None, S=1.0, E=1.0):
+    # Sparse LPs over doctor flows on the allowed district pairs. A staffing level t is the doctors
+    # after redeployment per required doctor in the worst district of a group, i.e. 1 / max Stress_D:
+    #   1. maximise the national t (minimise the largest Stress_D anywhere)
+    #   2. keeping that, maximise each state's own t (a national minimax alone only helps the one worst district)
+    #   3. at those levels, minimise the number of doctors moved
+    dist_agg = dist_agg.reset_index(drop=True)
+    docs = dist_agg["Total_Doctors"].to_numpy(dtype=float)
+    req = staffing_requirement(state_agg, dist_agg, S)
+    n = len(dist_agg)
+    if mode == "Within distance" and centroids is not None:
+        located = dist_agg[["State", "District"]].merge(centroids, on=["State", "District"], how="left")
+        src, dst, km = transfer_edges(located["lat"].to_numpy(dtype=float), located["lon"].to_numpy(dtype=float), max_km)
+    else:
+        src, dst, km = state_edges(dist_agg["State"])
+    # Only staffed districts can give and only districts that need doctors take
+    keep = (docs[src] > 0) & (req[dst] > 0)
+    src, dst = src[keep], dst[keep]
+    km = km[keep] if km is not None else None
+    m = len(src)
+    cols = np.arange(m)
+    outflow = sp.csr_matrix((np.ones(m), (src, cols)), shape=(n, m))
+    net = outflow - sp.csr_matrix((np.ones(m), (dst, cols)), shape=(n, m))
+    needs = np.flatnonzero(req > 0)
+
+    flows = np.zeros(m)
+    if m and len(needs):
+        _, national = _staffing_levels(net, outflow, req, docs, needs, np.zeros(n, dtype=np.int64), share)
+        levels, t = _staffing_levels(net, outflow, req, docs, needs, pd.factorize(dist_agg["State"])[0], share, national[0])
+        res = linprog(np.ones(m), A_ub=sp.vstack([net[needs], outflow], format="csr"),
+                      b_ub=np.concatenate([docs[needs] - levels @ t, share * docs]), bounds=(0, None), method="highs")
+        if res.status != 0:
+            raise RuntimeError(f"Redeployment LP failed: {res.message}")
+        flows = np.floor(res.x + 1e-6)
+
+    moved = flows > 0
+    after = docs - np.bincount(src, weights=flows, minlength=n) + np.bincount(dst, weights=flows, minlength=n)
+    out = dist_agg[["State", "District", "Total_Beds"]].copy()
+    out["Doctors_Before"], out["Doctors_After"] = docs.astype(np.int64), after.astype(np.int64)
+    beds = np.clip(out["Total_Beds"].to_numpy(dtype=float), 1, None)
+    out["Doc_per_100Beds_Before"] = (docs / beds * 100).round(1)
+    out["Doc_per_100Beds_After"] = (after / beds * 100).round(1)
+    out["Stress_D_Before"] = np.where(req > 0, req / (np.clip(docs, 1, None) * E), 0).round(3)
+    out["Stress_D_After"] = np.where(req > 0, req / (np.clip(after, 1, None) * E), 0).round(3)
+
+    names = dist_agg[["State", "District"]].to_numpy()
+    moves = pd.DataFrame({"From_State": names[src[moved], 0], "From_District": names[src[moved], 1],
+                          "To_State": names[dst[moved], 0], "To_District": names[dst[moved], 1], "Doctors": flows[moved].astype(np.int64)})
+    if km is not None:
+        moves["Distance_km"] = km[moved].round(1)
+    summary = {"moved": int(flows.sum()), "moves": int(moved.sum()),
+               "max_stress_before": float(out["Stress_D_Before"].max()) if n else 0.0,
+               "max_stress_after": float(out["Stress_D_After"].max()) if n else 0.0,
+               "states_improved": int((out.groupby("State")["Stress_D_After"].max() < out.groupby("State")["Stress_D_Before"].max() - 1e-3).sum())}
+    return {"moves": moves.sort_values("Doctors", ascending=False, ignore_index=True), "districts": out, "summary": summary}
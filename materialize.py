@@ -0,0 +1,115 @@
+import argparse
+import json
+import os
+import shutil
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+from logic.backend import DuckDBBackend, BACKEND, get_backend
+from logic.core import load_data
+from logic.metrics import (compute_structural_deficits, compute_district_deficits, compute_state_sri, compute_district_sri,
+                           compute_resource_rankings)
+
+
+class StageTimer:
+    def __init__(self):
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = time.perf_counter() - start
+            print(f"  {name:<28} {self.stages[name] * 1000:>10.1f} ms")
+
+
+def write_table(frame, out_dir, table, run_date, partition_cols=None):
+    # One directory per table, hive-partitioned by run date (and any extra keys).
+    # Re-running the same date replaces that partition instead of appending to it.
+    partition_dir = os.path.join(out_dir, table, f"run_date={run_date}")
+    if os.path.isdir(partition_dir):
+        shutil.rmtree(partition_dir)
+    frame = frame.assign(run_date=run_date)
+    frame.to_parquet(os.path.join(out_dir, table), engine="pyarrow", index=False,
+                     partition_cols=["run_date"] + list(partition_cols or []))
+    return len(frame)
+
+
+def open_backend(data_path, backend):
+    # DuckDB scans a Parquet registry in place (out-of-core); pandas loads it through load_data
+    if backend == "duckdb" and data_path and data_path.endswith(".parquet"):
+        return DuckDBBackend(data_path)
+    df, state_stats = load_data(data_path)
+    return get_backend(df, state_stats, data_path, kind=backend, materialized=False)
+
+
+def materialize(data_path, out_dir, surge_levels, elasticity, run_date, backend="pandas"):
+    timer = StageTimer()
+    rows = {}
+    print(f"PulseScore batch run {run_date} -> {out_dir} ({backend})")
+
+    with timer.stage("load_data"):
+        scope = open_backend(data_path, backend).scope()
+
+    with timer.stage("aggregate"):
+        facilities = scope.kpis()["total_hospitals"]
+        state_agg = scope.aggregate_states()
+        dist_agg = scope.aggregate_districts()
+
+    with timer.stage("structural_deficits"):
+        rows["state_sds"] = write_table(compute_structural_deficits(state_agg), out_dir, "state_sds", run_date)
+        rows["district_sds"] = write_table(compute_district_deficits(state_agg, dist_agg), out_dir, "district_sds", run_date)
+
+    with timer.stage("surge_risk"):
+        state_frames, dist_frames = [], []
+        for S in surge_levels:
+            state_sri = compute_state_sri(state_agg, S, elasticity)
+            state_frames.append(state_sri.assign(Surge=S))
+            dist_frames.append(compute_district_sri(dist_agg, state_sri, S, elasticity).assign(Surge=S))
+        rows["state_sri"] = write_table(pd.concat(state_frames, ignore_index=True), out_dir, "state_sri", run_date, ["Surge"])
+        rows["district_sri"] = write_table(pd.concat(dist_frames, ignore_index=True), out_dir, "district_sri", run_date, ["Surge"])
+
+    with timer.stage("resource_rankings"):
+        rows["district_resources"] = write_table(compute_resource_rankings(dist_agg), out_dir, "district_resources", run_date)
+
+    with timer.stage("equity"):
+        rows["state_equity"] = write_table(scope.equity(by=("State",)), out_dir, "state_equity", run_date)
+        rows["district_equity"] = write_table(scope.equity(by=("State", "District")), out_dir, "district_equity", run_date)
+
+    manifest = {
+        "run_date": run_date,
+        "source": data_path or "default",
+        "backend": backend,
+        "facilities": facilities,
+        "surge_levels": surge_levels,
+        "elasticity": elasticity,
+        "rows": rows,
+        "timings_s": {k: round(v, 4) for k, v in timer.stages.items()},
+    }
+    with open(os.path.join(out_dir, f"_manifest_{run_date}.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"  {'total':<28} {sum(timer.stages.values()) * 1000:>10.1f} ms")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Materialize PulseScore metrics to partitioned Parquet")
+    parser.add_argument("--data", default=None, help="Registry CSV or Parquet (defaults to the bundled dataset)")
+    parser.add_argument("--backend", choices=["pandas", "duckdb"], default=BACKEND, help="Aggregation backend")
+    parser.add_argument("--out", default="warehouse", help="Output directory")
+    parser.add_argument("--surge", default="1.0,1.5,2.0,2.5,3.0", help="Comma-separated surge multipliers")
+    parser.add_argument("--elasticity", type=float, default=1.15, help="Elasticity factor E")
+    parser.add_argument("--run-date", default=pd.Timestamp.now().strftime("%Y-%m-%d"))
+    args = parser.parse_args()
+
+    surge_levels = [float(s) for s in args.surge.split(",") if s.strip()]
+    os.makedirs(args.out, exist_ok=True)
+    materialize(args.data, args.out, surge_levels, args.elasticity, args.run_date, args.backend)
+
+
+if __name__ == "__main__":
+    main()
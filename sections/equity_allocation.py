@@ -3,7 +3,7 @@ from plotly import express as px
 from plotly import graph_objects as go
 import pandas as pd
 
-def render_equity_allocation(filtered_df, sub_text, get_k_color):
+def render_equity_allocation(filtered_df, scope, sub_text, get_k_color):
     st.markdown('<div class="card-header" style="font-size: 2.5rem; margin-bottom: 5px;">Social Equity & EWS Allocation Intelligence</div>', unsafe_allow_html=True)
     st.markdown('<p style="color: #94a3b8; font-size: 1.1rem; margin-bottom: 1.5rem;">Monitoring Economically Weaker Section (EWS) safeguards and allocative fairness across sectors.</p>', unsafe_allow_html=True)
 
@@ -55,13 +55,10 @@ def render_equity_allocation(filtered_df, sub_text, get_k_color):
     st.markdown("""Analyzing current EWS bed gaps and population densities to recommend strategic asset placement.""")
     
     # Simple logic: Districts with highest beds but < 5% EWS share are high priority for mandates
-    dist_priority = filtered_df.groupby(["State", "District"]).agg({
-        "Total_Num_Beds": "sum",
-        "Num_Bed_For_Eco_Weaker_Sec": "sum"
-    }).reset_index()
-    dist_priority["EWS_Share"] = (dist_priority["Num_Bed_For_Eco_Weaker_Sec"] / dist_priority["Total_Num_Beds"] * 100).round(2)
+    dist_priority = scope.equity(by=("State", "District"))
     
     priority_table = dist_priority[dist_priority["Total_Num_Beds"] > 500].sort_values("EWS_Share", ascending=True).head(10)
+    priority_table = priority_table[["State", "District", "Total_Num_Beds", "Num_Bed_For_Eco_Weaker_Sec", "EWS_Share"]]
     priority_table.columns = ["State", "District", "Current Total Beds", "EWS Beds", "EWS Share (%)"]
     
     st.dataframe(priority_table, use_container_width=True)
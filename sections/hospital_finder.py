@@ -1,7 +1,10 @@
 import streamlit as st
 import pandas as pd
-from geopy.distance import geodesic
+import numpy as np
 import textwrap
+from logic.geo import nearest_facilities
+from logic.profiling import span
+from logic.result_store import get_result_store, session_key, materialize, format_bytes
 
 def render_hospital_card(row, distance=None):
     # Safe Numbers
@@ -39,7 +42,44 @@ def render_hospital_card(row, distance=None):
 """
     st.markdown(card_html, unsafe_allow_html=True)
 
-def render_hospital_finder(df_raw, sub_text):
+def search_by_gps(df_raw, lat, lon, radius):
+    # Vectorized haversine over the whole registry (rows without coordinates never match)
+    idx, dist = nearest_facilities(df_raw, lat, lon, radius)
+    return df_raw.iloc[idx].assign(distance=dist)
+
+def search_by_district(df_raw, district_query):
+    return df_raw[df_raw["District"].str.contains(district_query, case=False, na=False)]
+
+def search_by_pincode(df_raw, pincode_query):
+    return df_raw[df_raw["Pincode"].astype(str).str.contains(str(pincode_query), na=False)]
+
+def store_results(slot, df_raw, fingerprint, results, extra_cols=()):
+    # Keep only row ids (and small per-row arrays) in the bounded session result store; the
+    # dataset's source fingerprint ties them to the registry they index into
+    rows = df_raw.index.get_indexer(results.index)
+    extra = {c: results[c].to_numpy(np.float32) for c in extra_cols}
+    get_result_store().put(session_key(), slot, rows, fingerprint, extra=extra)
+    st.session_state.setdefault("finder_slots", set()).add(slot)
+
+def load_results(slot, df_raw, fingerprint):
+    store = get_result_store()
+    entry = store.get(session_key(), slot, fingerprint)
+    if entry is None:
+        if slot in st.session_state.get("finder_slots", set()):
+            st.session_state.finder_slots.discard(slot)
+            st.info("Previous results were released from the session cache. Run the query again to restore them.")
+        return None
+
+    usage = store.usage(session_key())
+    note = f"Result cache: {format_bytes(usage['session_bytes'])} this session \u00b7 {format_bytes(usage['global_bytes'])} of {format_bytes(usage['global_budget'])} across {usage['sessions']} sessions"
+    if entry["total"] > len(entry["rows"]):
+        note = f"Showing the first {len(entry['rows']):,} of {entry['total']:,} matches (session result budget) \u00b7 " + note
+    st.caption(note)
+    return materialize(df_raw, entry)
+
+@st.fragment
+def render_hospital_finder(df_raw, fingerprint, sub_text):
+    # Finder inputs and queries re-run only this page body, not the whole app
     search_mode = st.radio("Search Context", ["Coordinates (GPS)", "District Name", "Pincode"], horizontal=True, label_visibility="collapsed")
 
     # Ensure GPS columns exist in df_raw for robust search
@@ -58,20 +98,12 @@ def render_hospital_finder(df_raw, sub_text):
         st.info("Tip: Try the default coordinates (Odisha) to verify results, or enter your own.")
 
         if st.button("Query Nearby Facilities", use_container_width=True):
-            user_loc = (lat, lon)
-            def calculate_dist(row):
-                try: 
-                    if pd.isna(row["lat"]) or pd.isna(row["lon"]): return float("inf")
-                    return geodesic(user_loc, (row["lat"], row["lon"])).km
-                except: return float("inf")
-            
             with st.spinner("Calculating distances across registry..."):
-                df_search = df_raw.copy()
-                df_search["distance"] = df_search.apply(calculate_dist, axis=1)
-                st.session_state.gps_results = df_search[df_search["distance"] <= radius].sort_values("distance")
+                with span("finder.gps_query"):
+                    store_results("gps", df_raw, fingerprint, search_by_gps(df_raw, lat, lon, radius), extra_cols=("distance",))
 
-        if "gps_results" in st.session_state:
-            results = st.session_state.gps_results
+        results = load_results("gps", df_raw, fingerprint)
+        if results is not None:
             if len(results) == 0:
                 st.warning(f"No facilities located within {radius} km of ({lat}, {lon}). Try increasing the radius.")
             else:
@@ -92,11 +124,11 @@ def render_hospital_finder(df_raw, sub_text):
         district_query = st.text_input("Enter District Keyword (e.g., Pune, Lucknow)")
         if district_query:
             if st.button("Search by District", use_container_width=True):
-                matches = df_raw[df_raw["District"].str.contains(district_query, case=False, na=False)]
-                st.session_state.dt_results = matches
+                with span("finder.district_query"):
+                    store_results("district", df_raw, fingerprint, search_by_district(df_raw, district_query))
 
-            if "dt_results" in st.session_state:
-                results = st.session_state.dt_results
+            results = load_results("district", df_raw, fingerprint)
+            if results is not None:
                 if len(results) == 0:
                     st.warning("No matching districts found in the registry.")
                 else:
@@ -117,11 +149,11 @@ def render_hospital_finder(df_raw, sub_text):
         pincode_query = st.text_input("Enter 6-Digit Pincode")
         if pincode_query:
             if st.button("Search by Pincode", use_container_width=True):
-                matches = df_raw[df_raw["Pincode"].astype(str).str.contains(str(pincode_query), na=False)]
-                st.session_state.pc_results = matches
+                with span("finder.pincode_query"):
+                    store_results("pincode", df_raw, fingerprint, search_by_pincode(df_raw, pincode_query))
 
-            if "pc_results" in st.session_state:
-                results = st.session_state.pc_results
+            results = load_results("pincode", df_raw, fingerprint)
+            if results is not None:
                 if len(results) == 0:
                     st.warning("No facilities registered under this Pincode.")
                 else:
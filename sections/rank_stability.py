@@ -0,0 +1,40 @@
+import streamlit as st
+from plotly import graph_objects as go
+from logic.profiling import span
+from logic.stability import BOOTSTRAP_REPS, CI_LEVEL, METRIC_LEVELS, TOP_N
+
+@st.fragment
+def render_rank_stability(scope, metric, sub_text, scale=1.0):
+    # Shared by Structural Gap Diagnosis (SDS) and Surge Risk Intelligence (SRI); both read the
+    # same cached bootstrap, so the second page is free once the first has run it
+    key = metric.lower()
+    st.markdown(f"<p style='font-size:0.9rem; color:#94a3b8;'>Facilities are resampled with replacement within each {' or '.join(l.lower() for l in METRIC_LEVELS[metric])} and the {metric} ranking is recomputed for every replicate. Bars span the {CI_LEVEL:.0%} rank interval; wide bars mean the exact ordering is not supported by the data.</p>", unsafe_allow_html=True)
+    c1, c2, c3 = st.columns(3)
+    level = c1.radio("Level", METRIC_LEVELS[metric], horizontal=True, key=f"{key}_stability_level")
+    reps = c2.select_slider("Replicates", options=[250, 500, 1000, 2000, 5000], value=BOOTSTRAP_REPS, key=f"{key}_stability_reps")
+    if not c3.toggle("Run bootstrap", key=f"{key}_stability_on"):
+        return
+
+    with span(f"rank_stability.{key}"):
+        ranks = scope.rank_stability(level, reps)
+    if ranks is None or ranks.empty:
+        st.info("Rank stability needs the row-level registry.")
+        return
+    ranks = ranks.sort_values(f"{metric}_Rank", ignore_index=True)
+    ranks[metric] = (ranks[metric] * scale).round(3)
+    label = ranks["District"] if level == "District" else ranks["State"]
+    top = ranks.head(20).assign(Label="<b>" + label.head(20) + "</b>").iloc[::-1]
+
+    rank, low, high = top[f"{metric}_Rank"], top[f"{metric}_Rank_Low"], top[f"{metric}_Rank_High"]
+    fig = go.Figure(go.Scatter(x=rank, y=top["Label"], mode="markers", marker=dict(color="#38bdf8", size=11),
+                               error_x=dict(type="data", symmetric=False, array=(high - rank).clip(lower=0), arrayminus=(rank - low).clip(lower=0), color="#94a3b8", thickness=2),
+                               customdata=top[[f"{metric}_Rank_Low", f"{metric}_Rank_High", f"{metric}_Top{TOP_N}_Percent"]],
+                               hovertemplate="Rank %{x} (%{customdata[0]}-%{customdata[1]})<br>Top " + str(TOP_N) + " in %{customdata[2]}% of replicates<extra></extra>"))
+    fig.update_layout(height=560, margin=dict(l=0, r=0, t=10, b=0), paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
+                      font=dict(color=sub_text, size=16), xaxis=dict(title=f"{metric} Rank (1 = highest)", autorange="reversed"))
+    st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
+
+    cols = [c for c in ("State", "District") if c in ranks.columns] + ["Facilities", metric] + [c for c in ranks.columns if c.startswith(f"{metric}_")]
+    st.caption(f"{(ranks[f'{metric}_Rank_High'] - ranks[f'{metric}_Rank_Low'] <= 2).sum()} of {len(ranks)} {level.lower()} ranks are pinned within 2 places across {reps:,} replicates.")
+    st.dataframe(ranks[cols], use_container_width=True, hide_index=True, height=350)
+    st.download_button("Download Rank Intervals CSV", data=ranks[cols].to_csv(index=False).encode("utf-8"), file_name=f"{key}_rank_stability_{level.lower()}.csv", mime="text/csv", use_container_width=True, key=f"{key}_stability_download")
@@ -0,0 +1,76 @@
+import streamlit as st
+from plotly import graph_objects as go
+from logic.core import load_data, DEFAULT_DATASET_PATH
+from logic.profiling import span
+from logic.registry_diff import diff_registries
+from logic.shared_data import source_fingerprint
+
+@st.cache_data(show_spinner="Comparing registries...", max_entries=4)
+def cached_diff(old_key, new_key, _old, _new):
+    # Keyed on the two source fingerprints; the frames themselves are not hashed
+    return diff_registries(_old, _new)
+
+def render_registry_diff(df_raw, uploaded_file, sub_text):
+    st.markdown('<div class="card-header" style="font-size: 2.5rem; margin-bottom: 5px;">Registry Diff</div>', unsafe_allow_html=True)
+    st.markdown('<p style="color: #94a3b8; font-size: 1.1rem; margin-bottom: 1.5rem;">New, closed and changed facilities between two registry files, with the resulting shift in state SDS and SRI.</p>', unsafe_allow_html=True)
+
+    c1, c2 = st.columns(2)
+    with c1:
+        baseline_file = st.file_uploader("Baseline Registry (defaults to the active dataset)", type=["csv"], key="diff_baseline")
+    with c2:
+        updated_file = st.file_uploader("Updated Registry", type=["csv"], key="diff_updated")
+
+    if updated_file is None:
+        st.info("Upload an updated registry extract to compare it against the baseline.")
+        return
+
+    # Both sides load through the shared registry cache, so they arrive enriched and are not re-parsed on reruns
+    with span("registry_diff.load"):
+        try:
+            if baseline_file is not None:
+                old, _ = load_data(baseline_file)
+                old_key = source_fingerprint(baseline_file)
+            else:
+                old = df_raw
+                old_key = source_fingerprint(uploaded_file if uploaded_file is not None else DEFAULT_DATASET_PATH)
+            new, _ = load_data(updated_file)
+            new_key = source_fingerprint(updated_file)
+        except ValueError as e:
+            st.error(f"A registry file could not be loaded. {e}")
+            return
+
+    with span("registry_diff.compute"):
+        diff = cached_diff(old_key, new_key, old, new)
+    s = diff["summary"]
+
+    k1, k2, k3, k4 = st.columns(4)
+    k1.markdown(f'<div class="kpi-card card-blue"><div class="kpi-title">New Facilities</div><div class="kpi-value">+{s["added"]:,}</div><div class="kpi-percent">{s["old_rows"]:,} → {s["new_rows"]:,} total</div></div>', unsafe_allow_html=True)
+    k2.markdown(f'<div class="kpi-card card-red"><div class="kpi-title">Closed Facilities</div><div class="kpi-value">-{s["removed"]:,}</div><div class="kpi-percent">Not in Updated File</div></div>', unsafe_allow_html=True)
+    k3.markdown(f'<div class="kpi-card card-orange"><div class="kpi-title">Changed Facilities</div><div class="kpi-value">{s["changed"]:,}</div><div class="kpi-percent">{s["beds_delta"]:+,} Beds · {s["doctors_delta"]:+,} Doctors</div></div>', unsafe_allow_html=True)
+    k4.markdown(f'<div class="kpi-card card-purple"><div class="kpi-title">National SDS</div><div class="kpi-value">{s["sds_new"]:.2f}</div><div class="kpi-percent">{s["sds_new"] - s["sds_old"]:+.2f} vs Baseline</div></div>', unsafe_allow_html=True)
+
+    states = diff["states"]
+    moved = states[states["SDS_Delta"] != 0].head(20).sort_values("SDS_Delta")
+    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+    st.markdown('<div class="card-header">Largest State SDS Shifts</div>', unsafe_allow_html=True)
+    if not moved.empty:
+        colors = ["#ef4444" if d > 0 else "#10b981" for d in moved["SDS_Delta"]]
+        fig = go.Figure(go.Bar(x=moved["SDS_Delta"], y=moved["State"], orientation="h", marker_color=colors, text=moved["SDS_Delta"].round(2), textposition="outside"))
+        fig.update_layout(height=max(250, len(moved) * 28), margin=dict(l=0, r=40, t=10, b=0), paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font=dict(color=sub_text, size=16), xaxis_title="SDS Change (positive = larger deficit)")
+        st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
+    else:
+        st.success("No state SDS changed between the two registries.")
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+    st.markdown('<div class="card-header">State Impact (SDS & Baseline SRI)</div>', unsafe_allow_html=True)
+    st.dataframe(states[["State", "Added", "Removed", "Changed", "Beds_Old", "Beds_New", "Beds_Delta", "Doctors_Delta", "ICU_Delta",
+                         "SDS_Old", "SDS_New", "SDS_Delta", "SRI_Old", "SRI_New", "SRI_Delta"]], use_container_width=True, hide_index=True, height=400)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    tab_added, tab_removed, tab_changed = st.tabs([f"New ({s['added']:,})", f"Closed ({s['removed']:,})", f"Changed ({s['changed']:,})"])
+    for tab, name in ((tab_added, "added"), (tab_removed, "removed"), (tab_changed, "changed")):
+        with tab:
+            table = diff[name]
+            st.dataframe(table.head(5000), use_container_width=True, hide_index=True, height=400)
+            st.download_button(f"Download {name.title()} Facilities CSV", data=table.to_csv(index=False).encode("utf-8"), file_name=f"registry_diff_{name}.csv", mime="text/csv", use_container_width=True, key=f"diff_download_{name}")
@@ -0,0 +1,83 @@
+import os
+import streamlit as st
+from plotly import express as px
+from plotly import graph_objects as go
+from logic.core import DERIVED_COLUMNS
+from logic.profiling import span
+from logic.result_store import format_bytes
+from logic.snapshots import SnapshotStore
+
+@st.cache_data(show_spinner=False)
+def load_history(root, manifest_mtime):
+    # Keyed on the manifest's mtime so a new ingest is picked up on the next rerun
+    store = SnapshotStore(root)
+    return store.versions(), store.national_series(), store.state_sds_series(), store.storage_bytes()
+
+def render_registry_history(df_raw, sub_text):
+    st.markdown('<div class="card-header" style="font-size: 2.5rem; margin-bottom: 5px;">Registry Version History</div>', unsafe_allow_html=True)
+    st.markdown('<p style="color: #94a3b8; font-size: 1.1rem; margin-bottom: 1.5rem;">Monthly registry extracts stored as row-level deltas, with capacity and SDS trends across versions.</p>', unsafe_allow_html=True)
+
+    store = SnapshotStore()
+    with st.expander("Add Current Dataset as a New Version", expanded=not store.manifest()["versions"]):
+        label = st.text_input("Version Label (e.g., 2026-09)")
+        if st.button("Ingest Snapshot", use_container_width=True, disabled=not label):
+            with st.spinner("Computing row-level delta against the previous version..."):
+                with span("registry_history.ingest"):
+                    raw = df_raw.drop(columns=[c for c in DERIVED_COLUMNS if c in df_raw.columns])
+                    entry = store.ingest(raw, label)
+            st.success(f"Stored version {entry['version']} ({entry['kind']}): +{entry['added']:,} added, -{entry['removed']:,} removed, ~{entry['changed']:,} changed")
+        st.caption("Extracts can also be ingested offline: python -m logic.snapshots ingest registry.csv --label 2026-09")
+
+    if not store.manifest()["versions"]:
+        st.info("No registry versions stored yet.")
+        return
+
+    with span("registry_history.load"):
+        versions, national, state_sds, size = load_history(store.root, os.path.getmtime(store.manifest_path))
+
+    latest = national.iloc[-1]
+    k1, k2, k3, k4 = st.columns(4)
+    k1.markdown(f'<div class="kpi-card card-purple"><div class="kpi-title">Stored Versions</div><div class="kpi-value">{len(versions)}</div><div class="kpi-percent">{versions["label"].iloc[0]} → {versions["label"].iloc[-1]}</div></div>', unsafe_allow_html=True)
+    k2.markdown(f'<div class="kpi-card card-blue"><div class="kpi-title">Latest Facilities</div><div class="kpi-value">{latest["Hospitals"]:,}</div><div class="kpi-percent">{latest["Label"]}</div></div>', unsafe_allow_html=True)
+    k3.markdown(f'<div class="kpi-card card-indigo"><div class="kpi-title">Latest National SDS</div><div class="kpi-value">{latest["SDS"]:.1f}</div><div class="kpi-percent">Structural Deficit</div></div>', unsafe_allow_html=True)
+    k4.markdown(f'<div class="kpi-card card-pink"><div class="kpi-title">Store Size</div><div class="kpi-value">{format_bytes(size)}</div><div class="kpi-percent">Deltas + Checkpoints</div></div>', unsafe_allow_html=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+        st.markdown('<div class="card-header">Beds & Doctors by Version</div>', unsafe_allow_html=True)
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=national["Label"], y=national["Total_Beds"], mode="lines+markers", name="Beds", line=dict(color="#38bdf8", width=3)))
+        fig.add_trace(go.Scatter(x=national["Label"], y=national["Total_Doctors"], mode="lines+markers", name="Doctors", line=dict(color="#ec4899", width=3), yaxis="y2"))
+        fig.update_layout(height=400, margin=dict(l=0, r=0, t=30, b=0), paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font=dict(color=sub_text, size=16), yaxis2=dict(overlaying="y", side="right"), legend=dict(orientation="h", y=1.15))
+        st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    with col2:
+        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+        st.markdown('<div class="card-header">ICU Coverage & National SDS</div>', unsafe_allow_html=True)
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=national["Label"], y=national["ICU_Coverage"], mode="lines+markers", name="ICU Coverage (%)", line=dict(color="#8b5cf6", width=3)))
+        fig.add_trace(go.Scatter(x=national["Label"], y=national["SDS"], mode="lines+markers", name="SDS", line=dict(color="#f59e0b", width=3), yaxis="y2"))
+        fig.update_layout(height=400, margin=dict(l=0, r=0, t=30, b=0), paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font=dict(color=sub_text, size=16), yaxis2=dict(overlaying="y", side="right"), legend=dict(orientation="h", y=1.15))
+        st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    render_state_trend(state_sds, sub_text)
+
+    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+    st.markdown('<div class="card-header">Stored Versions</div>', unsafe_allow_html=True)
+    st.dataframe(versions[["version", "label", "kind", "rows", "added", "removed", "changed", "ingested"]], use_container_width=True, hide_index=True)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+@st.fragment
+def render_state_trend(state_sds, sub_text):
+    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+    st.markdown('<div class="card-header">State SDS Trend</div>', unsafe_allow_html=True)
+    latest = state_sds[state_sds["Version"] == state_sds["Version"].max()].sort_values("SDS", ascending=False)
+    states = st.multiselect("States", sorted(state_sds["State"].unique()), default=latest["State"].head(5).tolist(), key="history_states")
+    trend = state_sds[state_sds["State"].isin(states)]
+    fig = px.line(trend, x="Label", y="SDS", color="State", markers=True, height=450)
+    fig.update_layout(margin=dict(l=0, r=0, t=10, b=0), paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font=dict(color=sub_text, size=16), xaxis_title="", legend=dict(orientation="h", y=-0.15))
+    st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
+    st.markdown('</div>', unsafe_allow_html=True)
@@ -2,22 +2,22 @@ import streamlit as st
 from plotly import express as px
 from plotly import graph_objects as go
 import pandas as pd
+from logic.metrics import compute_resource_rankings
+from logic.profiling import span
+from logic.workforce import REDEPLOY_MODES, REDEPLOY_SHARE, REDEPLOY_KM, redeploy_doctors
 
-def render_resource_distribution(filtered_df, sub_text, get_k_color):
+def render_resource_distribution(filtered_df, scope, sub_text, get_k_color):
     st.markdown('<div class="card-header" style="font-size: 2.5rem; margin-bottom: 5px;">District Infrastructure & Critical Care Distribution</div>', unsafe_allow_html=True)
     st.markdown('<p style="color: #94a3b8; font-size: 1.1rem; margin-bottom: 1.5rem;">Where are healthcare resources concentrated at district level, and where do critical gaps exist?</p>', unsafe_allow_html=True)
 
     # ============================================================
     # DISTRICT-LEVEL AGGREGATION
     # ============================================================
-    dist_agg = filtered_df.groupby(["State", "District"]).agg(
-        Total_Beds=("Total_Num_Beds", "sum"),
-        Total_Doctors=("Number_Doctor", "sum"),
-        ICU_Count=("has_icu", "sum"),
-        Emergency_Count=("is_emergency", "sum"),
-    ).reset_index()
-
-    dist_agg["Doc_per_100Beds"] = ((dist_agg["Total_Doctors"] / dist_agg["Total_Beds"].clip(1)) * 100).round(1)
+    with span("resource_distribution.aggregate"):
+        dist_agg = compute_resource_rankings(scope.aggregate_districts())
+        access = scope.district_access()
+        if access is not None:
+            dist_agg = dist_agg.merge(access, on=["State", "District"], how="left")
 
     # ============================================================
     # NATIONAL KPIs
@@ -134,7 +134,26 @@ def render_resource_distribution(filtered_df, sub_text, get_k_color):
         st.markdown('</div>', unsafe_allow_html=True)
 
     # ============================================================
-    # SECTION 4: DOCTOR-TO-BED RATIO
+    # SECTION 4: ACCESS DISTANCE (precomputed nearest-facility distances)
+    # ============================================================
+    if "ICU_Access_P90_km" in dist_agg.columns:
+        st.markdown('<div style="margin: 2rem 0 0.5rem; font-size: 1.2rem; font-weight: 700; color: #34d399; text-transform: uppercase; letter-spacing: 1px;">Access Distance</div>', unsafe_allow_html=True)
+        a1, a2 = st.columns(2)
+        for col, target, label, scale in ((a1, "ICU", "ICU", ["#064e3b", "#10b981", "#6ee7b7"]), (a2, "Tertiary", "Tertiary Care", ["#7c2d12", "#ea580c", "#fdba74"])):
+            with col:
+                st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+                st.markdown(f'<div class="card-header">Top 10 Districts \u2013 Farthest From {label} (P90 km)</div>', unsafe_allow_html=True)
+                far = dist_agg.dropna(subset=[f"{target}_Access_P90_km"]).sort_values(f"{target}_Access_P90_km", ascending=False).head(10).sort_values(f"{target}_Access_P90_km", ascending=True).copy()
+                far["District"] = "<b>" + far["District"] + "</b>"
+                fig = px.bar(far, y="District", x=f"{target}_Access_P90_km", orientation="h", height=350,
+                             color=f"{target}_Access_P90_km", color_continuous_scale=scale,
+                             hover_data={"State": True, f"{target}_Access_Median_km": True})
+                fig.update_layout(margin=dict(l=0, r=0, t=10, b=0), paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font=dict(color=sub_text, size=18), coloraxis_showscale=False, yaxis=dict(tickfont=dict(size=16, family="Plus Jakarta Sans")), xaxis_title="90th Percentile Distance (km)", xaxis=dict(tickfont=dict(size=16, family="Plus Jakarta Sans"), title_font=dict(size=18, weight="bold")))
+                st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
+                st.markdown('</div>', unsafe_allow_html=True)
+
+    # ============================================================
+    # SECTION 5: DOCTOR-TO-BED RATIO
     # ============================================================
     st.markdown('<div style="margin: 2rem 0 0.5rem; font-size: 1.2rem; font-weight: 700; color: #f59e0b; text-transform: uppercase; letter-spacing: 1px;">Workforce Balance</div>', unsafe_allow_html=True)
     w1, w2 = st.columns(2)
@@ -166,8 +185,13 @@ def render_resource_distribution(filtered_df, sub_text, get_k_color):
         st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
         st.markdown('</div>', unsafe_allow_html=True)
 
+    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+    st.markdown('<div class="card-header">Doctor Redeployment Optimizer</div>', unsafe_allow_html=True)
+    render_redeployment_panel(scope.aggregate_states(), dist_agg, scope.district_centroids(), sub_text)
+    st.markdown('</div>', unsafe_allow_html=True)
+
     # ============================================================
-    # SECTION 5: CARE TYPE DISTRIBUTION (State-Level Grouped Bar)
+    # SECTION 6: CARE TYPE DISTRIBUTION (State-Level Grouped Bar)
     # ============================================================
     st.markdown('<div style="margin: 2rem 0 0.5rem; font-size: 1.2rem; font-weight: 700; color: #06b6d4; text-transform: uppercase; letter-spacing: 1px;">Care Hierarchy</div>', unsafe_allow_html=True)
     st.markdown('<div class="chart-container">', unsafe_allow_html=True)
@@ -175,7 +199,7 @@ def render_resource_distribution(filtered_df, sub_text, get_k_color):
 
     care_col = "Care_Level_Clean" if "Care_Level_Clean" in filtered_df.columns else "Hospital_Care_Type"
     if care_col in filtered_df.columns:
-        care_state = filtered_df.groupby(["State", care_col]).size().reset_index(name="Count").copy()
+        care_state = scope.count_by(["State", care_col])
         care_state["State"] = "<b>" + care_state["State"] + "</b>"
         fig_care = px.bar(care_state, x="State", y="Count", color=care_col, barmode="group", height=400,
                           color_discrete_sequence=["#06b6d4", "#8b5cf6", "#ec4899", "#f59e0b"])
@@ -192,3 +216,27 @@ def render_resource_distribution(filtered_df, sub_text, get_k_color):
         st.info("Care Type column not available in this dataset.")
 
     st.markdown('</div>', unsafe_allow_html=True)
+
+
+@st.fragment
+def render_redeployment_panel(state_agg, dist_agg, centroids, sub_text):
+    # Changing the redeployment limits re-runs only this panel
+    st.markdown("<p style='font-size:0.9rem; color:#94a3b8;'>Each district needs doctors in line with its share of state beds. A linear program moves doctors so that the worst-staffed district, nationally and then in each state, has the lowest possible Stress_D (required / available doctors), moving as few doctors as it can.</p>", unsafe_allow_html=True)
+    c1, c2, c3 = st.columns(3)
+    mode = c1.radio("Moves Allowed", REDEPLOY_MODES, horizontal=True, key="redeploy_mode")
+    share = c2.slider("Max Share Moved Out of a District (%)", 5, 30, int(REDEPLOY_SHARE * 100), step=5, key="redeploy_share") / 100
+    max_km = c3.slider("Max Distance (km)", 25, 300, int(REDEPLOY_KM), step=25, key="redeploy_km", disabled=mode != "Within distance")
+    with span("resource_distribution.redeployment"):
+        plan = redeploy_doctors(state_agg, dist_agg, mode, share, float(max_km), centroids)
+    s = plan["summary"]
+    r1, r2, r3 = st.columns(3)
+    r1.markdown(f'<div class="kpi-card card-blue"><div class="kpi-title">Doctors Redeployed</div><div class="kpi-value">{s["moved"]:,}</div><div class="kpi-percent">{s["moves"]:,} Moves</div></div>', unsafe_allow_html=True)
+    r2.markdown(f'<div class="kpi-card card-orange"><div class="kpi-title">Worst Stress_D</div><div class="kpi-value">{s["max_stress_after"]:.2f}</div><div class="kpi-percent">{s["max_stress_before"]:.2f} Before</div></div>', unsafe_allow_html=True)
+    r3.markdown(f'<div class="kpi-card card-green"><div class="kpi-title">States Improved</div><div class="kpi-value">{s["states_improved"]}</div><div class="kpi-percent">Lower Worst-District Stress</div></div>', unsafe_allow_html=True)
+    if plan["moves"].empty:
+        st.info("No redeployment lowers staffing stress within these limits.")
+        return
+    st.dataframe(plan["moves"], use_container_width=True, hide_index=True, height=300)
+    changed = plan["districts"][plan["districts"]["Doctors_After"] != plan["districts"]["Doctors_Before"]]
+    st.dataframe(changed.sort_values("Stress_D_Before", ascending=False), use_container_width=True, hide_index=True, height=300)
+    st.download_button("Download Redeployment Plan CSV", data=plan["moves"].to_csv(index=False).encode("utf-8"), file_name="doctor_redeployment.csv", mime="text/csv", use_container_width=True, key="redeploy_download")
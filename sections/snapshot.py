@@ -2,8 +2,9 @@ import streamlit as st
 from plotly import express as px
 from plotly import graph_objects as go
 import json, os
+from logic.profiling import span
 
-def render_snapshot(filtered_df, state_stats_raw, total_population, total_beds, total_doctors, distinct_states, distinct_uts, icu_percent, emergency_percent, sub_text, get_k_color=None):
+def render_snapshot(filtered_df, scope, state_stats_raw, total_population, total_beds, total_doctors, distinct_states, distinct_uts, icu_percent, emergency_percent, sub_text, get_k_color=None):
     img_html = ""
     if hasattr(st.session_state, "avatar_b64") and st.session_state.avatar_b64:
         img_html = f'<img src="data:image/png;base64,{st.session_state.avatar_b64}" style="width: 100%; filter: drop-shadow(0 10px 20px rgba(0,0,0,0.3)); transform: scale(1.1);">'
@@ -23,23 +24,28 @@ def render_snapshot(filtered_df, state_stats_raw, total_population, total_beds,
 </div>''', unsafe_allow_html=True)
 
     # === KPI ROW ===
-    total_hospitals = len(filtered_df)
+    kpis = scope.kpis()
+    total_hospitals = kpis["total_hospitals"]
     st.markdown('<div style="margin-bottom: 1.5rem;">', unsafe_allow_html=True)
     c1, c2, c3, c4, c5, c6 = st.columns(6)
     with c1: st.markdown(f'<div class="kpi-card card-purple"><div class="kpi-title">Administrative Scope</div><div class="kpi-value">{distinct_states} <span style="font-size:16px; opacity:0.8;">States</span></div><div class="kpi-percent">{distinct_uts} Union Territories</div></div>', unsafe_allow_html=True)
     with c2: st.markdown(f'<div class="kpi-card card-blue"><div class="kpi-title">Total Bed Capacity</div><div class="kpi-value">{total_beds:,}</div><div class="kpi-percent">Beds Available</div></div>', unsafe_allow_html=True)
     with c3: st.markdown(f'<div class="kpi-card card-indigo"><div class="kpi-title">Total Medical Doctors</div><div class="kpi-value">{total_doctors:,}</div><div class="kpi-percent">Active Personnel</div></div>', unsafe_allow_html=True)
     with c4: st.markdown(f'<div class="kpi-card card-pink"><div class="kpi-title">National Population</div><div class="kpi-value">{total_population/1e6:.1f}M</div><div class="kpi-percent">Census Aggregate</div></div>', unsafe_allow_html=True)
-    with c5: st.markdown(f'<div class="kpi-card card-orange"><div class="kpi-title">ICU Availability</div><div class="kpi-value">{filtered_df["has_icu"].sum():,}</div><div class="kpi-percent">{icu_percent:.1f}% Hospitals</div></div>', unsafe_allow_html=True)
-    with c6: st.markdown(f'<div class="kpi-card card-blue"><div class="kpi-title">Emergency Services</div><div class="kpi-value">{filtered_df["is_emergency"].sum():,}</div><div class="kpi-percent">{emergency_percent:.1f}% 24/7 Coverage</div></div>', unsafe_allow_html=True)
+    with c5: st.markdown(f'<div class="kpi-card card-orange"><div class="kpi-title">ICU Availability</div><div class="kpi-value">{kpis["icu_facilities"]:,}</div><div class="kpi-percent">{icu_percent:.1f}% Hospitals</div></div>', unsafe_allow_html=True)
+    with c6: st.markdown(f'<div class="kpi-card card-blue"><div class="kpi-title">Emergency Services</div><div class="kpi-value">{kpis["emergency_facilities"]:,}</div><div class="kpi-percent">{emergency_percent:.1f}% 24/7 Coverage</div></div>', unsafe_allow_html=True)
     st.markdown('</div>', unsafe_allow_html=True)
 
+    # State capacity rollup shared by the charts below
+    with span("snapshot.aggregate"):
+        state_capacity = scope.state_capacity()
+
     # === CHART ROW 1: Population vs Beds + Resource Ratios ===
     col1, col2 = st.columns(2)
     with col1:
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
         st.markdown('<div class="card-header">National Population vs Bed Volume</div>', unsafe_allow_html=True)
-        pb_df = filtered_df.groupby("State").agg({"Total_Num_Beds": "sum"}).reset_index().merge(state_stats_raw[["State", "State_Population"]], on="State")
+        pb_df = state_capacity[["State", "Total_Num_Beds", "State_Population"]].copy()
         pb_df["State"] = "<b>" + pb_df["State"] + "</b>"
         fig_pb = go.Figure()
         fig_pb.add_trace(go.Bar(name="Population (M)", x=pb_df["State"], y=pb_df["State_Population"]/1e6, marker_color="#38bdf8"))
@@ -53,7 +59,7 @@ def render_snapshot(filtered_df, state_stats_raw, total_population, total_beds,
     with col2:
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
         st.markdown('<div class="card-header">Healthcare Resource Ratios</div>', unsafe_allow_html=True)
-        r_df = filtered_df.groupby("State").agg({"Number_Doctor": "sum", "Total_Num_Beds": "sum"}).reset_index().merge(state_stats_raw[["State", "State_Population"]], on="State")
+        r_df = state_capacity.copy()
         r_df["State"] = "<b>" + r_df["State"] + "</b>"
         r_df["Docs/10K"] = (r_df["Number_Doctor"] / r_df["State_Population"]) * 10000
         r_df["Beds/100K"] = (r_df["Total_Num_Beds"] / r_df["State_Population"]) * 100000
@@ -75,7 +81,7 @@ def render_snapshot(filtered_df, state_stats_raw, total_population, total_beds,
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
         st.markdown('<div class="card-header">Administrative Sector Mix</div>', unsafe_allow_html=True)
         if "Hospital_Category" in filtered_df.columns:
-            cat_counts = filtered_df["Hospital_Category"].value_counts()
+            cat_counts = scope.value_counts("Hospital_Category")
             fig_sector = go.Figure(data=[go.Pie(
                 labels=["<b>" + str(l) + "</b>" for l in cat_counts.index], values=cat_counts.values,
                 hole=0.55, textinfo="percent", textposition="outside",
@@ -91,9 +97,9 @@ def render_snapshot(filtered_df, state_stats_raw, total_population, total_beds,
         st.markdown('<div class="card-header">Healthcare Care Delivery Profile</div>', unsafe_allow_html=True)
         care_counts = None
         if "Care_Level_Clean" in filtered_df.columns:
-            care_counts = filtered_df["Care_Level_Clean"].value_counts()
+            care_counts = scope.value_counts("Care_Level_Clean")
         elif "Hospital_Care_Type" in filtered_df.columns:
-            care_counts = filtered_df["Hospital_Care_Type"].value_counts()
+            care_counts = scope.value_counts("Hospital_Care_Type")
         if care_counts is not None:
             fig_care = go.Figure(data=[go.Pie(
                 labels=["<b>" + str(l) + "</b>" for l in care_counts.index], values=care_counts.values,
@@ -143,29 +149,34 @@ def render_snapshot(filtered_df, state_stats_raw, total_population, total_beds,
     with m2:
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
         st.markdown('<div class="card-header">Regional Capacity Ranking</div>', unsafe_allow_html=True)
-        rank_mode = st.radio("Rank By", ["Beds", "Docs", "Pop"], horizontal=True, key="rank_radio")
-        rank_df = filtered_df.groupby("State").agg({"Total_Num_Beds": "sum", "Number_Doctor": "sum"}).reset_index().merge(state_stats_raw[["State", "State_Population"]], on="State")
-        rank_df["State"] = "<b>" + rank_df["State"] + "</b>"
-        if rank_mode == "Beds":
-            rank_df = rank_df.sort_values("Total_Num_Beds", ascending=True).tail(20)
-            fig_rank = px.bar(rank_df, y="State", x="Total_Num_Beds", orientation="h", height=800, color="Total_Num_Beds", color_continuous_scale=["#312e81", "#6366f1", "#a78bfa"], text="Total_Num_Beds")
-        elif rank_mode == "Docs":
-            rank_df = rank_df.sort_values("Number_Doctor", ascending=True).tail(20)
-            fig_rank = px.bar(rank_df, y="State", x="Number_Doctor", orientation="h", height=800, color="Number_Doctor", color_continuous_scale=["#312e81", "#6366f1", "#a78bfa"], text="Number_Doctor")
-        else:
-            rank_df = rank_df.sort_values("State_Population", ascending=True).tail(20)
-            fig_rank = px.bar(rank_df, y="State", x="State_Population", orientation="h", height=800, color="State_Population", color_continuous_scale=["#312e81", "#6366f1", "#a78bfa"], text="State_Population")
-        
-        fig_rank.update_traces(texttemplate='%{text:,.0f}', textposition='outside', textfont=dict(size=14, weight="bold"))
-        fig_rank.update_layout(
-            margin=dict(l=0, r=60, t=10, b=0), 
-            paper_bgcolor="rgba(0,0,0,0)", 
-            plot_bgcolor="rgba(0,0,0,0)", 
-            font=dict(color=sub_text, size=18), 
-            coloraxis_showscale=False,
-            xaxis=dict(showticklabels=False, title="", showgrid=False),
-            yaxis=dict(tickfont=dict(size=16, family="Plus Jakarta Sans"), title="")
-        )
-        st.plotly_chart(fig_rank, use_container_width=True, config={"displayModeBar": False})
+        render_capacity_ranking(state_capacity, sub_text)
         st.markdown('</div>', unsafe_allow_html=True)
 
+
+@st.fragment
+def render_capacity_ranking(state_capacity, sub_text):
+    # Switching the ranking mode re-runs only this chart
+    rank_mode = st.radio("Rank By", ["Beds", "Docs", "Pop"], horizontal=True, key="rank_radio")
+    rank_df = state_capacity.copy()
+    rank_df["State"] = "<b>" + rank_df["State"] + "</b>"
+    if rank_mode == "Beds":
+        rank_df = rank_df.sort_values("Total_Num_Beds", ascending=True).tail(20)
+        fig_rank = px.bar(rank_df, y="State", x="Total_Num_Beds", orientation="h", height=800, color="Total_Num_Beds", color_continuous_scale=["#312e81", "#6366f1", "#a78bfa"], text="Total_Num_Beds")
+    elif rank_mode == "Docs":
+        rank_df = rank_df.sort_values("Number_Doctor", ascending=True).tail(20)
+        fig_rank = px.bar(rank_df, y="State", x="Number_Doctor", orientation="h", height=800, color="Number_Doctor", color_continuous_scale=["#312e81", "#6366f1", "#a78bfa"], text="Number_Doctor")
+    else:
+        rank_df = rank_df.sort_values("State_Population", ascending=True).tail(20)
+        fig_rank = px.bar(rank_df, y="State", x="State_Population", orientation="h", height=800, color="State_Population", color_continuous_scale=["#312e81", "#6366f1", "#a78bfa"], text="State_Population")
+    
+    fig_rank.update_traces(texttemplate='%{text:,.0f}', textposition='outside', textfont=dict(size=14, weight="bold"))
+    fig_rank.update_layout(
+        margin=dict(l=0, r=60, t=10, b=0), 
+        paper_bgcolor="rgba(0,0,0,0)", 
+        plot_bgcolor="rgba(0,0,0,0)", 
+        font=dict(color=sub_text, size=18), 
+        coloraxis_showscale=False,
+        xaxis=dict(showticklabels=False, title="", showgrid=False),
+        yaxis=dict(tickfont=dict(size=16, family="Plus Jakarta Sans"), title="")
+    )
+    st.plotly_chart(fig_rank, use_container_width=True, config={"displayModeBar": False})
@@ -2,10 +2,17 @@ import streamlit as st
 from plotly import express as px
 from plotly import graph_objects as go
 import pandas as pd
+from logic.metrics import compute_structural_deficits, national_deficits
+from logic.norms import ACTIVE_PROFILE, NORM_PROFILES, describe_profile, evaluate_profiles
+from logic.profiling import span
+from logic.siting import SITING_SERVICES, CANDIDATE_SOURCES
+from sections.rank_stability import render_rank_stability
 
-def render_structural_gaps(filtered_df, state_stats_raw, sub_text, get_k_color):
+def render_structural_gaps(filtered_df, scope, state_stats_raw, sub_text, get_k_color):
     st.markdown('<div class="card-header" style="font-size: 2.5rem; margin-bottom: 5px;">Structural Deficit Ranking & Baseline Adequacy</div>', unsafe_allow_html=True)
-    st.markdown('<p style="color: #94a3b8; font-size: 1.1rem; margin-bottom: 1.5rem;">State-level deficit analysis benchmarked against WHO capacity scaling norms</p>', unsafe_allow_html=True)
+    st.markdown(f'<p style="color: #94a3b8; font-size: 1.1rem; margin-bottom: 1.5rem;">State-level deficit analysis benchmarked against {ACTIVE_PROFILE} capacity scaling norms</p>', unsafe_allow_html=True)
+    norms = describe_profile(ACTIVE_PROFILE)
+    w_b, w_d, w_i, w_e = NORM_PROFILES[ACTIVE_PROFILE]["weights"]
 
     with st.expander("Methodology: Capacity Benchmarks & Deficit Analysis"):
         st.markdown("**1. State-Level Aggregation**")
@@ -17,80 +24,38 @@ def render_structural_gaps(filtered_df, state_stats_raw, sub_text, get_k_color):
         - `Total_ICU` = COUNT where Facilities contains "ICU"
         - `State_Population` = MAX(State_Population) per state
         """)
-        st.markdown("**2. WHO-Scaled Required Capacity**")
+        st.markdown(f"**2. {ACTIVE_PROFILE}-Scaled Required Capacity**")
         c1, c2 = st.columns(2)
         with c1:
-            st.latex(r"Required\_Beds = \frac{Pop \times 3}{1,000}")
-            st.latex(r"Required\_Docs = \frac{Pop \times 1}{1,000}")
+            st.latex(rf"Required\_Beds = \frac{{Pop \times {norms['Beds per 1,000']:g}}}{{1,000}}")
+            st.latex(rf"Required\_Docs = \frac{{Pop \times {norms['Doctors per 1,000']:g}}}{{1,000}}")
         with c2:
-            st.latex(r"Required\_ICU = \frac{Pop \times 10}{100,000}")
-            st.latex(r"Required\_ER = \frac{Pop \times 1}{100,000}")
+            st.latex(rf"Required\_ICU = \frac{{Pop \times {norms['ICU per 100,000']:g}}}{{100,000}}")
+            st.latex(rf"Required\_ER = \frac{{Pop \times {norms['ER per 100,000']:g}}}{{100,000}}")
         st.markdown("**3. Deficit Calculation**")
         st.latex(r"Deficit\% = \max(0, \min(100, \frac{Required - Available}{Required} \times 100))")
         st.markdown("**4. Structural Deficit Score (SDS)**")
-        st.latex(r"SDS = \frac{Bed\% + Doctor\% + ICU\% + Emergency\%}{4}")
-        st.markdown("<p style='font-size:0.9rem; color:#94a3b8;'>Equal weighting across all four components. State-level only — no district estimation.</p>", unsafe_allow_html=True)
+        st.latex(rf"SDS = {w_b:g} \cdot Bed\% + {w_d:g} \cdot Doctor\% + {w_i:g} \cdot ICU\% + {w_e:g} \cdot Emergency\%")
+        st.markdown("**5. District Drill-Down**")
+        st.latex(r"District\_Pop = State\_Pop \times \frac{w_{district}}{\sum_{state} w}")
+        st.markdown("The weight `w` is the district's census population when a district population table covers every district of the state, otherwise its facility count (facility density as a settlement proxy). Each district then runs through steps 2-4 on its own population.")
+        st.markdown(f"<p style='font-size:0.9rem; color:#94a3b8;'>Norms and weights come from the active profile ({ACTIVE_PROFILE}); the comparison below evaluates the others side by side.</p>", unsafe_allow_html=True)
 
     # ============================================================
-    # STEP 1: Aggregate dataset to state level
+    # STEP 1-4: State aggregation, WHO requirement, deficits & weighted SDS
     # ============================================================
-    state_agg = filtered_df.groupby("State").agg(
-        Total_Beds=("Total_Num_Beds", "sum"),
-        Total_Doctors=("Number_Doctor", "sum"),
-        Total_ICU=("has_icu", "sum"),
-        Total_Emergency=("is_emergency", "sum"),
-        State_Pop=("State_Population", "max")
-    ).reset_index()
-
-    # ============================================================
-    # STEP 2: Required capacity (WHO scaling)
-    # ============================================================
-    pop = state_agg["State_Pop"]
-    state_agg["Req_Beds"] = pop * 3 / 1000
-    state_agg["Req_Docs"] = pop * 1 / 1000
-    state_agg["Req_ICU"] = pop * 10 / 100000
-    state_agg["Req_ER"] = pop * 1 / 100000
-
-    # ============================================================
-    # STEP 3: Deficit % (capped 0-100)
-    # ============================================================
-    state_agg["Bed_Deficit"] = (((state_agg["Req_Beds"] - state_agg["Total_Beds"]) / state_agg["Req_Beds"]) * 100).clip(0, 100)
-    state_agg["Doc_Deficit"] = (((state_agg["Req_Docs"] - state_agg["Total_Doctors"]) / state_agg["Req_Docs"]) * 100).clip(0, 100)
-    state_agg["ICU_Deficit"] = (((state_agg["Req_ICU"] - state_agg["Total_ICU"]) / state_agg["Req_ICU"]) * 100).clip(0, 100)
-    state_agg["ER_Deficit"] = (((state_agg["Req_ER"] - state_agg["Total_Emergency"]) / state_agg["Req_ER"]) * 100).clip(0, 100)
-
-    # ============================================================
-    # STEP 4: SDS = WEIGHTED average of 4 deficits
-    # ============================================================
-    state_agg["SDS"] = (
-        0.4 * state_agg["Bed_Deficit"] +
-        0.3 * state_agg["Doc_Deficit"] +
-        0.2 * state_agg["ICU_Deficit"] +
-        0.1 * state_agg["ER_Deficit"]
-    )
+    with span("structural_gaps.aggregate"):
+        state_agg = compute_structural_deficits(scope.aggregate_states())
 
     # ============================================================
     # NATIONAL KPIs (aggregated from all states)
     # ============================================================
-    nat_pop = state_agg["State_Pop"].sum()
-    nat_beds = state_agg["Total_Beds"].sum()
-    nat_docs = state_agg["Total_Doctors"].sum()
-    nat_icu = state_agg["Total_ICU"].sum()
-    nat_er = state_agg["Total_Emergency"].sum()
-
-    nat_req_beds = nat_pop * 3 / 1000
-    nat_req_docs = nat_pop * 1 / 1000
-    nat_req_icu = nat_pop * 10 / 100000
-    nat_req_er = nat_pop * 1 / 100000
-
-    nat_bed_def = max(0, min(100, ((nat_req_beds - nat_beds) / nat_req_beds) * 100)) if nat_req_beds > 0 else 0
-    nat_doc_def = max(0, min(100, ((nat_req_docs - nat_docs) / nat_req_docs) * 100)) if nat_req_docs > 0 else 0
-    nat_icu_def = max(0, min(100, ((nat_req_icu - nat_icu) / nat_req_icu) * 100)) if nat_req_icu > 0 else 0
-    nat_er_def = max(0, min(100, ((nat_req_er - nat_er) / nat_req_er) * 100)) if nat_req_er > 0 else 0
-
-    # Weighted National SDS
-    nat_sds = (0.4 * nat_bed_def + 0.3 * nat_doc_def + 0.2 * nat_icu_def + 0.1 * nat_er_def)
-    systemic_adequacy = 100 - nat_sds
+    with span("structural_gaps.national"):
+        nat = national_deficits(state_agg)
+    nat_bed_def = nat["Bed"]
+    nat_icu_def = nat["ICU"]
+    nat_sds = nat["SDS"]
+    systemic_adequacy = nat["Adequacy"]
 
     # ============================================================
     # ROW 1: 4 RECALCULATED KPI CARDS
@@ -124,7 +89,17 @@ def render_structural_gaps(filtered_df, state_stats_raw, sub_text, get_k_color):
     )
     fig_def.update_xaxes(tickangle=-45, tickfont=dict(size=16, family="Plus Jakarta Sans"))
     fig_def.update_yaxes(tickfont=dict(size=16, family="Plus Jakarta Sans"), title_font=dict(size=18, weight="bold"))
-    st.plotly_chart(fig_def, use_container_width=True, config={"displayModeBar": False})
+    event = st.plotly_chart(fig_def, use_container_width=True, config={"displayModeBar": False}, on_select="rerun", selection_mode="points", key="sds_state_bars")
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # ============================================================
+    # ROW 2b: DISTRICT DRILL-DOWN (click a state bar above)
+    # ============================================================
+    points = event.selection.points if event and event.selection else []
+    clicked = points[0]["x"].replace("<b>", "").replace("</b>", "") if points else None
+    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+    st.markdown('<div class="card-header">District Structural Deficits</div>', unsafe_allow_html=True)
+    render_district_drilldown(scope, state_agg, clicked, sub_text)
     st.markdown('</div>', unsafe_allow_html=True)
 
     # ============================================================
@@ -151,3 +126,158 @@ def render_structural_gaps(filtered_df, state_stats_raw, sub_text, get_k_color):
     fig_strong.update_yaxes(tickfont=dict(size=16, family="Plus Jakarta Sans"), title_font=dict(size=18, weight="bold"))
     st.plotly_chart(fig_strong, use_container_width=True, config={"displayModeBar": False})
     st.markdown('</div>', unsafe_allow_html=True)
+
+    # ============================================================
+    # ROW 3b: NORM PROFILE COMPARISON
+    # ============================================================
+    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+    st.markdown('<div class="card-header">Norm Profile Comparison</div>', unsafe_allow_html=True)
+    render_profile_comparison(scope.aggregate_states(), sub_text)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # ============================================================
+    # ROW 4: DISTRICT ACCESS DISTANCES
+    # ============================================================
+    access = scope.district_access()
+    if access is not None:
+        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+        st.markdown('<div class="card-header">District Access Distances (km to Nearest Facility)</div>', unsafe_allow_html=True)
+        st.markdown("<p style='font-size:0.9rem; color:#94a3b8;'>Median and 90th-percentile distance from each district's populated grid cells to the nearest ICU, emergency and tertiary facility in the full registry. Cells are weighted by facility count as a settlement proxy.</p>", unsafe_allow_html=True)
+        districts = scope.aggregate_districts()[["State", "District"]]
+        access = districts.merge(access, on=["State", "District"], how="inner").sort_values("ICU_Access_P90_km", ascending=False)
+        st.dataframe(access, use_container_width=True, hide_index=True, height=400)
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    # ============================================================
+    # ROW 5: CATCHMENT ACCESSIBILITY (2SFCA)
+    # ============================================================
+    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+    st.markdown('<div class="card-header">Catchment Accessibility (2SFCA)</div>', unsafe_allow_html=True)
+    st.markdown("<p style='font-size:0.9rem; color:#94a3b8;'>Capacity each district's population can reach within the catchment, shared with everyone else who can reach the same facilities. Facilities count with a Gaussian distance decay. Unlike the state ratios above, beds across a state border count, and a remote corner of a well-supplied state does not inherit the capital's beds.</p>", unsafe_allow_html=True)
+    render_accessibility_panel(scope, sub_text)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # ============================================================
+    # ROW 6: NEW CAPACITY SITING
+    # ============================================================
+    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+    st.markdown('<div class="card-header">Where to Add ICU / Emergency Capacity</div>', unsafe_allow_html=True)
+    render_siting_panel(scope, sub_text)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # ============================================================
+    # ROW 7: SDS RANK STABILITY (BOOTSTRAP)
+    # ============================================================
+    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+    st.markdown('<div class="card-header">SDS Rank Stability (Bootstrap)</div>', unsafe_allow_html=True)
+    render_rank_stability(scope, "SDS", sub_text)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+
+@st.fragment
+def render_accessibility_panel(scope, sub_text):
+    # Moving the radius re-runs only this panel
+    radius = st.select_slider("Catchment Radius (km)", options=[10, 20, 30, 45, 60, 90], value=30, key="sfca_radius")
+    with span("structural_gaps.accessibility"):
+        sfca = scope.accessibility(float(radius))
+    if sfca is not None and not sfca.empty:
+        districts = scope.aggregate_districts()[["State", "District"]]
+        sfca = districts.merge(sfca, on=["State", "District"], how="inner").sort_values("Beds_per_1k_2SFCA")
+        low = sfca.dropna(subset=["Beds_per_1k_2SFCA"]).head(10).sort_values("Beds_per_1k_2SFCA", ascending=False).copy()
+        low["District"] = "<b>" + low["District"] + "</b>"
+        fig_sfca = px.bar(low, y="District", x="Beds_per_1k_2SFCA", orientation="h", height=350,
+                          color="Beds_per_1k_2SFCA", color_continuous_scale=["#ef4444", "#f59e0b", "#fbbf24"],
+                          hover_data={"State": True, "Doctors_per_1k_2SFCA": True, "ICU_per_100k_2SFCA": True})
+        fig_sfca.update_layout(margin=dict(l=0, r=0, t=10, b=0), paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font=dict(color=sub_text, size=18), coloraxis_showscale=False, yaxis=dict(tickfont=dict(size=16, family="Plus Jakarta Sans")), xaxis_title="Accessible Beds per 1,000", xaxis=dict(tickfont=dict(size=16, family="Plus Jakarta Sans"), title_font=dict(size=18, weight="bold")))
+        st.plotly_chart(fig_sfca, use_container_width=True, config={"displayModeBar": False})
+        st.dataframe(sfca, use_container_width=True, hide_index=True, height=400)
+    else:
+        st.info("Catchment accessibility needs facility coordinates.")
+
+
+@st.fragment
+def render_district_drilldown(scope, state_agg, clicked, sub_text):
+    # Clicking a state bar selects it here; the district table is cached per filter combination
+    states = state_agg.sort_values("SDS", ascending=False)["State"].tolist()
+    if not states:
+        st.info("No states in view.")
+        return
+    if clicked in states and clicked != st.session_state.get("sds_drill_clicked"):
+        st.session_state["sds_drill_clicked"] = clicked
+        st.session_state["sds_drill_state"] = clicked
+    state = st.selectbox("State", states, key="sds_drill_state")
+    with span("structural_gaps.districts"):
+        districts = scope.district_deficits()
+    districts = districts[districts["State"] == state].sort_values("SDS", ascending=False)
+    source = " / ".join(districts["Pop_Source"].unique()).lower() or "facility density"
+    st.markdown(f"<p style='font-size:0.9rem; color:#94a3b8;'>State population split across {len(districts)} districts by {source}. Click a bar in the chart above to drill into that state.</p>", unsafe_allow_html=True)
+    if districts.empty:
+        st.info("No districts in view for this state.")
+        return
+
+    top = districts.head(15).copy()
+    top["District"] = "<b>" + top["District"] + "</b>"
+    fig = go.Figure()
+    for col, name, color in [("Bed_Deficit", "Bed Deficit %", "#ef4444"), ("Doc_Deficit", "Doctor Deficit %", "#f59e0b"),
+                             ("ICU_Deficit", "ICU Deficit %", "#8b5cf6"), ("ER_Deficit", "Emergency Deficit %", "#ec4899")]:
+        fig.add_trace(go.Bar(name=name, x=top["District"], y=top[col], marker_color=color))
+    fig.add_trace(go.Scatter(name="SDS", x=top["District"], y=top["SDS"], mode="markers", marker=dict(color="#f8fafc", size=12, symbol="diamond")))
+    fig.update_layout(barmode="group", height=400, yaxis=dict(range=[0, 100], title="Deficit %", ticksuffix="%"),
+                      margin=dict(l=0, r=0, t=30, b=0), paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
+                      font=dict(color=sub_text, size=16), legend=dict(orientation="h", y=1.12, x=0.5, xanchor="center"))
+    fig.update_xaxes(tickangle=-45)
+    st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
+    cols = ["District", "District_Pop", "Pop_Source", "Total_Beds", "Total_Doctors", "ICU_Count", "Emergency_Count",
+            "Bed_Deficit", "Doc_Deficit", "ICU_Deficit", "ER_Deficit", "SDS", "SDS_Rank_In_State"]
+    st.dataframe(districts[cols].round(2), use_container_width=True, hide_index=True, height=350)
+
+
+@st.fragment
+def render_profile_comparison(state_base, sub_text):
+    # All selected profiles are scored in one matrix pass over the state rollup; no regrouping
+    names = st.multiselect("Profiles", list(NORM_PROFILES), default=list(NORM_PROFILES)[:2], key="norm_profiles")
+    if not names:
+        st.info("Select at least one norm profile.")
+        return
+    st.dataframe(pd.DataFrame({n: describe_profile(n) for n in names}).T, use_container_width=True)
+    with span("structural_gaps.profiles"):
+        scores = evaluate_profiles(state_base, names)
+    ranked = scores.sort_values(f"SDS Rank [{names[0]}]").head(15)
+    fig = go.Figure()
+    for name in names:
+        fig.add_trace(go.Scatter(x=ranked["State"], y=ranked[f"SDS Rank [{name}]"], mode="lines+markers", name=name))
+    fig.update_layout(height=380, margin=dict(l=0, r=0, t=30, b=0), paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font=dict(color=sub_text, size=16),
+                      yaxis=dict(autorange="reversed", title="SDS Rank (1 = most deficient)"), xaxis=dict(tickangle=-45), legend=dict(orientation="h", y=1.12, x=0.5, xanchor="center"))
+    st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
+    st.dataframe(scores[["State"] + [c for n in names for c in (f"SDS [{n}]", f"SDS Rank [{n}]")]].sort_values(f"SDS Rank [{names[0]}]"),
+                 use_container_width=True, hide_index=True, height=350)
+
+
+@st.fragment
+def render_siting_panel(scope, sub_text):
+    # Changing the siting inputs re-runs only this panel
+    st.markdown("<p style='font-size:0.9rem; color:#94a3b8;'>Greedy maximal coverage: each pick is the site that brings the most not-yet-covered population within the radius. Population already within the radius of an existing facility with the service counts as covered.</p>", unsafe_allow_html=True)
+    c1, c2, c3, c4 = st.columns(4)
+    service = c1.radio("Service", list(SITING_SERVICES), horizontal=True, key="siting_service")
+    source = c2.radio("Candidate Sites", CANDIDATE_SOURCES, horizontal=True, key="siting_source")
+    n_sites = c3.slider("New Sites", 1, 50, 10, key="siting_count")
+    radius = c4.slider("Coverage Radius (km)", 5, 60, 15, step=5, key="siting_radius")
+
+    with span("structural_gaps.siting"):
+        plan = scope.site_plan(service, source, n_sites, float(radius))
+    if plan is None or plan["sites"].empty:
+        st.info("No candidate site adds coverage: the population in view is already covered at this radius.")
+        return
+    s, sites = plan["summary"], plan["sites"]
+    pop = max(s["population"], 1)
+    k1, k2, k3 = st.columns(3)
+    k1.markdown(f'<div class="kpi-card card-blue"><div class="kpi-title">Covered Today</div><div class="kpi-value">{s["covered_before"] / pop * 100:.1f}%</div><div class="kpi-percent">Within {radius} km of {service}</div></div>', unsafe_allow_html=True)
+    k2.markdown(f'<div class="kpi-card card-green"><div class="kpi-title">Covered With New Sites</div><div class="kpi-value">{s["covered_after"] / pop * 100:.1f}%</div><div class="kpi-percent">+{s["covered_after"] - s["covered_before"]:,.0f} People</div></div>', unsafe_allow_html=True)
+    k3.markdown(f'<div class="kpi-card card-purple"><div class="kpi-title">Candidates Evaluated</div><div class="kpi-value">{s["candidates"]:,}</div><div class="kpi-percent">{source}</div></div>', unsafe_allow_html=True)
+
+    fig = go.Figure(go.Scatter(x=sites["Rank"], y=sites["Covered_Percent"], mode="lines+markers", line=dict(color="#10b981", width=3),
+                               customdata=sites[["Site", "District", "State"]], hovertemplate="%{customdata[0]}<br>%{customdata[1]}, %{customdata[2]}<br>%{y:.2f}% covered<extra></extra>"))
+    fig.update_layout(height=300, margin=dict(l=0, r=0, t=10, b=0), paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font=dict(color=sub_text, size=16), xaxis_title="Sites Added", yaxis_title="Population Covered %")
+    st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
+    st.dataframe(sites, use_container_width=True, hide_index=True, height=350)
+    st.download_button("Download Site Plan CSV", data=sites.to_csv(index=False).encode("utf-8"), file_name=f"{service.lower()}_site_plan.csv", mime="text/csv", use_container_width=True, key="siting_download")
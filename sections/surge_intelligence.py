@@ -3,8 +3,15 @@ from plotly import express as px
 from plotly import graph_objects as go
 import pandas as pd
 import numpy as np
+from logic.metrics import compute_state_sri, compute_district_sri
+from logic.allocation import ALLOCATABLE, allocate_capacity
+from logic.contingency import CONTINGENCY_MODES, apply_outage, largest_facility_losses, radius_losses
+from logic.norms import ACTIVE_PROFILE, NORM_PROFILES, evaluate_profiles
+from logic.profiling import span
+from logic.spillover import simulate_spillover, TRANSFER_KM
+from sections.rank_stability import render_rank_stability
 
-def render_surge_intelligence(filtered_df, state_stats_raw, context_sidebar, sub_text, get_k_color):
+def render_surge_intelligence(filtered_df, scope, state_stats_raw, context_sidebar, sub_text, get_k_color):
     st.markdown('<div class="card-header" style="font-size: 2.5rem; margin-bottom: 5px;">Dynamic Surge Risk Intelligence Engine</div>', unsafe_allow_html=True)
     st.markdown('<p style="color: #94a3b8; font-size: 1.1rem; margin-bottom: 1.5rem;">Weighted systemic collapse model using the Composite Surge Risk Index (SRI).</p>', unsafe_allow_html=True)
 
@@ -13,16 +20,9 @@ def render_surge_intelligence(filtered_df, state_stats_raw, context_sidebar, sub
     # ============================================================
     with context_sidebar:
         st.markdown('<div style="font-size:18px; font-weight:700; color:white; margin-bottom:10px;">SURGE PARAMETERS</div>', unsafe_allow_html=True)
-        S = st.slider("Surge Multiplier (S)", 1.0, 3.0, 1.0, step=0.1, help="Demand expansion factor relative to baseline.")
-        
-        st.markdown('<div style="margin-top: 15px;"></div>', unsafe_allow_html=True)
-        st.markdown('<div style="font-size:14px; font-weight:700; color:#38bdf8; margin-bottom:5px;">CAPACITY STRETCH</div>', unsafe_allow_html=True)
-        elasticity_factor = st.slider("Elasticity Factor (%)", 0, 30, 15, step=5, help="Simulate temporary infrastructure stretch (e.g., 15% stretch).")
-        E = 1 + (elasticity_factor / 100)
-        
-        st.markdown("---")
+        w_b, w_d, w_i, w_e = NORM_PROFILES[ACTIVE_PROFILE]["weights"]
         with st.expander("SRI Mathematical Framework"):
-            st.markdown("""
+            st.markdown(f"""
                 **1. Scaling Logic**
                 `Surge_Required_X = Required_X * S`
                 
@@ -30,7 +30,8 @@ def render_surge_intelligence(filtered_df, state_stats_raw, context_sidebar, sub
                 `Stress_X = Surge_Required_X / (Available_X * E)`
                 
                 **3. Composite Surge Risk Index (SRI)**
-                `SRI = (0.4 * Stress_Beds) + (0.3 * Stress_Docs) + (0.2 * Stress_ICU) + (0.1 * Stress_ER)`
+                `SRI = ({w_b:g} * Stress_Beds) + ({w_d:g} * Stress_Docs) + ({w_i:g} * Stress_ICU) + ({w_e:g} * Stress_ER)`
+                (weights from the {ACTIVE_PROFILE} norm profile)
                 
                 **4. Risk Classification**
                 - `< 1.0`: Stable
@@ -39,83 +40,34 @@ def render_surge_intelligence(filtered_df, state_stats_raw, context_sidebar, sub
                 - `> 1.5`: Critical
             """)
 
+    # Capacity rollups depend only on the filters; the sliders below re-run just the panel
+    with span("surge_intelligence.aggregate"):
+        state_base = scope.aggregate_states()
+        dist_base = scope.aggregate_districts()
+        centroids = scope.district_centroids()
+
+    render_surge_panel(scope, state_base, dist_base, centroids, filtered_df, sub_text)
+
+
+@st.fragment
+def render_surge_panel(scope, state_base, dist_base, centroids, facilities, sub_text):
+    # Fragments cannot render into the sidebar, so the surge controls sit at the top of the panel
+    c1, c2 = st.columns(2)
+    with c1:
+        S = st.slider("Surge Multiplier (S)", 1.0, 3.0, 1.0, step=0.1, help="Demand expansion factor relative to baseline.", key="surge_multiplier")
+    with c2:
+        elasticity_factor = st.slider("Elasticity Factor (%)", 0, 30, 15, step=5, help="Simulate temporary infrastructure stretch (e.g., 15% stretch).", key="surge_elasticity")
+    E = 1 + (elasticity_factor / 100)
+
     # ============================================================
-    # STEP 2 & 3 — Base & Surge-Adjusted Requirement (State Level)
+    # STEP 2-5 — Base & Surge-Adjusted Requirement, Stress Ratios, SRI (State Level)
     # ============================================================
-    state_agg = filtered_df.groupby("State").agg(
-        Avail_Beds=("Total_Num_Beds", "sum"),
-        Avail_Docs=("Number_Doctor", "sum"),
-        Avail_ICU=("has_icu", "sum"),
-        Avail_ER=("is_emergency", "sum"),
-        State_Pop=("State_Population", "max")
-    ).reset_index()
-
-    pop = state_agg["State_Pop"]
-    # Required_X (Base)
-    state_agg["Req_B_Base"] = pop * 3 / 1000
-    state_agg["Req_D_Base"] = pop * 1 / 1000
-    state_agg["Req_I_Base"] = pop * 10 / 100000
-    state_agg["Req_E_Base"] = pop * 1 / 100000
-
-    # STEP 4 — Create Surge Stress Ratios (State Level)
-    state_agg["Stress_B"] = (state_agg["Req_B_Base"] * S) / (state_agg["Avail_Beds"].clip(1) * E)
-    state_agg["Stress_D"] = (state_agg["Req_D_Base"] * S) / (state_agg["Avail_Docs"].clip(1) * E)
-    state_agg["Stress_I"] = (state_agg["Req_I_Base"] * S) / (state_agg["Avail_ICU"].clip(1) * E)
-    state_agg["Stress_E"] = (state_agg["Req_E_Base"] * S) / (state_agg["Avail_ER"].clip(1) * E)
-
-    # STEP 5 — Composite Surge Risk Index (SRI)
-    state_agg["SRI"] = (
-        0.4 * state_agg["Stress_B"] +
-        0.3 * state_agg["Stress_D"] +
-        0.2 * state_agg["Stress_I"] +
-        0.1 * state_agg["Stress_E"]
-    ).round(3)
+    with span("surge_intelligence.state_sri"):
+        state_agg = compute_state_sri(state_base, S, E)
 
     # STEP 7 — District-Level Surge Index (Proportional Allocation)
-    dist_agg = filtered_df.groupby(["State", "District"]).agg(
-        Avail_Beds=("Total_Num_Beds", "sum"),
-        Avail_Docs=("Number_Doctor", "sum"),
-        Avail_ICU=("has_icu", "sum"),
-        Avail_ER=("is_emergency", "sum"),
-    ).reset_index()
-
-    state_totals = dist_agg.groupby("State").agg({
-        "Avail_Beds": "sum", "Avail_Docs": "sum", "Avail_ICU": "sum", "Avail_ER": "sum"
-    }).rename(columns=lambda x: "State_" + x).reset_index()
-    
-    dist_agg = dist_agg.merge(state_totals, on="State").merge(state_agg[["State", "Req_B_Base", "Req_D_Base", "Req_I_Base", "Req_E_Base"]], on="State")
-    
-    # District Share (District_Beds / State_Total_Beds)
-    dist_agg["Bed_Share"] = dist_agg["Avail_Beds"] / dist_agg["State_Avail_Beds"].clip(1)
-    dist_agg["Doc_Share"] = dist_agg["Avail_Docs"] / dist_agg["State_Avail_Docs"].clip(1)
-    dist_agg["ICU_Share"] = dist_agg["Avail_ICU"] / dist_agg["State_Avail_ICU"].clip(1)
-    dist_agg["ER_Share"] = dist_agg["Avail_ER"] / dist_agg["State_Avail_ER"].clip(1)
-
-    # District Required = (State_Required * District_Share) * S
-    dist_agg["Stress_B"] = (dist_agg["Req_B_Base"] * dist_agg["Bed_Share"] * S) / (dist_agg["Avail_Beds"].clip(1) * E)
-    dist_agg["Stress_D"] = (dist_agg["Req_D_Base"] * dist_agg["Doc_Share"] * S) / (dist_agg["Avail_Docs"].clip(1) * E)
-    dist_agg["Stress_I"] = (dist_agg["Req_I_Base"] * dist_agg["ICU_Share"] * S) / (dist_agg["Avail_ICU"].clip(1) * E)
-    dist_agg["Stress_E"] = (dist_agg["Req_E_Base"] * dist_agg["ER_Share"] * S) / (dist_agg["Avail_ER"].clip(1) * E)
-
-    dist_agg["SRI"] = (
-        0.4 * dist_agg["Stress_B"] + 
-        0.3 * dist_agg["Stress_D"] + 
-        0.2 * dist_agg["Stress_I"] + 
-        0.1 * dist_agg["Stress_E"]
-    ).round(3)
-
-    # Calculations for Table (Additional Needed)
-    dist_agg["Surge_Req_B"] = (dist_agg["Req_B_Base"] * dist_agg["Bed_Share"] * S).round(0)
-    dist_agg["Add_B_Needed"] = (dist_agg["Surge_Req_B"] - (dist_agg["Avail_Beds"] * E)).clip(0).round(0)
-    
-    dist_agg["Surge_Req_I"] = (dist_agg["Req_I_Base"] * dist_agg["ICU_Share"] * S).round(0)
-    dist_agg["Add_I_Needed"] = (dist_agg["Surge_Req_I"] - (dist_agg["Avail_ICU"] * E)).clip(0).round(0)
-    
-    dist_agg["Surge_Req_D"] = (dist_agg["Req_D_Base"] * dist_agg["Doc_Share"] * S).round(0)
-    dist_agg["Add_D_Needed"] = (dist_agg["Surge_Req_D"] - (dist_agg["Avail_Docs"] * E)).clip(0).round(0)
-    
-    dist_agg["Surge_Req_E"] = (dist_agg["Req_E_Base"] * dist_agg["ER_Share"] * S).round(0)
-    dist_agg["Add_E_Needed"] = (dist_agg["Surge_Req_E"] - (dist_agg["Avail_ER"] * E)).clip(0).round(0)
+    with span("surge_intelligence.district_sri"):
+        dist_agg = compute_district_sri(dist_base, state_agg, S, E)
 
     # PAGE 4 VISUAL STRUCTURE
     # ============================================================
@@ -207,3 +159,139 @@ def render_surge_intelligence(filtered_df, state_stats_raw, context_sidebar, sub
     csv = table_df.to_csv(index=False).encode('utf-8')
     st.download_button("Download Full Surge Requirements CSV", data=csv, file_name=f"surge_plan_{S}x.csv", mime="text/csv", use_container_width=True)
     st.markdown('</div>', unsafe_allow_html=True)
+
+    # Each panel below is its own fragment: its widgets rerun only that panel, while the
+    # surge sliders above rerun all of them with the new SRI tables
+    if centroids is not None:
+        render_spillover_panel(scope, dist_agg, centroids, S, E)
+    render_allocation_panel(dist_agg, S, E, sub_text)
+    render_contingency_panel(dist_agg, facilities, S, E, sub_text)
+    render_profile_panel(state_base, S, E)
+
+    # ============================================================
+    # 9. SRI Rank Stability (bootstrap)
+    # ============================================================
+    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+    st.markdown(f'<div class="card-header">SRI Rank Stability ({S:.1f}x Surge)</div>', unsafe_allow_html=True)
+    # SRI scales by S / E, so the bootstrap ranks hold at every slider setting
+    render_rank_stability(scope, "SRI", sub_text, S / E)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+
+# ============================================================
+# 5. Inter-District Spillover (min-cost transfer model)
+# ============================================================
+@st.fragment
+def render_spillover_panel(scope, dist_agg, centroids, S, E):
+    # Transfer distance reruns only the transfer LP
+    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+    st.markdown('<div class="card-header">Inter-District Spillover</div>', unsafe_allow_html=True)
+    st.markdown("<p style='font-size:0.9rem; color:#94a3b8;'>Each district's bed and ICU demand comes from its own population (the district split used for SDS). Surge patients above a district's elastic bed or ICU capacity are routed to nearby districts with spare capacity. The routing is a min-cost flow that minimises total transfer distance. Whatever cannot be placed within the distance limit stays as residual shortfall.</p>", unsafe_allow_html=True)
+    max_km = st.slider("Maximum Transfer Distance (km)", 25, 300, int(TRANSFER_KM), step=25, key="spillover_km")
+    with span("surge_intelligence.spillover"):
+        spill, transfers = simulate_spillover(dist_agg, centroids, scope.district_deficits(), S, E, float(max_km))
+    moved_beds = int(transfers.loc[transfers["Resource"] == "Beds", "Units"].sum())
+    t1, t2, t3, t4 = st.columns(4)
+    t1.markdown(f'<div class="kpi-card card-blue"><div class="kpi-title">Beds Transferred</div><div class="kpi-value">{moved_beds:,}</div><div class="kpi-percent">{len(transfers):,} Routes</div></div>', unsafe_allow_html=True)
+    t2.markdown(f'<div class="kpi-card card-red"><div class="kpi-title">Residual Bed Shortfall</div><div class="kpi-value">{int(spill["Residual_B_Needed"].sum()):,}</div><div class="kpi-percent">vs {int(spill["Shortfall_B"].sum()):,} Isolated</div></div>', unsafe_allow_html=True)
+    t3.markdown(f'<div class="kpi-card card-orange"><div class="kpi-title">Residual ICU Shortfall</div><div class="kpi-value">{int(spill["Residual_I_Needed"].sum()):,}</div><div class="kpi-percent">vs {int(spill["Shortfall_I"].sum()):,} Isolated</div></div>', unsafe_allow_html=True)
+    t4.markdown(f'<div class="kpi-card card-purple"><div class="kpi-title">High Risk After Transfer</div><div class="kpi-value">{int((spill["SRI_After"] > 1.2).sum())}</div><div class="kpi-percent">{int((spill["SRI_Before"] > 1.2).sum())} Before</div></div>', unsafe_allow_html=True)
+    if transfers.empty:
+        st.info("No transfers possible: no district within range has spare elastic capacity at this surge.")
+    else:
+        st.dataframe(transfers, use_container_width=True, hide_index=True, height=300)
+    spill_table = spill[["State", "District", "District_Pop", "SRI_Before", "SRI_After", "Shortfall_B", "Transfer_Out_B", "Transfer_In_B", "Residual_B_Needed",
+                         "Shortfall_I", "Transfer_Out_I", "Transfer_In_I", "Residual_I_Needed"]].sort_values("SRI_After", ascending=False)
+    st.dataframe(spill_table, use_container_width=True, hide_index=True, height=400)
+    st.download_button("Download Transfer Plan CSV", data=transfers.to_csv(index=False).encode("utf-8"), file_name=f"spillover_transfers_{S}x.csv", mime="text/csv", use_container_width=True, key="spillover_download")
+    st.markdown('</div>', unsafe_allow_html=True)
+
+
+# ============================================================
+# 6. Capacity Allocation Planner (marginal SRI gain)
+# ============================================================
+@st.fragment
+def render_allocation_panel(dist_agg, S, E, sub_text):
+    # Resource and budget rerun only the allocation heap
+    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+    st.markdown(f'<div class="card-header">Capacity Allocation Planner ({S:.1f}x Surge)</div>', unsafe_allow_html=True)
+    st.markdown("<p style='font-size:0.9rem; color:#94a3b8;'>Extra units are handed out one step at a time, each to the district where it cuts SRI above 1.0 the most. Every district's surge requirement stays fixed, so returns diminish as a district fills up.</p>", unsafe_allow_html=True)
+    a1, a2 = st.columns(2)
+    resource = a1.radio("Resource", list(ALLOCATABLE), horizontal=True, key="alloc_resource")
+    budget = a2.number_input("Budget (extra units)", min_value=1, max_value=10_000_000, value=10_000 if resource != "ICU" else 200, step=100 if resource != "ICU" else 10, key=f"alloc_budget_{resource}")
+    with span("surge_intelligence.allocation"):
+        alloc = allocate_capacity(dist_agg, resource, budget, E)
+    a = alloc["summary"]
+    p1, p2, p3 = st.columns(3)
+    p1.markdown(f'<div class="kpi-card card-blue"><div class="kpi-title">Units Allocated</div><div class="kpi-value">{a["allocated"]:,}</div><div class="kpi-percent">{len(alloc["plan"]):,} Districts</div></div>', unsafe_allow_html=True)
+    p2.markdown(f'<div class="kpi-card card-green"><div class="kpi-title">Excess SRI Removed</div><div class="kpi-value">{a["risk_before"] - a["risk_after"]:,.1f}</div><div class="kpi-percent">of {a["risk_before"]:,.1f} Above 1.0</div></div>', unsafe_allow_html=True)
+    p3.markdown(f'<div class="kpi-card card-purple"><div class="kpi-title">High Risk Districts</div><div class="kpi-value">{a["high_risk_after"]}</div><div class="kpi-percent">{a["high_risk_before"]} Before Allocation</div></div>', unsafe_allow_html=True)
+    if a["unused"]:
+        st.caption(f"{a['unused']:,} units left unallocated: no district above SRI 1.0 gains from more {resource.lower()}.")
+
+    districts = alloc["districts"]
+    fig_alloc = go.Figure()
+    fig_alloc.add_trace(go.Histogram(x=districts["SRI_Before"], name="Before", marker_color="#ef4444", opacity=0.6))
+    fig_alloc.add_trace(go.Histogram(x=districts["SRI_After"], name="After", marker_color="#10b981", opacity=0.6))
+    fig_alloc.update_layout(barmode="overlay", height=300, margin=dict(l=0, r=0, t=30, b=0), paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font=dict(color=sub_text, size=16), xaxis_title="District SRI", yaxis_title="Districts", legend=dict(orientation="h", y=1.15, x=0.5, xanchor="center"))
+    st.plotly_chart(fig_alloc, use_container_width=True, config={"displayModeBar": False})
+    st.dataframe(alloc["plan"], use_container_width=True, hide_index=True, height=350)
+    st.download_button("Download Allocation Plan CSV", data=alloc["plan"].to_csv(index=False).encode("utf-8"), file_name=f"allocation_{resource.lower()}_{S}x.csv", mime="text/csv", use_container_width=True, key="alloc_download")
+    st.markdown('</div>', unsafe_allow_html=True)
+
+
+# ============================================================
+# 7. Facility Outage Contingency (N-k)
+# ============================================================
+@st.fragment
+def render_contingency_panel(dist_agg, facilities, S, E, sub_text):
+    # Outage scenario inputs rerun only the outage model
+    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+    st.markdown(f'<div class="card-header">Facility Outage Contingency ({S:.1f}x Surge)</div>', unsafe_allow_html=True)
+    st.markdown("<p style='font-size:0.9rem; color:#94a3b8;'>District SRI when facilities go offline: either each district's k largest hospitals all at once, or every facility within a radius of a disaster point. Surge requirements stay fixed and only capacity is lost. Rank 1 is the least resilient district.</p>", unsafe_allow_html=True)
+    mode = st.radio("Outage Scenario", CONTINGENCY_MODES, horizontal=True, key="outage_mode")
+    with span("surge_intelligence.contingency"):
+        if mode == "Largest hospitals":
+            k = st.slider("Hospitals Offline per District (k)", 1, 5, 1, key="outage_k")
+            outage = apply_outage(dist_agg, largest_facility_losses(facilities, k), E)
+        else:
+            o1, o2, o3 = st.columns(3)
+            lat = o1.number_input("Disaster Latitude", value=19.0760, format="%.4f", key="outage_lat")
+            lon = o2.number_input("Disaster Longitude", value=72.8777, format="%.4f", key="outage_lon")
+            radius = o3.number_input("Impact Radius (km)", value=25, min_value=1, max_value=500, key="outage_radius")
+            outage = apply_outage(dist_agg, radius_losses(facilities, lat, lon, radius), E)
+            outage = outage[outage["Offline_Facilities"] > 0]
+    if outage.empty:
+        st.info("No facilities in view fall within the impact radius.")
+    else:
+        c1, c2, c3 = st.columns(3)
+        c1.markdown(f'<div class="kpi-card card-red"><div class="kpi-title">Facilities Offline</div><div class="kpi-value">{int(outage["Offline_Facilities"].sum()):,}</div><div class="kpi-percent">{int(outage["Lost_B"].sum()):,} Beds Lost</div></div>', unsafe_allow_html=True)
+        c2.markdown(f'<div class="kpi-card card-orange"><div class="kpi-title">High Risk After Outage</div><div class="kpi-value">{int((outage["SRI_Outage"] > 1.2).sum())}</div><div class="kpi-percent">{int((outage["SRI"] > 1.2).sum())} Before</div></div>', unsafe_allow_html=True)
+        c3.markdown(f'<div class="kpi-card card-purple"><div class="kpi-title">Largest SRI Jump</div><div class="kpi-value">+{outage["SRI_Increase"].max():.2f}</div><div class="kpi-percent">{outage.iloc[0]["District"]}</div></div>', unsafe_allow_html=True)
+        fragile = outage.head(15).sort_values("SRI_Increase").copy()
+        fragile["District"] = "<b>" + fragile["District"] + "</b>"
+        fig_o = go.Figure()
+        fig_o.add_trace(go.Bar(y=fragile["District"], x=fragile["SRI"], orientation="h", name="Before", marker_color="#38bdf8"))
+        fig_o.add_trace(go.Bar(y=fragile["District"], x=fragile["SRI_Outage"], orientation="h", name="After Outage", marker_color="#ef4444"))
+        fig_o.update_layout(barmode="group", height=500, margin=dict(l=0, r=0, t=30, b=0), paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font=dict(color=sub_text, size=16), xaxis_title="District SRI", legend=dict(orientation="h", y=1.08, x=0.5, xanchor="center"))
+        st.plotly_chart(fig_o, use_container_width=True, config={"displayModeBar": False})
+        cols = ["Resilience_Rank", "State", "District"] + (["Largest_Facility"] if "Largest_Facility" in outage.columns else []) + \
+               ["Offline_Facilities", "Lost_B", "Lost_D", "Lost_I", "Lost_E", "Beds_Lost_Percent", "SRI", "SRI_Outage", "SRI_Increase"]
+        st.dataframe(outage[cols], use_container_width=True, hide_index=True, height=400)
+        st.download_button("Download Resilience Ranking CSV", data=outage[cols].to_csv(index=False).encode("utf-8"), file_name=f"outage_resilience_{S}x.csv", mime="text/csv", use_container_width=True, key="outage_download")
+    st.markdown('</div>', unsafe_allow_html=True)
+
+
+# ============================================================
+# 8. SRI Under Other Norm Profiles
+# ============================================================
+@st.fragment
+def render_profile_panel(state_base, S, E):
+    # No widgets of its own; recomputed only when the surge sliders change
+    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+    st.markdown(f'<div class="card-header">State SRI by Norm Profile ({S:.1f}x Surge)</div>', unsafe_allow_html=True)
+    with span("surge_intelligence.profiles"):
+        by_profile = evaluate_profiles(state_base, list(NORM_PROFILES), S, E)
+    sri_cols = [f"SRI [{n}]" for n in NORM_PROFILES]
+    st.dataframe(by_profile[["State"] + sri_cols].sort_values(f"SRI [{ACTIVE_PROFILE}]", ascending=False), use_container_width=True, hide_index=True, height=350)
+    st.markdown('</div>', unsafe_allow_html=True)
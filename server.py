@@ -0,0 +1,203 @@
+import argparse
+import json
+import math
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from logic.aggregates import load_aggregates
+from logic.core import load_data, DEFAULT_DATASET_PATH
+from logic.geo import nearest_facilities
+from logic.shared_data import source_fingerprint
+from logic.metrics import (aggregate_states, aggregate_districts, summarize_kpis, compute_structural_deficits,
+                           compute_district_deficits, national_deficits, compute_state_sri, compute_district_sri)
+
+FACILITY_COLUMNS = ["Hospital_Name", "State", "District", "Pincode", "Hospital_Category", "Hospital_Care_Type",
+                    "Total_Num_Beds", "Number_Doctor", "has_icu", "is_emergency", "lat", "lon"]
+
+
+def _records(frame):
+    return json.loads(frame.to_json(orient="records"))
+
+
+def _states_param(query):
+    raw = query.get("state", [""])[0]
+    return tuple(sorted(s.strip() for s in raw.split(",") if s.strip()))
+
+
+def _float_param(query, name, default, lo=None, hi=None):
+    try:
+        val = float(query.get(name, [default])[0])
+    except ValueError:
+        raise ValueError(f"'{name}' must be a number")
+    if not math.isfinite(val):
+        raise ValueError(f"'{name}' must be a finite number")
+    if (lo is not None and val < lo) or (hi is not None and val > hi):
+        raise ValueError(f"'{name}' must be between {lo} and {hi}")
+    return val
+
+
+def _int_param(query, name, default, lo=None):
+    try:
+        val = int(query.get(name, [default])[0])
+    except ValueError:
+        raise ValueError(f"'{name}' must be an integer")
+    if lo is not None and val < lo:
+        raise ValueError(f"'{name}' must be at least {lo}")
+    return val
+
+
+def _level_param(query):
+    level = query.get("level", ["state"])[0]
+    if level not in ("state", "district"):
+        raise ValueError("'level' must be 'state' or 'district'")
+    return level
+
+
+class MetricsEngine:
+    # Row-level data is aggregated once at startup; every endpoint except /nearest
+    # works from the state/district aggregates. Serialized responses are memoized.
+    def __init__(self, df, state_stats, cache_size=4096, aggregates=None):
+        self.df = df
+        self.state_stats = state_stats
+        if aggregates is not None:
+            # Persisted tables from the dataset cache
+            self.state_agg = aggregates.table("state")
+            self.dist_agg = aggregates.table("district")
+            self.state_sds = aggregates.table("state_sds")
+            self.dist_sds = aggregates.table("district_sds")
+        else:
+            self.state_agg = aggregate_states(df)
+            self.dist_agg = aggregate_districts(df)
+            self.state_sds = compute_structural_deficits(self.state_agg)
+            self.dist_sds = compute_district_deficits(self.state_agg, self.dist_agg)
+        self.has_coords = "lat" in df.columns and "lon" in df.columns
+        self.respond = lru_cache(maxsize=cache_size)(self._respond)
+
+    def _respond(self, endpoint, params):
+        payload = getattr(self, "_" + endpoint)(*params)
+        return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+    def _health(self):
+        return {"status": "ok", "facilities": len(self.df), "states": len(self.state_agg), "districts": len(self.dist_agg)}
+
+    def _kpis(self, states):
+        df = self.df[self.df["State"].isin(states)] if states else self.df
+        state_agg = self.state_agg[self.state_agg["State"].isin(states)] if states else self.state_agg
+        return {**summarize_kpis(df, self.state_stats), "deficits": national_deficits(state_agg)}
+
+    def _sds(self, level, states, limit):
+        table = self.state_sds if level == "state" else self.dist_sds
+        if states:
+            table = table[table["State"].isin(states)]
+        table = table.sort_values("SDS", ascending=False)
+        return {"level": level, "rows": _records(table.head(limit) if limit > 0 else table)}
+
+    def _sri(self, level, states, S, E, limit):
+        state_agg = self.state_agg[self.state_agg["State"].isin(states)] if states else self.state_agg
+        table = compute_state_sri(state_agg, S, E)
+        if level == "district":
+            dist_agg = self.dist_agg[self.dist_agg["State"].isin(states)] if states else self.dist_agg
+            table = compute_district_sri(dist_agg, table, S, E)
+        table = table.sort_values("SRI", ascending=False)
+        return {"level": level, "S": S, "E": E, "rows": _records(table.head(limit) if limit > 0 else table)}
+
+    def _nearest(self, lat, lon, radius, limit, icu, emergency):
+        if not self.has_coords:
+            raise ValueError("coordinate data is not available in the loaded dataset")
+        mask = None
+        if icu:
+            mask = self.df["has_icu"].to_numpy()
+        if emergency:
+            er = self.df["is_emergency"].to_numpy()
+            mask = er if mask is None else (mask & er)
+        idx, dist = nearest_facilities(self.df, lat, lon, radius, limit=limit or None, mask=mask)
+        cols = [c for c in FACILITY_COLUMNS if c in self.df.columns]
+        rows = self.df.iloc[idx][cols].copy()
+        rows["distance_km"] = dist.round(3)
+        return {"count": len(rows), "rows": _records(rows)}
+
+
+def parse_request(path, query):
+    if path == "/health":
+        return "health", ()
+    if path == "/kpis":
+        return "kpis", (_states_param(query),)
+    if path == "/sds":
+        return "sds", (_level_param(query), _states_param(query), _int_param(query, "limit", 0, 0))
+    if path == "/sri":
+        S = round(_float_param(query, "S", 1.0, 0.1, 10.0), 2)
+        E = round(_float_param(query, "E", 1.15, 1.0, 3.0), 2)
+        return "sri", (_level_param(query), _states_param(query), S, E, _int_param(query, "limit", 0, 0))
+    if path == "/nearest":
+        if "lat" not in query or "lon" not in query:
+            raise ValueError("'lat' and 'lon' are required")
+        lat = round(_float_param(query, "lat", 0, -90, 90), 4)
+        lon = round(_float_param(query, "lon", 0, -180, 180), 4)
+        radius = _float_param(query, "radius", 50, 0, 5000)
+        flags = [query.get(f, ["0"])[0].lower() in ("1", "true", "yes") for f in ("icu", "emergency")]
+        return "nearest", (lat, lon, radius, _int_param(query, "limit", 20, 0), *flags)
+    return None, None
+
+
+class MetricsServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+def make_handler(engine):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            try:
+                endpoint, params = parse_request(url.path.rstrip("/") or "/", parse_qs(url.query))
+                if endpoint is None:
+                    return self._send(404, {"error": f"unknown endpoint '{url.path}'"})
+                body = engine.respond(endpoint, params)
+            except ValueError as e:
+                return self._send(400, {"error": str(e)})
+            except Exception as e:
+                return self._send(500, {"error": f"internal error: {type(e).__name__}"})
+            self._send(200, body)
+
+        def _send(self, status, body):
+            if not isinstance(body, bytes):
+                body = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MetricsHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless PulseScore metrics API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--data", default=None, help="Registry CSV (defaults to the bundled dataset)")
+    parser.add_argument("--cache-size", type=int, default=4096, help="Memoized responses kept in memory")
+    args = parser.parse_args()
+
+    df, state_stats = load_data(args.data)
+    aggregates = load_aggregates(source_fingerprint(args.data or DEFAULT_DATASET_PATH), df, state_stats)
+    engine = MetricsEngine(df, state_stats, cache_size=args.cache_size, aggregates=aggregates)
+
+    httpd = MetricsServer((args.host, args.port), make_handler(engine))
+    print(f"PulseScore metrics API serving {len(df):,} facilities on http://{args.host}:{args.port}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import os
+import shutil
+
+import pandas as pd
+
+from logic import aggregates
+from logic.shared_data import write_arrow
+
+FP, OTHER_FP = "a" * 16, "b" * 16
+
+
+def setup(monkeypatch, tmp_path, state):
+    # One-table aggregates under a temporary cache; the registry copy of FP is on disk, OTHER_FP's is not
+    monkeypatch.setattr(aggregates, "AGGREGATES_DIR", str(tmp_path / "aggregates"))
+    monkeypatch.setattr(aggregates, "TABLES", ("state",))
+    monkeypatch.setattr(aggregates, "build_aggregates", lambda df, state_stats: {"state": state})
+    monkeypatch.setattr(aggregates, "cache_path", lambda fp, name: str(tmp_path / f"{name}_{fp}.arrow"))
+    (tmp_path / f"registry_{FP}.arrow").touch()
+    return aggregates.aggregates_path(FP)
+
+
+def test_concurrent_publish_loads_the_winners_tables(monkeypatch, tmp_path):
+    path = setup(monkeypatch, tmp_path, pd.DataFrame({"State": ["mine"]}))
+    rmtree = shutil.rmtree
+
+    def racing_rmtree(target, ignore_errors=False):
+        # Another worker publishes the same directory right after this one clears it
+        rmtree(target, ignore_errors=ignore_errors)
+        if target == path:
+            write_arrow(pd.DataFrame({"State": ["winner"]}), os.path.join(path, "state.arrow"))
+
+    monkeypatch.setattr(aggregates.shutil, "rmtree", racing_rmtree)
+    tables = aggregates.load_aggregates(FP, None, None)
+    assert tables.table("state")["State"].tolist() == ["winner"]
+    assert os.listdir(aggregates.AGGREGATES_DIR) == [os.path.basename(path)]
+
+
+def test_stale_directories_are_pruned(monkeypatch, tmp_path):
+    path = setup(monkeypatch, tmp_path, pd.DataFrame({"State": ["A"]}))
+    for stale in (f"{FP}_oldnorms", f"{OTHER_FP}_{aggregates.norms_key()}"):
+        os.makedirs(os.path.join(aggregates.AGGREGATES_DIR, stale))
+    aggregates.load_aggregates(FP, None, None)
+    assert os.listdir(aggregates.AGGREGATES_DIR) == [os.path.basename(path)]
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from logic.allocation import allocate_capacity, district_risk
+from logic.metrics import COMPONENT_WEIGHTS
+
+E = 1.15
+STRESS = ["Stress_B", "Stress_D", "Stress_I", "Stress_E"]
+
+
+def district_sri():
+    # A2 is the most bed-stressed, A3 is below the risk floor and gains nothing from more beds
+    out = pd.DataFrame({
+        "State": ["A", "A", "A", "B"],
+        "District": ["A1", "A2", "A3", "B1"],
+        "Avail_Beds": [400.0, 100.0, 900.0, 250.0],
+        "Avail_Docs": [80.0, 20.0, 200.0, 50.0],
+        "Avail_ICU": [40.0, 5.0, 90.0, 20.0],
+        "Stress_B": [1.6, 3.0, 0.4, 2.0],
+        "Stress_D": [1.2, 2.0, 0.5, 1.5],
+        "Stress_I": [1.4, 2.5, 0.3, 1.8],
+        "Stress_E": [1.0, 1.5, 0.6, 1.2],
+    })
+    out["SRI"] = sum(w * out[c] for c, w in zip(STRESS, COMPONENT_WEIGHTS)).round(3)
+    return out
+
+
+def test_budget_is_conserved():
+    for budget, step in [(1000, None), (100, 7), (5, 10), (0, None)]:
+        summary = allocate_capacity(district_sri(), "Beds", budget, E, step)["summary"]
+        assert summary["allocated"] + summary["unused"] == budget
+
+
+def test_no_district_gets_riskier():
+    for resource in ("Beds", "Doctors", "ICU"):
+        out = allocate_capacity(district_sri(), resource, 500, E)["districts"]
+        assert (out["SRI_After"] <= out["SRI_Before"] + 1e-3).all()
+        assert (out["Risk_Reduction"] >= -1e-3).all()
+        assert out.loc[out["District"] == "A3", "Units_Added"].item() == 0
+
+
+def test_first_step_goes_to_largest_marginal_gain():
+    dist_sri, step = district_sri(), 50
+    # Risk removed by one step of beds in each district, scored independently of the heap
+    load = dist_sri["Stress_B"] * dist_sri["Avail_Beds"] * E
+    after = dist_sri["SRI"] - COMPONENT_WEIGHTS[0] * (dist_sri["Stress_B"] - load / ((dist_sri["Avail_Beds"] + step) * E))
+    best = dist_sri["District"][np.argmax(district_risk(dist_sri["SRI"]) - district_risk(after))]
+
+    plan = allocate_capacity(dist_sri, "Beds", step, E, step)["plan"]
+    assert plan["District"].tolist() == [best] and plan["Units_Added"].tolist() == [step]
+    assert best == "A2"
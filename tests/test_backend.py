@@ -0,0 +1,25 @@
+import pandas as pd
+
+from logic import backend
+
+
+def registry():
+    return pd.DataFrame({"State": ["A", "A", "B"], "District": ["A1", "A2", "B1"], "Hospital_Category": "Public",
+                         "Hospital_Care_Type": "Primary", "Total_Num_Beds": [10, 20, 30], "Number_Doctor": [1, 2, 3],
+                         "State_Population": [1000, 1000, 500], "has_icu": [True, False, True],
+                         "is_emergency": [False, False, True], "is_outlier": False})
+
+
+def test_duckdb_backends_do_not_share_per_call_state(monkeypatch, tmp_path):
+    monkeypatch.setattr(backend, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(backend, "get_aggregates", lambda *args: "materialized")
+    source = tmp_path / "registry.csv"
+    df = registry()
+    df.to_csv(source, index=False)
+
+    app = backend.get_backend(df, None, str(source), kind="duckdb")
+    bench = backend.get_backend(df.iloc[:1], None, str(source), kind="duckdb", materialized=False)
+    assert app.con is bench.con
+    assert app.materialized == "materialized" and bench.materialized is None
+    assert len(app.registry) == 3 and len(bench.registry) == 1
+    assert bench.scope().aggregate_states()["Total_Beds"].tolist() == [30, 30]
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from logic.contingency import apply_outage, largest_facility_losses
+from logic.metrics import aggregate_districts, aggregate_states, compute_district_sri, compute_state_sri
+
+S, E = 1.5, 1.15
+
+
+def registry():
+    return pd.DataFrame({
+        "State": ["A", "A", "A", "A", "B", "B"],
+        "District": ["A1", "A1", "A2", "A2", "B1", "B1"],
+        "Hospital_Name": ["A1 General", "A1 PHC", "A2 General", "A2 PHC", "B1 General", "B1 PHC"],
+        "Total_Num_Beds": [500, 20, 200, 10, 300, 30],
+        "Number_Doctor": [120, 4, 60, 2, 80, 5],
+        "has_icu": [1, 0, 1, 0, 1, 1],
+        "is_emergency": [1, 1, 1, 0, 1, 0],
+        "State_Population": [4_000_000, 4_000_000, 4_000_000, 4_000_000, 1_500_000, 1_500_000],
+    })
+
+
+def district_sri(df):
+    return compute_district_sri(aggregate_districts(df), compute_state_sri(aggregate_states(df), S, E), S, E)
+
+
+def test_zero_losses_leave_sri_unchanged():
+    dist_sri = district_sri(registry())
+    out = apply_outage(dist_sri, largest_facility_losses(registry().iloc[:0]), E)
+    assert len(out) == len(dist_sri)
+    assert (out["Offline_Facilities"] == 0).all()
+    assert np.allclose(out["SRI_Outage"], out["SRI"], atol=1e-3)
+    assert (out["SRI_Increase"].abs() <= 1e-3).all()
+
+
+def test_losses_only_raise_sri():
+    df = registry()
+    out = apply_outage(district_sri(df), largest_facility_losses(df, 1), E)
+    assert (out["Offline_Facilities"] == 1).all()
+    assert (out["SRI_Increase"] >= 0).all()
+    assert out.loc[out["District"] == "A1", "Largest_Facility"].item() == "A1 General"
+    assert out["Resilience_Rank"].iloc[0] == 1
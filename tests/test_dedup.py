@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+from logic.dedup import deduplicate_registry, find_duplicates, geohash_cells
+
+GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def registry(rows):
+    return pd.DataFrame(rows, columns=["Hospital_Name", "Pincode", "lat", "lon"])
+
+
+def same_cluster(labels, a, b):
+    return labels[a] >= 0 and labels[a] == labels[b]
+
+
+def test_geohash_matches_reference_encoding():
+    # Reference cell "u4pruy" for (57.64911, 10.40744)
+    expected = 0
+    for ch in "u4pruy":
+        expected = (expected << 5) | GEOHASH_BASE32.index(ch)
+    cells = geohash_cells(np.array([57.64911, np.nan]), np.array([10.40744, 10.0]))
+    assert cells[0] == expected
+    assert cells[1] == -1
+
+
+def test_abbreviated_name_at_same_site_is_a_duplicate():
+    labels, _ = find_duplicates(registry([
+        ("City Hosp", "560001", 12.9716, 77.5946),
+        ("City Hospital", "560001", 12.9716, 77.5946),
+    ]))
+    assert same_cluster(labels, 0, 1)
+
+
+def test_differing_numbers_are_different_facilities():
+    labels, pairs = find_duplicates(registry([
+        ("PHC 2", "560001", 12.9716, 77.5946),
+        ("PHC 3", "560001", 12.9716, 77.5946),
+    ]))
+    assert (labels == -1).all()
+    assert pairs.empty
+
+
+def test_mistyped_pincode_is_caught_by_geohash_pass():
+    labels, _ = find_duplicates(registry([
+        ("Sunrise Multispeciality Hospital", "560001", 12.97160, 77.59460),
+        ("Sunrise Multispeciality Hospital", "506001", 12.97165, 77.59462),
+    ]))
+    assert same_cluster(labels, 0, 1)
+
+
+def test_rows_without_coordinates_match_only_on_shared_pincode():
+    labels, _ = find_duplicates(registry([
+        ("Lakeview Nursing Home", "400001", np.nan, np.nan),
+        ("Lakeview Nursing Home", "400001", np.nan, np.nan),
+        ("Lakeview Nursing Home", "400099", np.nan, np.nan),
+    ]))
+    assert same_cluster(labels, 0, 1)
+    assert labels[2] == -1
+
+
+def test_distinct_facilities_are_left_alone():
+    df = registry([
+        ("Apollo Clinic", "560001", 12.9716, 77.5946),
+        ("Fortis Hospital", "560001", 12.9716, 77.5946),
+        ("Apollo Clinic", "110001", 28.6139, 77.2090),
+    ])
+    labels, _ = find_duplicates(df)
+    assert (labels == -1).all()
+    kept, report = deduplicate_registry(df)
+    assert len(kept) == 3 and report.empty
+
+
+def test_deduplicate_keeps_most_complete_record():
+    df = registry([
+        ("City Hosp", "560001", 12.9716, 77.5946),
+        ("City Hospital", "560001", 12.9716, 77.5946),
+    ]).assign(Total_Num_Beds=[np.nan, 40])
+    kept, report = deduplicate_registry(df)
+    assert len(kept) == 1 and kept["Total_Num_Beds"].iloc[0] == 40
+    assert sorted(report["Action"]) == ["kept", "merged"]
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from logic.metrics import compute_state_sri, compute_structural_deficits
+from logic.norms import ACTIVE_PROFILE, evaluate_profiles
+
+S, E = 1.5, 1.15
+
+
+def state_agg():
+    # C has no population on record and no emergency facilities, so nothing is required of it
+    return pd.DataFrame({
+        "State": ["A", "B", "C"],
+        "State_Pop": [4_000_000, 1_500_000, 0],
+        "Total_Beds": [6_000, 5_000, 40],
+        "Total_Doctors": [2_500, 1_800, 10],
+        "Total_ICU": [300, 100, 2],
+        "Total_Emergency": [20, 40, 0],
+    })
+
+
+def test_active_profile_matches_dashboard_scores():
+    agg = state_agg()
+    batch = evaluate_profiles(agg, [ACTIVE_PROFILE], S, E)
+    sds = compute_structural_deficits(agg)
+    sri = compute_state_sri(agg, S, E)
+    assert np.allclose(batch[f"SDS [{ACTIVE_PROFILE}]"], sds["SDS"].round(2))
+    assert np.allclose(batch[f"SRI [{ACTIVE_PROFILE}]"], sri["SRI"])
+
+
+def test_zero_population_has_no_deficit():
+    agg = state_agg()
+    sds = compute_structural_deficits(agg)
+    assert not sds[["Bed_Deficit", "Doc_Deficit", "ICU_Deficit", "ER_Deficit", "SDS"]].isna().any().any()
+    assert sds.loc[sds["State"] == "C", "SDS"].item() == 0
+    assert evaluate_profiles(agg, [ACTIVE_PROFILE])[f"SDS [{ACTIVE_PROFILE}]"].iloc[2] == 0
@@ -0,0 +1,52 @@
+import pandas as pd
+
+from logic.population import POPULATION_SOURCES, disaggregate_population
+
+TABLE, DENSITY = POPULATION_SOURCES
+
+
+def rollups():
+    state_agg = pd.DataFrame({"State": ["A", "B"], "State_Pop": [1_000_001, 600_000]})
+    dist_agg = pd.DataFrame({
+        "State": ["A", "A", "A", "B", "B"],
+        "District": ["A1", "A2", "A3", "B1", "B2"],
+        "Hospitals": [5, 3, 1, 2, 2],
+    })
+    return state_agg, dist_agg
+
+
+def district_pop(out):
+    return dict(zip(out["District"], out["District_Pop"]))
+
+
+def test_split_sums_to_state_population():
+    state_agg, dist_agg = rollups()
+    out = disaggregate_population(state_agg, dist_agg, table=None)
+    totals = out.groupby("State")["District_Pop"].sum()
+    # Each district is rounded to a whole person
+    assert abs(totals["A"] - 1_000_001) <= 3 and totals["B"] == 600_000
+    assert district_pop(out)["A1"] == round(1_000_001 * 5 / 9)
+    assert (out["Pop_Source"] == DENSITY).all()
+
+
+def test_table_applies_only_to_fully_listed_states():
+    state_agg, dist_agg = rollups()
+    # B is fully listed; A is missing A3, so it keeps the facility-density split
+    table = pd.DataFrame({"State": ["A", "A", "B", "B"], "District": ["A1", "A2", "B1", "B2"],
+                          "Population": [10, 10, 300, 100]})
+    out = disaggregate_population(state_agg, dist_agg, table=table)
+    source = dict(zip(out["District"], out["Pop_Source"]))
+    assert source == {"A1": DENSITY, "A2": DENSITY, "A3": DENSITY, "B1": TABLE, "B2": TABLE}
+    pop = district_pop(out)
+    assert (pop["B1"], pop["B2"]) == (450_000, 150_000)
+    assert pop["A1"] == round(1_000_001 * 5 / 9)
+
+
+def test_state_without_weight_is_split_evenly():
+    state_agg, dist_agg = rollups()
+    # The weights rollup has no facilities in B, so B's districts share its population equally
+    weights = dist_agg.assign(Hospitals=dist_agg["Hospitals"].where(dist_agg["State"] == "A", 0))
+    out = disaggregate_population(state_agg, dist_agg, weights=weights, table=None)
+    pop = district_pop(out)
+    assert (pop["B1"], pop["B2"]) == (300_000, 300_000)
+    assert out.loc[out["State"] == "B", "Pop_Share"].tolist() == [50.0, 50.0]
@@ -0,0 +1,74 @@
+import json
+
+import pandas as pd
+import pytest
+
+from logic.core import enrich_registry
+from server import MetricsEngine, parse_request
+
+
+def q(**params):
+    return {k: [str(v)] for k, v in params.items()}
+
+
+def engine():
+    raw = pd.DataFrame({
+        "Hospital_Name": ["A1 General", "A1 PHC", "A2 General", "B1 General"],
+        "State": ["Kerala", "Kerala", "Kerala", "Goa"],
+        "District": ["Ernakulam", "Ernakulam", "Kollam", "North Goa"],
+        "Pincode": [682001, 682002, 691001, 403001],
+        "Location_Coordinates": ["9.98, 76.28", "9.99, 76.30", "8.89, 76.61", "15.49, 73.82"],
+        "Facilities": ["ICU, OT", "", "ICU", ""],
+        "Emergency_Services": ["Yes", "No", "Yes", "Yes"],
+        "Hospital_Care_Type": ["Tertiary", "Primary", "Secondary", "Secondary"],
+        "Hospital_Category": ["Public", "Public", "Private", "Public"],
+        "Total_Num_Beds": [300, 10, 120, 80],
+        "Number_Doctor": [60, 2, 25, 15],
+        "State_Population": [35_000_000, 35_000_000, 35_000_000, 1_500_000],
+    })
+    df, state_stats = enrich_registry(raw)
+    return MetricsEngine(df, state_stats)
+
+
+def respond(endpoint, params):
+    return json.loads(engine().respond(endpoint, params))
+
+
+@pytest.mark.parametrize("path, query, message", [
+    ("/sri", q(S="nan"), "'S' must be a finite number"),
+    ("/sri", q(E="inf"), "'E' must be a finite number"),
+    ("/sri", q(S=20), "'S' must be between 0.1 and 10.0"),
+    ("/sri", q(E=0.5), "'E' must be between 1.0 and 3.0"),
+    ("/sri", q(S="high"), "'S' must be a number"),
+    ("/sds", q(level="block"), "'level' must be 'state' or 'district'"),
+    ("/sds", q(limit=-1), "'limit' must be at least 0"),
+    ("/nearest", q(lat=10.0), "'lat' and 'lon' are required"),
+    ("/nearest", q(lat=95, lon=76), "'lat' must be between -90 and 90"),
+])
+def test_invalid_parameters_are_rejected(path, query, message):
+    with pytest.raises(ValueError, match=message):
+        parse_request(path, query)
+
+
+def test_parameters_are_normalized():
+    assert parse_request("/sri", q(S="1.504", level="district", state="Kerala,Goa")) == ("sri", ("district", ("Goa", "Kerala"), 1.5, 1.15, 0))
+    assert parse_request("/nearest", q(lat=9.98, lon=76.28, icu="yes")) == ("nearest", (9.98, 76.28, 50.0, 20, True, False))
+    assert parse_request("/unknown", {}) == (None, None)
+
+
+def test_response_shapes():
+    assert respond("health", ()) == {"status": "ok", "facilities": 4, "states": 2, "districts": 3}
+    kpis = respond("kpis", (("Kerala",),))
+    assert kpis["total_hospitals"] == 3 and set(kpis["deficits"]) >= {"Bed", "Doc", "ICU", "ER", "SDS", "Adequacy"}
+
+    sds = respond("sds", ("district", (), 2))
+    assert sds["level"] == "district" and len(sds["rows"]) == 2
+    assert sds["rows"][0]["SDS"] >= sds["rows"][1]["SDS"]
+
+    sri = respond("sri", ("state", (), 1.5, 1.15, 0))
+    assert (sri["level"], sri["S"], sri["E"]) == ("state", 1.5, 1.15)
+    assert len(sri["rows"]) == 2 and sri["rows"][0]["SRI"] >= sri["rows"][1]["SRI"]
+
+    nearest = respond("nearest", (9.98, 76.28, 50.0, 20, True, False))
+    assert nearest["count"] == 1 and nearest["rows"][0]["Hospital_Name"] == "A1 General"
+    assert nearest["rows"][0]["distance_km"] == 0.0
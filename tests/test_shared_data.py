@@ -0,0 +1,43 @@
+import io
+import os
+
+import pandas as pd
+import pytest
+
+from logic import core, shared_data
+
+
+def registry_csv(**overrides):
+    row = {"Hospital_Name": "City Hospital", "State": "Kerala", "District": "Ernakulam", "Pincode": 682001,
+           "Total_Num_Beds": 100, "Number_Doctor": 20, "State_Population": 35_000_000}
+    return io.BytesIO(pd.DataFrame([{**row, **overrides}]).to_csv(index=False).encode())
+
+
+def test_unreadable_upload_raises_instead_of_loading_the_default():
+    with pytest.raises(ValueError, match="Could not read"):
+        core.read_registry(io.BytesIO(b""))
+
+
+def test_upload_without_required_columns_raises():
+    csv = io.BytesIO(b"Name,Beds\nCity Hospital,100\n")
+    with pytest.raises(ValueError, match="missing columns: Hospital_Name, State"):
+        core.read_registry(csv)
+    assert len(core.read_registry(registry_csv())) == 1
+
+
+def test_least_recently_opened_fingerprints_are_evicted(monkeypatch, tmp_path):
+    monkeypatch.setattr(shared_data, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(shared_data, "CACHE_KEEP", 3)
+    frame = pd.DataFrame({"x": [1]})
+    for age, fp in enumerate(["c" * 16, "b" * 16, "a" * 16]):
+        shared_data.open_shared(fp, lambda: (frame, frame))
+        os.utime(shared_data.cache_path(fp, "registry"), (1000 - age, 1000 - age))
+    (tmp_path / f"registry_{'a' * 16}.parquet").touch()
+    (tmp_path / "aggregates" / f"{'a' * 16}_norms").mkdir(parents=True)
+
+    # "a" is the oldest copy, but reopening it marks it as used, so the new copy "d" evicts "b" instead
+    shared_data.open_shared("a" * 16, lambda: (frame, frame))
+    shared_data.open_shared("d" * 16, lambda: (frame, frame))
+    left = sorted(os.listdir(tmp_path))
+    assert left == sorted(["aggregates", f"registry_{'a' * 16}.parquet"] + [f"{table}_{fp * 16}.arrow" for table in ("registry", "state_stats") for fp in "acd"])
+    assert os.listdir(tmp_path / "aggregates") == [f"{'a' * 16}_norms"]
@@ -0,0 +1,38 @@
+import pandas as pd
+
+from logic.metrics import aggregate_districts, aggregate_states, compute_district_deficits, compute_district_sri, compute_state_sri
+from logic.spillover import district_centroids, simulate_spillover
+
+S, E = 1.5, 1.0
+
+
+def registry():
+    # One state: A1 has most of the facilities (so most of the population) but few beds,
+    # A2 next door has few facilities and plenty of beds
+    rows = [("A1", f"A1 PHC {i}", 10, 12.97, 77.59) for i in range(8)] + [("A2", "A2 General", 10000, 13.10, 77.60)]
+    df = pd.DataFrame(rows, columns=["District", "Hospital_Name", "Total_Num_Beds", "lat", "lon"])
+    return df.assign(State="A", Number_Doctor=5, has_icu=1, is_emergency=1, State_Population=1_000_000)
+
+
+def spillover(df, max_km=100.0):
+    state_agg, dist_agg = aggregate_states(df), aggregate_districts(df)
+    dist_sri = compute_district_sri(dist_agg, compute_state_sri(state_agg, S, E), S, E)
+    return simulate_spillover(dist_sri, district_centroids(df), compute_district_deficits(state_agg, dist_agg), S, E, max_km)
+
+
+def test_excess_moves_to_a_neighbour_in_the_same_state():
+    out, transfers = spillover(registry())
+    beds = transfers[transfers["Resource"] == "Beds"]
+    assert len(beds) == 1
+    route = beds.iloc[0]
+    assert (route["From_State"], route["From_District"], route["To_State"], route["To_District"]) == ("A", "A1", "A", "A2")
+    a1 = out.set_index("District").loc["A1"]
+    assert a1["Transfer_Out_B"] == route["Units"] == a1["Shortfall_B"]
+    assert a1["Residual_B_Needed"] == 0
+    assert a1["SRI_After"] < a1["SRI_Before"]
+
+
+def test_nothing_moves_beyond_the_distance_limit():
+    out, transfers = spillover(registry(), max_km=1.0)
+    assert transfers.empty
+    assert (out["Residual_B_Needed"] == out["Shortfall_B"]).all()
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from logic.workforce import redeploy_doctors
+
+
+def districts():
+    state_agg = pd.DataFrame({"State": ["A", "B"], "State_Pop": [3_000_000, 1_000_000]})
+    dist_agg = pd.DataFrame({
+        "State": ["A", "A", "A", "B", "B"],
+        "District": ["A1", "A2", "A3", "B1", "B2"],
+        "Total_Beds": [400, 300, 300, 200, 100],
+        "Total_Doctors": [900, 50, 200, 60, 400],
+    })
+    return state_agg, dist_agg
+
+
+def test_doctors_are_conserved_within_each_state():
+    result = redeploy_doctors(*districts())
+    out = result["districts"]
+    by_state = out.groupby("State")[["Doctors_Before", "Doctors_After"]].sum()
+    assert (by_state["Doctors_Before"] == by_state["Doctors_After"]).all()
+    assert (result["moves"]["From_State"] == result["moves"]["To_State"]).all()
+    assert result["summary"]["moved"] > 0
+
+
+def test_no_district_gives_more_than_its_share():
+    share = 0.1
+    out = redeploy_doctors(*districts(), share=share)["districts"]
+    lost = (out["Doctors_Before"] - out["Doctors_After"]).clip(lower=0)
+    assert (lost <= np.floor(share * out["Doctors_Before"])).all()
+
+
+def test_worst_stress_never_rises():
+    summary = redeploy_doctors(*districts())["summary"]
+    assert summary["max_stress_after"] <= summary["max_stress_before"]
+
+
+def test_zero_share_moves_nobody():
+    result = redeploy_doctors(*districts(), share=0.0)
+    out = result["districts"]
+    assert result["moves"].empty
+    assert (out["Doctors_Before"] == out["Doctors_After"]).all()